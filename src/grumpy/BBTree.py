@@ -55,10 +55,12 @@ try:
     from src.gimpy import BinaryTree, XDOT_INSTALLED, MATPLOTLIB_INSTALLED, DOT2TEX_INSTALLED
     from src.gimpy import PIL_INSTALLED, ETREE_INSTALLED
     from src.gimpy import quote_if_necessary as quote
+    from src.gimpy import DIRECTED_GRAPH, UNDIRECTED_GRAPH
 except ImportError:
     from coinor.gimpy import BinaryTree, XDOT_INSTALLED, MATPLOTLIB_INSTALLED, DOT2TEX_INSTALLED
     from coinor.gimpy import PIL_INSTALLED, ETREE_INSTALLED
     from coinor.gimpy import quote_if_necessary as quote
+    from coinor.gimpy import DIRECTED_GRAPH, UNDIRECTED_GRAPH
 from io import StringIO
 from pulp import LpVariable, lpSum, LpProblem, LpMaximize, LpConstraint
 from pulp import LpStatus, value
@@ -78,10 +80,27 @@ SEARCH_STRATEGY = None
 MOST_FRACTIONAL = 'Most Fraction'
 FIXED_BRANCHING = 'Fixed Branching'
 PSEUDOCOST_BRANCHING = 'Pseudocost Branching'
+STRONG_BRANCHING = 'Strong Branching'
+RELIABILITY_BRANCHING = 'Reliability Branching'
+PENALTY_BRANCHING = 'Penalty Branching'
 # search strategies
 DEPTH_FIRST = 'Depth First'
 BEST_FIRST = 'Best First'
 BEST_ESTIMATE = 'Best Estimate'
+HYBRID_PLUNGING = 'Hybrid Plunging'
+ADAPTIVE_SEARCH = 'Adaptive Search'
+# primal heuristics
+SIMPLE_ROUNDING = 'Simple Rounding'
+FRACTIONAL_DIVING = 'Fractional Diving'
+COEFFICIENT_DIVING = 'Coefficient Diving'
+FIX_AND_PROPAGATE = 'Fix and Propagate'
+GREEDY_FILL = 'Greedy Fill'
+# sub-MIP heuristics
+RINS = 'RINS'
+LOCAL_BRANCHING = 'Local Branching'
+# parallel modes
+PROCESSES = 'Processes'
+THREADS = 'Threads'
 INFINITY = sys.maxsize
 
 class BBTree(BinaryTree):
@@ -142,6 +161,16 @@ class BBTree(BinaryTree):
         else:
             self.set_display_mode('off')
 
+    def __setstate__(self, state):
+        '''
+        Restores a pickled tree. GIMPy compares graph types by identity, so
+        the graph type is replaced by the constant it is equal to.
+        '''
+        self.__dict__.update(state)
+        for graph_type in [DIRECTED_GRAPH, UNDIRECTED_GRAPH]:
+            if self.graph_type == graph_type:
+                self.graph_type = graph_type
+
     def process_file(self, file_name):
         self._filename = file_name
         input_file = open(file_name, 'r')
@@ -2100,6 +2129,7 @@ def parse_options():
 
 if __name__ == '__main__':
     from .BranchAndBound import GenerateRandomMIP, BranchAndBound
+    from .Observers import ConsoleObserver
 
     T = BBTree()
     #T.set_layout('dot2tex')
@@ -2109,4 +2139,5 @@ if __name__ == '__main__':
     BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS,
                    branch_strategy = MOST_FRACTIONAL,
                    search_strategy = BEST_FIRST,
-                   display_interval = 10000)
+                   display_interval = 10000,
+                   observers = [ConsoleObserver()])
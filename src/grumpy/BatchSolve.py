@@ -0,0 +1,94 @@
+__author__ = 'Ted Ralphs'
+__maintainer__ = 'Ted Ralphs (ted@lehigh.edu)'
+
+"""
+Solving many instances with a pool of worker processes.
+
+SolveMany() solves a list of instances, each with one or more combinations
+of branching and search strategy, in a process pool. The workers run without
+a tree and without output. The results are yielded as soon as they are
+available, so long batches can be monitored and processed while they run.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .BBTree import MOST_FRACTIONAL, DEPTH_FIRST
+from .BranchAndBound import BranchAndBoundArrays, MIPDictsToArrays
+from .LPBackends import PULP
+
+def _solve_chunk(chunk, binary_vars, lp_solver, warm_start, time_limit):
+    '''
+    Solves the tasks in chunk, each a tuple of the instance index, the
+    instance in array format and the strategies. Returns a list with a
+    result dictionary for each task.
+    '''
+    results = []
+    for index, (c, A, b), branch_strategy, search_strategy in chunk:
+        result = {'instance' : index, 'branch_strategy' : branch_strategy,
+                  'search_strategy' : search_strategy}
+        stats = {}
+        try:
+            x, LB = BranchAndBoundArrays(None, c, A, b,
+                                         branch_strategy = branch_strategy,
+                                         search_strategy = search_strategy,
+                                         binary_vars = binary_vars,
+                                         lp_solver = lp_solver,
+                                         warm_start = warm_start,
+                                         time_limit = time_limit,
+                                         stats = stats)
+        except Exception as e:
+            result['status'] = 'error: %s' %e
+            results.append(result)
+            continue
+        if stats['stopped']:
+            result['status'] = 'time limit'
+        else:
+            result['status'] = 'optimal'
+        result['opt'] = x
+        result['LB'] = LB
+        result['nodes'] = stats['nodes']
+        result['lp_count'] = stats['lp_count']
+        result['lp_iter_count'] = stats['lp_iter_count']
+        result['time'] = stats['time']
+        results.append(result)
+    return results
+
+def SolveMany(instances, strategies = None, workers = None, chunksize = 1,
+              time_limit = None, binary_vars = True, lp_solver = PULP,
+              warm_start = True):
+    '''
+    Solves each of instances with each of strategies, a list of (branching
+    strategy, search strategy) pairs, by default only (MOST_FRACTIONAL,
+    DEPTH_FIRST). An instance is given either as a tuple (c, A, b) in the
+    format of BranchAndBoundArrays() or as a tuple (CONSTRAINTS, VARIABLES,
+    OBJ, MAT, RHS) as returned by GenerateRandomMIP. The solves run in a pool
+    of workers processes (by default one per CPU), which are given chunksize
+    solves at a time. If time_limit is given, each solve stops at the
+    first node it starts after time_limit seconds. The limit is only
+    checked between nodes, so a solve can run over it by the time one node
+    takes.
+
+    This is a generator that yields a dictionary for each solve as soon as
+    its chunk is done, in no particular order. The dictionary holds the
+    index of the instance ('instance'), the strategies ('branch_strategy',
+    'search_strategy'), the status ('optimal', 'time limit' or an error
+    message), and unless there was an error, the best solution found
+    ('opt'), its objective value ('LB'), the number of nodes ('nodes'), LPs
+    solved ('lp_count') and simplex iterations ('lp_iter_count') and the
+    time in seconds ('time').
+    '''
+    if strategies is None:
+        strategies = [(MOST_FRACTIONAL, DEPTH_FIRST)]
+    tasks = []
+    for index, instance in enumerate(instances):
+        if len(instance) == 5:
+            instance = MIPDictsToArrays(*instance)
+        for branch_strategy, search_strategy in strategies:
+            tasks.append((index, instance, branch_strategy, search_strategy))
+    chunks = [tasks[i:i+chunksize] for i in range(0, len(tasks), chunksize)]
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_solve_chunk, chunk, binary_vars,
+                                   lp_solver, warm_start, time_limit)
+                   for chunk in chunks]
+        for future in as_completed(futures):
+            for result in future.result():
+                yield result
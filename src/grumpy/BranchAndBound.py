@@ -1,422 +1,1426 @@
 __author__ = 'Ted Ralphs'
 __maintainer__ = 'Ted Ralphs (ted@lehigh.edu)'
 
-import random, sys, math
-try:
-    from src.blimpy import PriorityQueue
-except ImportError:
-    from coinor.blimpy import PriorityQueue
+import random, os, math, copy, pickle, hashlib, multiprocessing
 import time
-from pulp import LpVariable, lpSum, LpProblem, LpMaximize, LpConstraint
-from pulp import LpStatus, value
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import wait, FIRST_COMPLETED
+import numpy as np
 from .BBTree import BBTree
 from .BBTree import MOST_FRACTIONAL, FIXED_BRANCHING, PSEUDOCOST_BRANCHING
-from .BBTree import DEPTH_FIRST, BEST_FIRST, BEST_ESTIMATE, INFINITY
+from .BBTree import STRONG_BRANCHING, RELIABILITY_BRANCHING, PENALTY_BRANCHING
+from .BBTree import DEPTH_FIRST, BEST_FIRST, BEST_ESTIMATE, HYBRID_PLUNGING
+from .BBTree import ADAPTIVE_SEARCH, INFINITY
+from .BBTree import PROCESSES, THREADS, RINS, LOCAL_BRANCHING
+from .LPBackends import CreateLPBackend, LPBackend, HighsBackend, PULP
+from .LPBackends import SCIPY_INSTALLED
+from .Observers import BBObserver, ConsoleObserver, TreeObserver
+from .NodeQueue import NodeQueue, SpillingNodeQueue, read_snapshot_files
+from .Heuristics import PrimalHeuristics
+from .Heuristics import _rins_sub_mip, _local_branching_sub_mip
+from .forecasting import ForecastingChainedSequences
+
+if SCIPY_INSTALLED:
+    import scipy.sparse
 
 def GenerateRandomMIP(numVars = 40, numCons = 20, density = 0.2,
                       maxObjCoeff = 10, maxConsCoeff = 10, 
-                      tightness = 2, rand_seed = 2, layout = 'dot'):
-    random.seed(rand_seed)
+                      tightness = 2, rand_seed = 2, layout = 'dot',
+                      legacy = False):
+    '''
+    Generates a random binary knapsack-type problem in dictionary format. The
+    random number generator is private to the call, so the global state of
+    the random module is not touched. If legacy is True, integers are drawn
+    the way Python 2 did, which reproduces the instances (and the optimal
+    values hard-coded in test_bb.py) generated with Python 2.
+    '''
+    rng = random.Random(rand_seed)
+    if legacy:
+        randint = lambda a, b: a + int(rng.random()*(b - a + 1))
+    else:
+        randint = rng.randint
     CONSTRAINTS = ["C"+str(i) for i in range(numCons)]
     if layout == 'dot2tex':
         VARIABLES = ["x_{"+str(i)+"}" for i in range(numVars)]
     else:
         VARIABLES = ["x"+str(i) for i in range(numVars)]
-    OBJ = dict((i, random.randint(1, maxObjCoeff)) for i in VARIABLES)
-    MAT = dict((i, [random.randint(1, maxConsCoeff)
-                    if random.random() <= density else 0
+    OBJ = dict((i, randint(1, maxObjCoeff)) for i in VARIABLES)
+    MAT = dict((i, [randint(1, maxConsCoeff)
+                    if rng.random() <= density else 0
                     for j in CONSTRAINTS]) for i in VARIABLES)
-    RHS = [random.randint(int(numVars*density*maxConsCoeff/tightness),
+    RHS = [randint(int(numVars*density*maxConsCoeff/tightness),
                    int(numVars*density*maxConsCoeff/1.5))
            for i in CONSTRAINTS]
     return CONSTRAINTS, VARIABLES, OBJ, MAT, RHS
 
-def BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS,
-                   branch_strategy = MOST_FRACTIONAL,
-                   search_strategy = DEPTH_FIRST,
-                   complete_enumeration = False,
-                   display_interval = None,
-                   binary_vars = True):
-    
-    if T.get_layout() == 'dot2tex':
-        cluster_attrs = {'name':'Key', 'label':r'\text{Key}', 'fontsize':'12'}
-        T.add_node('C', label = r'\text{Candidate}', style = 'filled',
-                      color = 'yellow', fillcolor = 'yellow')
-        T.add_node('I', label = r'\text{Infeasible}', style = 'filled',
-                      color = 'orange', fillcolor = 'orange')
-        T.add_node('S', label = r'\text{Solution}', style = 'filled',
-                      color = 'lightblue', fillcolor = 'lightblue')
-        T.add_node('P', label = r'\text{Pruned}', style = 'filled',
-                      color = 'red', fillcolor = 'red')
-        T.add_node('PC', label = r'\text{Pruned}$\\ $\text{Candidate}', style = 'filled',
-                      color = 'red', fillcolor = 'yellow')
+def GenerateRandomMIPArrays(numVars = 40, numCons = 20, density = 0.2,
+                            maxObjCoeff = 10, maxConsCoeff = 10,
+                            tightness = 2, rand_seed = None, rng = None,
+                            sparse = True):
+    '''
+    Generates a random problem of the same type as GenerateRandomMIP as
+    arrays c, A and b (see BranchAndBoundArrays). Entries are drawn in bulk
+    with a numpy.random.Generator, which is either passed in as rng or
+    created from rand_seed, so concurrent calls do not share any state. The
+    positions of the nonzeros are sampled directly, which makes very large
+    sparse instances cheap to generate. A is a CSR matrix if sparse is True
+    and scipy is installed and a dense array otherwise.
+    '''
+    if rng is None:
+        rng = np.random.default_rng(rand_seed)
+    c = rng.integers(1, maxObjCoeff, size = numVars,
+                     endpoint = True).astype(float)
+    nnz = rng.binomial(numCons*numVars, density)
+    positions = np.sort(rng.choice(numCons*numVars, size = nnz,
+                                   replace = False, shuffle = False))
+    rows = positions // numVars
+    cols = positions % numVars
+    values = rng.integers(1, maxConsCoeff, size = nnz,
+                          endpoint = True).astype(float)
+    if sparse and SCIPY_INSTALLED:
+        indptr = np.zeros(numCons + 1, dtype = np.int64)
+        np.cumsum(np.bincount(rows, minlength = numCons), out = indptr[1:])
+        A = scipy.sparse.csr_matrix((values, cols, indptr),
+                                    shape = (numCons, numVars))
+    else:
+        A = np.zeros((numCons, numVars))
+        A[rows, cols] = values
+    low = int(numVars*density*maxConsCoeff/tightness)
+    high = max(low, int(numVars*density*maxConsCoeff/1.5))
+    b = rng.integers(low, high, size = numCons, endpoint = True).astype(float)
+    return c, A, b
+
+def MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS):
+    '''
+    Converts a problem in the dictionary format returned by GenerateRandomMIP
+    to arrays c, A and b describing max cx s.t. Ax <= b. Column j of A
+    corresponds to VARIABLES[j] and row i to CONSTRAINTS[i].
+    '''
+    c = np.array([OBJ[i] for i in VARIABLES], dtype = float)
+    A = np.array([MAT[i] for i in VARIABLES], dtype = float).reshape(
+        len(VARIABLES), len(CONSTRAINTS)).T
+    b = np.array(RHS, dtype = float)
+    return c, A, b
+
+def _add_bound_change(bounds, index, sense, rhs, root_bounds):
+    '''
+    Returns the bound change record of a child node. bounds is the record of
+    the parent, a tuple of (var index, lower, upper) triples with one entry
+    for each variable whose bounds differ from root_bounds, and the child is
+    obtained by adding the branching constraint x[index] sense rhs.
+    '''
+    lower, upper = root_bounds[index]
+    changes = []
+    for (j, l, u) in bounds:
+        if j == index:
+            lower, upper = l, u
+        else:
+            changes.append((j, l, u))
+    if sense == '<=':
+        if rhs < upper:
+            upper = rhs
+    else:
+        if rhs > lower:
+            lower = rhs
+    changes.append((index, lower, upper))
+    return tuple(changes)
+
+# Holds the LP solver of a worker process or thread in parallel mode
+_worker = threading.local()
+
+def _init_worker(lp_solver, c, A, b, lower, upper, var_names,
+                 deterministic):
+    '''
+    Loads the root relaxation into the LP solver of a worker process or
+    thread. Threads share the problem data, but each has its own LP solver.
+    In deterministic mode, HiGHS forgets earlier solves, which differ
+    between the workers, so that a node gives the same result on each.
+    '''
+    if isinstance(lp_solver, LPBackend):
+        lp_solver = copy.copy(lp_solver)
+    _worker.lp = CreateLPBackend(lp_solver)
+    if deterministic and isinstance(_worker.lp, HighsBackend):
+        _worker.lp.clear_solver = True
+    _worker.lp.load(c, A, b, lower, upper, var_names)
+
+def _solve_node(lp, bounds, basis, cutoff, warm_start,
+                reduced_costs = False):
+    '''
+    Solves the LP relaxation of a node with the LP solver lp. Returns the
+    status, objective value and solution, the number of simplex iterations,
+    if warm_start is True, the final basis and, if reduced_costs is True,
+    the reduced costs (None if the LP solver does not provide them).
+    '''
+    lp_status, lp_value, var_values = lp.solve(bounds, basis, cutoff = cutoff)
+    if warm_start:
+        lp_basis = lp.get_basis()
     else:
-        cluster_attrs = {'name':'Key', 'label':'Key', 'fontsize':'12'}
-        T.add_node('C', label = 'Candidate', style = 'filled',
-                      color = 'yellow', fillcolor = 'yellow')
-        T.add_node('I', label = 'Infeasible', style = 'filled',
-                      color = 'orange', fillcolor = 'orange')
-        T.add_node('S', label = 'Solution', style = 'filled',
-                      color = 'lightblue', fillcolor = 'lightblue')
-        T.add_node('P', label = 'Pruned', style = 'filled',
-                      color = 'red', fillcolor = 'red')
-        T.add_node('PC', label = 'Pruned \n Candidate', style = 'filled',
-                      color = 'red', fillcolor = 'yellow')
-    T.add_edge('C', 'I', style = 'invisible', arrowhead = 'none')
-    T.add_edge('I', 'S', style = 'invisible', arrowhead = 'none')
-    T.add_edge('S', 'P', style = 'invisible', arrowhead = 'none')
-    T.add_edge('P', 'PC', style = 'invisible', arrowhead = 'none')
-    T.create_cluster(['C', 'I', 'S', 'P', 'PC'], cluster_attrs)
+        lp_basis = None
+    if reduced_costs and lp_status == 'Optimal':
+        lp_reduced_costs = lp.reduced_costs()
+    else:
+        lp_reduced_costs = None
+    return (lp_status, lp_value, var_values, lp.iterations, lp_basis,
+            lp_reduced_costs)
+
+def _solve_node_in_worker(task):
+    return _solve_node(_worker.lp, *task)
+
+class _SubMIPIncumbent(object):
+    '''
+    The incumbent of a sub-MIP whose variables are the variables free of
+    the problem of shared_incumbent, a SharedIncumbent or a _SubMIPIncumbent,
+    while the others are fixed to their values in x, with objective value
+    constant. It is used as the shared incumbent of the sub-MIP, so that
+    the sub-MIP prunes with the incumbent of the problem and its solutions
+    are stored in it.
+    '''
+    def __init__(self, shared_incumbent, x, free, constant):
+        self.shared_incumbent = shared_incumbent
+        self.x = x
+        self.free = free
+        self.constant = constant
+
+    def value(self):
+        return self.shared_incumbent.value() - self.constant
+
+    def get(self):
+        value, x = self.shared_incumbent.get()
+        return value - self.constant, x[self.free]
+
+    def update(self, value, x):
+        full = self.x.copy()
+        full[self.free] = x
+        self.shared_incumbent.update(value + self.constant, full)
+
+def _init_sub_mip_worker(shared_incumbent, stop_event):
+    '''
+    Stores the incumbent shared with the search that started the sub-MIP
+    worker process and the event that stops its sub-MIPs.
+    '''
+    _worker.shared_incumbent = shared_incumbent
+    _worker.stop_event = stop_event
+
+def _solve_sub_mip(task):
+    '''
+    Solves a sub-MIP in a sub-MIP worker process. task holds the sub-MIP
+    in the format of _rins_sub_mip(), the incumbent of the problem and the
+    arguments of BranchAndBoundArrays(). Returns the number of nodes.
+    '''
+    c, A, b, free, constant, x, options = task
+    shared_incumbent = _SubMIPIncumbent(_worker.shared_incumbent, x, free,
+                                        constant)
+    stats = {}
+    BranchAndBoundArrays(None, c, A, b, shared_incumbent = shared_incumbent,
+                         stop_event = _worker.stop_event, stats = stats,
+                         **options)
+    return stats['nodes']
+
+def _reduced_cost_fixings(reduced_costs, var_values, lower, upper, gap):
+    '''
+    Returns the bound changes, as (var index, lower, upper) triples, implied
+    by the reduced costs of an LP whose optimal value exceeds the incumbent
+    value by gap, where lower and upper are the bounds of the variables in
+    the LP. Raising a variable at its lower bound by one lowers the
+    objective value by at least the absolute value of its reduced cost, so
+    in a better solution it is at most gap divided by that above its lower
+    bound, and likewise for a variable at its upper bound.
+    '''
+    changes = []
+    at_lower = np.flatnonzero((reduced_costs < -1e-9) &
+                              (np.abs(var_values - lower) <= 1e-6))
+    for j in at_lower:
+        u = lower[j] + math.floor(gap/-reduced_costs[j] + 1e-6)
+        if u < upper[j]:
+            changes.append((int(j), float(lower[j]), float(u)))
+    at_upper = np.flatnonzero((reduced_costs > 1e-9) &
+                              (np.abs(var_values - upper) <= 1e-6))
+    for j in at_upper:
+        l = upper[j] - math.floor(gap/reduced_costs[j] + 1e-6)
+        if l > lower[j]:
+            changes.append((int(j), float(l), float(upper[j])))
+    return changes
+
+def _node_bounds(bounds, lower, upper):
+    '''
+    Returns the bounds of the variables in a node with bound change record
+    bounds, where lower and upper are the bounds in the root relaxation.
+    '''
+    lower = lower.copy()
+    upper = upper.copy()
+    for (j, l, u) in bounds:
+        lower[j] = l
+        upper[j] = u
+    return lower, upper
+
+def _tighten_bounds(bounds, changes, root_bounds):
+    '''
+    Returns the bound change record bounds (see _add_bound_change())
+    tightened by changes, a list of (var index, lower, upper) triples.
+    Changes that would leave a variable without feasible values are
+    skipped.
+    '''
+    record = {j : (l, u) for (j, l, u) in bounds}
+    for (j, l, u) in changes:
+        old_l, old_u = record.get(j, root_bounds[j])
+        l, u = max(old_l, l), min(old_u, u)
+        if l <= u and (l, u) != (old_l, old_u):
+            record[j] = (l, u)
+    return tuple((j, l, u) for j, (l, u) in record.items())
+
+def _update_pseudocosts(pseudo_u, pseudo_d, branch_var, branch_var_value,
+                        sense, rhs, parent_relax, relax):
+    '''
+    Updates the pseudocost of branch_var in direction sense after a node
+    created by branching on it has been solved. parent_relax and relax are
+    the objective values of the relaxations of the parent and of the node.
+    '''
+    if sense == '<=':
+        pseudo_d[branch_var] = (
+            ((pseudo_d[branch_var][0]*pseudo_d[branch_var][1] +
+              ((parent_relax - relax)/
+               (branch_var_value - rhs)))/(pseudo_d[branch_var][1]+1)),
+               pseudo_d[branch_var][1]+1)
+    else:
+        pseudo_u[branch_var] = (
+        ((pseudo_u[branch_var][0]*pseudo_u[branch_var][1] +
+         ((parent_relax - relax)/
+         (rhs - branch_var_value)))/(pseudo_u[branch_var][1]+1)),
+        pseudo_u[branch_var][1]+1)
+
+def _select_branching_var(branch_strategy, var_values, frac, pseudo_u,
+                          pseudo_d):
+    '''
+    Returns the index of the variable to branch on for the LP solution
+    var_values with fractionalities frac, or None if FIXED_BRANCHING finds
+    no fractional variable.
+    '''
+    numVars = len(var_values)
+    branching_var = None
+    if branch_strategy == FIXED_BRANCHING:
+        #fixed order
+        candidates = np.flatnonzero(frac > 0)
+        if len(candidates) > 0:
+            branching_var = int(candidates[0])
+    elif branch_strategy == MOST_FRACTIONAL:
+        #most fractional variable
+        branching_var = int(np.argmax(frac))
+    elif branch_strategy == PSEUDOCOST_BRANCHING:
+        # find the fractional solutions
+        scores = np.where(var_values - np.floor(var_values) != 0,
+                          np.minimum(pseudo_u[:, 0]*(1-var_values),
+                                     pseudo_d[:, 0]*var_values),
+                          -np.inf)
+        # the last variable with the highest score
+        branching_var = numVars - 1 - int(np.argmax(scores[::-1]))
+    else:
+        print("Unknown branching strategy %s" %branch_strategy)
+        exit()
+    return branching_var
+
+def _pseudocost_scores(var_values, candidates, pseudo_u, pseudo_d):
+    '''
+    Returns the scores of the variables in candidates, the product of the
+    degradations of the objective value in the two children estimated from
+    the pseudocosts.
+    '''
+    f = var_values[candidates] - np.floor(var_values[candidates])
+    return (np.maximum(pseudo_d[candidates, 0]*f, 1e-6)*
+            np.maximum(pseudo_u[candidates, 0]*(1 - f), 1e-6))
+
+def _strong_branching(lp, branch_strategy, var_values, frac, relax, bounds,
+                      basis, root_bounds, pseudo_u, pseudo_d,
+                      max_candidates, iteration_limit, reliability):
+    '''
+    Selects the variable to branch on at a node with bound change record
+    bounds, relaxation value relax and solution var_values by solving the
+    LPs of the children of up to max_candidates fractional variables, those
+    with the best pseudocost scores. The solves start from basis and stop
+    after iteration_limit simplex iterations. With RELIABILITY_BRANCHING,
+    only variables whose pseudocosts have been updated fewer than
+    reliability times in a direction are evaluated, the others keep their
+    pseudocost scores. The pseudocosts are updated with the results of the
+    solves that finish. Returns the index of the variable, a list of (var
+    index, down value, up value) triples for the evaluated variables, the
+    number of LPs solved and the number of simplex iterations (None if the
+    LP solver does not report them).
+    '''
+    candidates = np.flatnonzero(frac > .001)
+    scores = _pseudocost_scores(var_values, candidates, pseudo_u, pseudo_d)
+    evaluated = []
+    for position in np.argsort(-scores, kind = 'stable'):
+        if len(evaluated) >= max_candidates:
+            break
+        j = candidates[position]
+        if branch_strategy == RELIABILITY_BRANCHING and \
+                min(pseudo_u[j][1], pseudo_d[j][1]) >= reliability:
+            continue
+        evaluated.append(position)
+    results = []
+    lp_count = 0
+    iterations = 0
+    for position in evaluated:
+        j = int(candidates[position])
+        values = []
+        degradations = []
+        for sense, rhs in [('<=', math.floor(var_values[j])),
+                           ('>=', math.ceil(var_values[j]))]:
+            status, value, x = lp.solve(_add_bound_change(bounds, j, sense,
+                                                          rhs, root_bounds),
+                                        basis, None, iteration_limit)
+            lp_count += 1
+            if lp.iterations is None:
+                iterations = None
+            elif iterations is not None:
+                iterations += lp.iterations
+            if status == 'Optimal':
+                _update_pseudocosts(pseudo_u, pseudo_d, j, var_values[j],
+                                    sense, rhs, relax, value)
+            elif status == 'Infeasible':
+                value = None
+            elif status != 'Iteration Limit':
+                value = relax
+            values.append(value)
+            if value is None:
+                degradations.append(INFINITY)
+            else:
+                degradations.append(max(relax - value, 1e-6))
+        results.append((j, values[0], values[1]))
+        scores[position] = float(degradations[0])*degradations[1]
+    branching_var = int(candidates[np.argmax(scores)])
+    return branching_var, results, lp_count, iterations
+
+def _child_priorities(search_strategy, cur_depth, relax, var_values,
+                      branching_var, pseudo_u, pseudo_d):
+    '''
+    Returns the priorities of the down and up child of a node at depth
+    cur_depth with relaxation value relax and solution var_values that is
+    branched on branching_var.
+    '''
+    if search_strategy == DEPTH_FIRST:
+        priority = (-cur_depth - 1, -cur_depth - 1)
+    elif search_strategy in (BEST_FIRST, HYBRID_PLUNGING):
+        priority = (-relax, -relax)
+    elif search_strategy == BEST_ESTIMATE:
+        priority = (-relax - pseudo_d[branching_var][0]*\
+                         (math.floor(var_values[branching_var]) -\
+                              var_values[branching_var]),
+                    -relax + pseudo_u[branching_var][0]*\
+                         (math.ceil(var_values[branching_var]) -\
+                              var_values[branching_var]))
+    return priority
+
+def _dive_child(relax, var_values, branching_var, pseudo_u, pseudo_d):
+    '''
+    Returns 0 if the search should dive into the down child of a node with
+    relaxation value relax and solution var_values that is branched on
+    branching_var and 1 if into the up child, the child with the better
+    estimate.
+    '''
+    estimate = _child_priorities(BEST_ESTIMATE, 0, relax, var_values,
+                                 branching_var, pseudo_u, pseudo_d)
+    if estimate[1] < estimate[0]:
+        return 1
+    return 0
+
+def _within_plunge_fraction(relax, UB, LB, plunge_fraction):
+    '''
+    Returns True if relax is within plunge_fraction of the gap between the
+    upper bound UB and the incumbent value LB, or of the absolute value of
+    UB if there is no incumbent.
+    '''
+    if LB == -INFINITY:
+        return relax >= UB - plunge_fraction*max(abs(UB), 1.0)
+    return relax >= UB - plunge_fraction*(UB - LB)
+
+def _gap(LB, UB):
+    '''
+    Returns the relative gap between the incumbent value LB and the upper
+    bound UB, or None if there is no incumbent.
+    '''
+    if LB == -INFINITY:
+        return None
+    if UB <= LB:
+        return 0.0
+    return (UB - LB)/max(abs(LB), 1e-10)
+
+def _matrix_digest(A):
+    '''
+    Returns a digest of the matrix A, which is either a dense array or a
+    scipy.sparse matrix. For a sparse matrix, the arrays of its CSR form are
+    hashed.
+    '''
+    if hasattr(A, 'tocsr'):
+        A = A.tocsr(copy = True)
+        A.sum_duplicates()
+        arrays = [A.data.astype(float), A.indices.astype(np.int64),
+                  A.indptr.astype(np.int64)]
+    else:
+        arrays = [A]
+    digest = hashlib.sha256()
+    digest.update(str(A.shape).encode())
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+def _write_checkpoint(file_name, state, files):
+    '''
+    Writes the checkpoint state to file_name, adding the entries in the
+    snapshot files of the node queue. The file is replaced atomically.
+    '''
+    state['entries'] = state['entries'] + read_snapshot_files(files)
+    with open(file_name + '.tmp', 'wb') as f:
+        pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(file_name + '.tmp', file_name)
+
+def _upper_bound(LB, Q):
+    '''
+    Returns the global upper bound, the largest bound of a node that is open
+    in the NodeQueue Q or LB if it is larger.
+    '''
+    return max(LB, Q.bound())
+
+def _progress(LB, opt, Q, node_count, lp_count):
+    '''
+    Returns the progress dictionary yielded by BranchAndBoundIterator().
+    '''
+    UB = _upper_bound(LB, Q)
+    return {'incumbent' : LB,
+            'solution' : opt.copy(),
+            'bound' : UB,
+            'gap' : _gap(LB, UB),
+            'open_nodes' : Q.open_nodes(),
+            'nodes' : node_count,
+            'lp_count' : lp_count}
+
+def BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS, **kwargs):
+    '''
+    Solves max OBJ x s.t. MAT x <= RHS, with the problem given in the
+    dictionary format returned by GenerateRandomMIP. This is a thin wrapper
+    around BranchAndBoundArrays(), to which the options are passed. Returns
+    the best solution found as a dictionary keyed by variable names and its
+    objective value.
+    '''
+    c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+    kwargs.setdefault('var_names', VARIABLES)
+    x, LB = BranchAndBoundArrays(T, c, A, b, **kwargs)
+    return dict(zip(VARIABLES, x.tolist())), LB
+
+def BranchAndBoundArrays(T, c, A, b, **kwargs):
+    '''
+    Solves max cx s.t. Ax <= b by running BranchAndBoundIterator(), which
+    describes the options, to the end. Returns the best solution found as
+    an array and its objective value.
+    '''
+    steps = BranchAndBoundIterator(T, c, A, b, yield_interval = None,
+                                   **kwargs)
+    for progress in steps:
+        pass
+    return progress['solution'], progress['incumbent']
+
+def BranchAndBoundIterator(T, c, A, b, var_names = None,
+                           branch_strategy = MOST_FRACTIONAL,
+                           search_strategy = DEPTH_FIRST,
+                           complete_enumeration = False,
+                           display_interval = None,
+                           binary_vars = True,
+                           lp_solver = PULP,
+                           warm_start = True,
+                           workers = 1,
+                           parallel_mode = PROCESSES,
+                           deterministic = True,
+                           shared_incumbent = None,
+                           stop_event = None,
+                           time_limit = None,
+                           node_limit = None,
+                           gap_limit = None,
+                           abs_gap_limit = None,
+                           max_nodes_in_memory = None,
+                           spill_directory = None,
+                           memory_limit = None,
+                           checkpoint_file = None,
+                           checkpoint_interval = 60,
+                           checkpoint_tree = False,
+                           resume_from = None,
+                           plunge_fraction = 0.25,
+                           max_plunge_depth = None,
+                           switch_patience = 5,
+                           strong_branching_candidates = 10,
+                           strong_branching_iterations = 20,
+                           reliability = 4,
+                           penalties = False,
+                           reduced_cost_fixing = False,
+                           heuristics = None,
+                           heuristic_interval = 10,
+                           heuristic_time = 1.0,
+                           sub_mips = None,
+                           sub_mip_interval = 50,
+                           sub_mip_node_limit = 200,
+                           sub_mip_depth = 2,
+                           stats = None,
+                           observers = None,
+                           yield_interval = 1):
+    '''
+    Solves max cx s.t. Ax <= b, where c and b are arrays and A is either a
+    dense array or a scipy.sparse matrix (CSR is most efficient). The
+    variables are binary if binary_vars is True and integer otherwise.
+    var_names are only used for output and for labeling the tree T, which
+    may be None. lp_solver is one of the LP solvers defined in LPBackends.py
+    (PULP, HIGHS, SCIPY or DUAL_SIMPLEX) or an LPBackend object. If
+    warm_start is True and the LP solver supports it, the LP of each node is
+    reoptimized from the optimal basis of its parent.
+
+    branch_strategy is MOST_FRACTIONAL, FIXED_BRANCHING,
+    PSEUDOCOST_BRANCHING, STRONG_BRANCHING, RELIABILITY_BRANCHING or
+    PENALTY_BRANCHING. Strong branching solves the LPs of the children of up
+    to strong_branching_candidates fractional variables, those with the
+    best pseudocost scores, with at most strong_branching_iterations simplex
+    iterations (None for no limit) and branches on the variable with the
+    largest product of the degradations. Reliability branching does this
+    only for variables whose pseudocosts have been updated fewer than
+    reliability times in a direction. These LPs are not counted as node LPs.
+    If penalties is True or branch_strategy is PENALTY_BRANCHING, the
+    Driebeek-Tomlin penalties of the fractional variables are computed from
+    the final tableau of each LP (see DualSimplex.penalties()). Penalty
+    branching branches on the largest product of the penalties, and a child
+    whose bound lowered by its penalty is at most the incumbent value is
+    discarded without solving its LP. Penalties require DUAL_SIMPLEX and
+    serial mode and are skipped in complete enumeration, penalty branching
+    otherwise falls back to MOST_FRACTIONAL.
+
+    search_strategy is DEPTH_FIRST, BEST_FIRST, BEST_ESTIMATE,
+    HYBRID_PLUNGING or ADAPTIVE_SEARCH. Hybrid plunging dives into the child
+    with the better estimate as long as the bound of the node is within
+    plunge_fraction of the gap between the global upper bound and the
+    incumbent (of the absolute value of the upper bound while there is no
+    incumbent) and, if max_plunge_depth is given, the dive is less than
+    max_plunge_depth nodes long, and otherwise backtracks to the open node
+    with the best bound. Adaptive search starts depth first and switches to
+    best first once switch_patience forecasts of the gap in a row (see
+    forecasting.py) predict that it closes later than the one before. If
+    complete_enumeration is True, no node is pruned by bound.
+
+    If reduced_cost_fixing is True, the reduced costs of the LP of each node
+    fix variables in its subtree, and those of the root LP in every node,
+    which requires HIGHS, SCIPY or DUAL_SIMPLEX. heuristics is a list of
+    primal heuristics (SIMPLE_ROUNDING, FRACTIONAL_DIVING,
+    COEFFICIENT_DIVING, FIX_AND_PROPAGATE and GREEDY_FILL, see
+    Heuristics.py), which are run on the LP solution of the root and then
+    whenever heuristic_interval LPs have been solved since the last run, for
+    at most heuristic_time seconds (None for no limit). sub_mips is a list
+    of sub-MIP heuristics (RINS and LOCAL_BRANCHING), one of which is
+    started in a background process from the incumbent whenever
+    sub_mip_interval LPs have been solved since the last one and none is
+    running. A sub-MIP is solved with at most sub_mip_node_limit nodes and
+    starts sub-MIPs itself while sub_mip_depth is larger than one. Local
+    branching requires binary variables. Reduced cost fixing, heuristics and
+    sub-MIPs are skipped in complete enumeration.
+
+    If workers is larger than one, the relaxations are solved by a pool of
+    worker processes (parallel_mode PROCESSES) or threads (THREADS). If
+    deterministic is True, up to workers nodes are solved at a time and
+    processed in the order in which they were taken, so that every run
+    gives the same tree, otherwise nodes are processed as their solves
+    finish. If shared_incumbent, a SharedIncumbent (see StrategyRacing.py),
+    is given, every new best solution is stored in it and a better solution
+    stored by another search becomes the incumbent. If stop_event is given,
+    the search stops as soon as it is set.
+
+    If max_nodes_in_memory is given, at most that many open nodes are kept
+    in memory and the others are written to a temporary directory created
+    in spill_directory (see SpillingNodeQueue). If memory_limit is given,
+    the search plunges depth-first while the open nodes use more than that
+    many bytes (estimated). A tree T holds all nodes in memory, so pass None
+    for T to save memory.
+
+    If checkpoint_file is given, the state of the search is written to it
+    by a background thread every checkpoint_interval seconds and at the end,
+    including the tree T if checkpoint_tree is True. Passing a checkpoint
+    file as resume_from continues the search from it. The problem and the
+    strategies must be the same as in the original call, the limits may
+    differ.
+
+    The search stops early after time_limit seconds, once node_limit nodes
+    have been created, or once the relative gap between the incumbent and
+    the global upper bound is at most gap_limit or the absolute gap is at
+    most abs_gap_limit, if these are given. The gap limits are ignored in
+    complete enumeration. If stats, a dictionary, is given, the number of
+    nodes ('nodes'), LPs solved ('lp_count') and simplex iterations
+    ('lp_iter_count'), those of strong branching ('sb_lp_count',
+    'sb_lp_iter_count'), the LPs saved by penalties ('saved_lp_count'), the
+    variables fixed by the root reduced costs ('root_fixed') and the other
+    reduced cost fixings ('local_fixed'), the runs of the heuristics
+    ('heuristic_calls'), their new best solutions ('heuristic_solutions')
+    and LPs ('heuristic_lp_count'), the sub-MIPs started ('sub_mips'), their
+    nodes ('sub_mip_nodes') and new best solutions ('sub_mip_solutions'),
+    the running time in seconds ('time'), the global upper bound ('bound'),
+    the nodes removed from the queue by bound ('queue_pruned') and the
+    memory freed ('queue_freed'), the nodes written to files ('spilled') and
+    created while plunging because of memory_limit ('plunged'), the switches
+    of the search strategy as (nodes, old, new) triples
+    ('strategy_switches') and whether the search was stopped ('stopped') are
+    stored in it, which does not require a tree.
+
+    The algorithm reports its progress to observers, a list of BBObserver
+    objects (see Observers.py), and prints nothing itself. Pass a
+    ConsoleObserver to print the progress. If T is given, a TreeObserver
+    building the tree in T, displayed every display_interval nodes, is added
+    to the observers.
+
+    This is a generator, which yields after every yield_interval nodes, so
+    that the caller can do other work in between, stop the search early by
+    no longer iterating, or drive the search from an event loop. Each time,
+    a dictionary with the objective value of the incumbent ('incumbent'), a
+    copy of the incumbent ('solution'), the global upper bound ('bound'),
+    the relative gap between them ('gap', the difference divided by the
+    absolute value of the incumbent, None as long as there is no
+    incumbent), the number of open nodes ('open_nodes'), the number of
+    nodes created ('nodes') and the number of LPs solved ('lp_count') is
+    yielded. The last dictionary is yielded once the search is done. If
+    yield_interval is None, only the last dictionary is yielded.
+    '''
+    c = np.asarray(c, dtype = float)
+    b = np.asarray(b, dtype = float)
+    if not hasattr(A, 'tocsr'):
+        A = np.asarray(A, dtype = float)
+    numCons, numVars = A.shape
+    if var_names is None:
+        var_names = ["x"+str(j) for j in range(numVars)]
+    if observers is None:
+        observers = []
+    else:
+        observers = list(observers)
+    if T is not None:
+        observers.insert(0, TreeObserver(T, display_interval))
     # The initial lower bound
     LB = -INFINITY
     # The number of LP's solved, and the number of nodes solved
     node_count = 1
-    iter_count = 0
     lp_count = 0
+    # The total number of simplex iterations, if the LP solver reports them
+    lp_iter_count = 0
+    # The number of LPs solved and simplex iterations of strong branching
+    sb_lp_count = 0
+    sb_lp_iter_count = 0
+    # The number of children discarded by their penalties
+    saved_lp_count = 0
+    # Whether the LPs return reduced costs for reduced cost fixing
+    fixing = reduced_cost_fixing and not complete_enumeration
+    # The reduced costs, solution and value of the root LP, the bound
+    # changes they imply for every node, the incumbent value for which
+    # these were computed and the number of bound changes made at the other
+    # nodes
+    root_lp = None
+    root_fixings = []
+    fixed_LB = -INFINITY
+    local_fixed = 0
     
+    # Bounds of the variables in the root relaxation. Nodes only store their
+    # changes with respect to these bounds.
     if binary_vars:
-        var   = LpVariable.dicts("", VARIABLES, 0, 1)
+        lower = np.zeros(numVars)
+        upper = np.ones(numVars)
     else:
-        var   = LpVariable.dicts("", VARIABLES)
-    
-    numCons = len(CONSTRAINTS)
-    numVars = len(VARIABLES)
-    # List of incumbent solution variable values
-    opt = dict([(i, 0) for i in VARIABLES])
-    pseudo_u = dict((i, (OBJ[i], 0)) for i in VARIABLES)
-    pseudo_d = dict((i, (OBJ[i], 0)) for i in VARIABLES)
-    print("===========================================")
-    print("Starting Branch and Bound")
-    if branch_strategy == MOST_FRACTIONAL:
-        print("Most fractional variable")
-    elif branch_strategy == FIXED_BRANCHING:
-        print("Fixed order")
-    elif branch_strategy == PSEUDOCOST_BRANCHING:
-        print("Pseudocost brancing")
+        lower = np.full(numVars, -np.inf)
+        upper = np.full(numVars, np.inf)
+    root_bounds = list(zip(lower.tolist(), upper.tolist()))
+    if heuristics and not complete_enumeration:
+        primal_heuristics = PrimalHeuristics(c, A, b, lower, upper,
+                                             heuristics)
     else:
-        print("Unknown branching strategy %s" %branch_strategy)
-    if search_strategy == DEPTH_FIRST:
-        print("Depth first search strategy")
-    elif search_strategy == BEST_FIRST:
-        print("Best first search strategy")
+        primal_heuristics = None
+    # The number of LPs solved when the heuristics were last run
+    last_heuristic_lp = None
+    # The sub-MIPs run in a background process, which shares the incumbent
+    # with this search
+    own_incumbent = False
+    if sub_mips and not complete_enumeration:
+        for heuristic in sub_mips:
+            if heuristic not in (RINS, LOCAL_BRANCHING):
+                raise Exception('Unknown sub-MIP heuristic %s' %heuristic)
+        if shared_incumbent is None:
+            # StrategyRacing imports this module
+            from .StrategyRacing import SharedIncumbent
+            shared_incumbent = SharedIncumbent(numVars)
+            own_incumbent = True
+        sub_mip_stop = multiprocessing.Event()
+        sub_mip_executor = ProcessPoolExecutor(
+            1, initializer = _init_sub_mip_worker,
+            initargs = (shared_incumbent, sub_mip_stop))
+    else:
+        sub_mip_executor = None
+    # The running sub-MIP, the heuristic and the node it was started from,
+    # the number of LPs solved when it was started, the index of the next
+    # heuristic in sub_mips and the incumbent value each heuristic last
+    # started from
+    sub_mip_future = None
+    sub_mip_heuristic = sub_mip_node = None
+    last_sub_mip_lp = 0
+    sub_mip_turn = 0
+    sub_mip_LB = {}
+    # The number of sub-MIPs started, their nodes and solutions
+    sub_mip_count = 0
+    sub_mip_nodes = 0
+    sub_mip_solutions = 0
+    # The LP relaxation is loaded into the LP solver only once, in parallel
+    # mode once in each worker
+    if workers > 1:
+        if branch_strategy in (STRONG_BRANCHING, RELIABILITY_BRANCHING) or \
+                (primal_heuristics is not None and
+                 primal_heuristics.uses_lp()):
+            # The LPs of strong branching and diving are solved in this
+            # process
+            lp = CreateLPBackend(lp_solver)
+            lp.load(c, A, b, lower, upper, var_names)
+        else:
+            lp = None
+        if parallel_mode == THREADS:
+            Executor = ThreadPoolExecutor
+        else:
+            Executor = ProcessPoolExecutor
+        executor = Executor(workers, initializer = _init_worker,
+                            initargs = (lp_solver, c, A, b, lower, upper,
+                                        var_names, deterministic))
+    else:
+        lp = CreateLPBackend(lp_solver)
+        lp.load(c, A, b, lower, upper, var_names)
+        executor = None
+    # Whether the LP solver reports simplex iterations
+    lp_iterations_known = False
+    # Incumbent solution
+    opt = np.zeros(numVars)
+    # Pseudocosts, column 0 is the average and column 1 the number of
+    # observations
+    pseudo_u = np.column_stack((c, np.zeros(numVars)))
+    pseudo_d = np.column_stack((c, np.zeros(numVars)))
+    for observer in observers:
+        observer.started(var_names, branch_strategy, search_strategy,
+                         complete_enumeration, workers, parallel_mode,
+                         deterministic)
+    # List of candidate nodes. The queue also keeps track of the bounds of
+    # the nodes that have not been processed yet, which are the bounds of
+    # their parents.
+    if max_nodes_in_memory is not None:
+        Q = SpillingNodeQueue(max_nodes_in_memory, spill_directory,
+                              measure_memory = memory_limit is not None)
     else:
-        print("Unknown search strategy %s" %search_strategy)
-    print("===========================================")
-    # List of candidate nodes
-    Q = PriorityQueue()
+        Q = NodeQueue(measure_memory = memory_limit is not None)
+    # The number of nodes created while plunging because of memory_limit
+    plunged = 0
+    # The lengths of the dives of the nodes pushed onto the dive queue by
+    # HYBRID_PLUNGING
+    plunge_lengths = {}
+    # The search strategy in use, which ADAPTIVE_SEARCH switches when the
+    # forecaster of the gap between upper bound and incumbent says so
+    if search_strategy == ADAPTIVE_SEARCH:
+        current_strategy = DEPTH_FIRST
+    else:
+        current_strategy = search_strategy
+    gap_forecaster = ForecastingChainedSequences()
+    # The incumbent value of the current sequence of the forecaster, the
+    # number of forecasts made and the number of forecasts in a row that
+    # the gap closes later than before
+    forecast_LB = None
+    forecast_count = 0
+    receding = 0
+    strategy_switches = []
     # The current tree depth
     cur_depth = 0
     cur_index = 0
     # Timer
     timer = time.time()
-    Q.push(0, -INFINITY, (0, None, None, None, None, None, None))
+    # The incumbent value for which the queue was last pruned
+    pruned_LB = -INFINITY
+    # The number of nodes removed from the queue by bound and an estimate of
+    # the memory freed
+    queue_pruned = 0
+    queue_freed = 0
+    # The digest of A, by which checkpoints recognize the problem
+    if checkpoint_file is not None or resume_from is not None:
+        A_digest = _matrix_digest(A)
+    if resume_from is None:
+        Q.push(0, -INFINITY, (0, None, None, None, None, None, None, 0, (),
+                              None))
+    else:
+        with open(resume_from, 'rb') as f:
+            state = pickle.load(f)
+        if state['shape'] != A.shape or \
+                not np.array_equal(state['c'], c) or \
+                not np.array_equal(state['b'], b) or \
+                state.get('A_digest') != A_digest:
+            raise Exception('The checkpoint %s is for another problem'
+                            %resume_from)
+        if T is not None:
+            if state['tree'] is None:
+                raise Exception('The checkpoint %s does not contain a tree'
+                                %resume_from)
+            T.__dict__.update(pickle.loads(state['tree']).__dict__)
+            observers[0].iter_count, observers[0].branching = \
+                state['tree_observer']
+        LB = state['LB']
+        opt[:] = state['opt']
+        pseudo_u[:] = state['pseudo_u']
+        pseudo_d[:] = state['pseudo_d']
+        node_count = state['node_count']
+        lp_count = state['lp_count']
+        lp_iter_count = state['lp_iter_count']
+        lp_iterations_known = state['lp_iterations_known']
+        sb_lp_count, sb_lp_iter_count = state['strong_branching']
+        saved_lp_count = state['saved_lp_count']
+        root_lp, root_fixings, fixed_LB, local_fixed = \
+            state['reduced_cost_fixing']
+        last_heuristic_lp, heuristic_counts = state['heuristics']
+        (last_sub_mip_lp, sub_mip_turn, sub_mip_count, sub_mip_nodes,
+         sub_mip_solutions) = state['sub_mips']
+        if primal_heuristics is not None and heuristic_counts is not None:
+            (primal_heuristics.calls, primal_heuristics.found,
+             primal_heuristics.lp_count, primal_heuristics.lp_iter_count,
+             primal_heuristics.time) = heuristic_counts
+        timer -= state['time']
+        pruned_LB = state['pruned_LB']
+        queue_pruned = state['queue_pruned']
+        queue_freed = state['queue_freed']
+        plunged = state['plunged']
+        plunge_lengths.update(state['plunge_lengths'])
+        current_strategy = state['current_strategy']
+        gap_forecaster = state['gap_forecaster']
+        forecast_LB, forecast_count, receding = state['forecast']
+        strategy_switches = state['strategy_switches']
+        Q.restore(state['entries'], state['dive_entries'])
+        # The nodes whose processing was not finished are taken first
+        for node in state['in_flight']:
+            Q.push(node[0], -INFINITY, node, node[2], dive = True)
+        if hasattr(Q, 'spill_count'):
+            Q.spill_count += state['spilled']
+        del state
+    if complete_enumeration:
+        gap_limit = abs_gap_limit = None
+    # The nodes to be processed next, each with the results of its LP solve
+    # or None if it was not solved
+    current_round = deque()
+    # The nodes whose LP solves are running in asynchronous mode
+    running = {}
     # Branch and Bound Loop
-    while not Q.isEmpty():
-        infeasible = False
-        integer_solution = False
-        (cur_index, parent, relax, branch_var, branch_var_value, sense,
-        rhs) = Q.pop()
-        if cur_index != 0:
-            cur_depth = T.get_node_attr(parent, 'level') + 1
-        else:
-            cur_depth = 0
-        print("")
-        print("----------------------------------------------------")
-        print("")
-        if LB > -INFINITY:
-            print("Node: %s, Depth: %s, LB: %s" %(cur_index,cur_depth,LB))
-        else:
-            print("Node: %s, Depth: %s, LB: %s" %(cur_index,cur_depth,"None"))
-        if relax is not None and relax <= LB:
-            print("Node pruned immediately by bound")
-            T.set_node_attr(parent, 'color', 'red')
-            continue
-        #====================================
-        #    LP Relaxation
-        #====================================
-        # Compute lower bound by LP relaxation
-        prob = LpProblem("relax", LpMaximize)
-        prob += lpSum([OBJ[i]*var[i] for i in VARIABLES]), "Objective"
-        for j in range(numCons):
-            prob += (lpSum([MAT[i][j]*var[i] for i in VARIABLES])<=RHS[j],\
-                         CONSTRAINTS[j])
-        # Fix all prescribed variables
-        branch_vars = []
-        if cur_index != 0:
-            sys.stdout.write("Branching variables: ")
-            branch_vars.append(branch_var)
-            if sense == '>=':
-                prob += LpConstraint(lpSum(var[branch_var]) >= rhs)
-            else:
-                prob += LpConstraint(lpSum(var[branch_var]) <= rhs)
-            print(branch_var, end=' ')
-            pred = parent
-            while not str(pred) == '0':
-                pred_branch_var = T.get_node_attr(pred, 'branch_var')
-                pred_rhs = T.get_node_attr(pred, 'rhs')
-                pred_sense = T.get_node_attr(pred, 'sense')
-                if pred_sense == '<=':
-                    prob += LpConstraint(lpSum(var[pred_branch_var])
-                                         <= pred_rhs)
-                else:
-                    prob += LpConstraint(lpSum(var[pred_branch_var])
-                                         >= pred_rhs)
-                print(pred_branch_var, end=' ')
-                branch_vars.append(pred_branch_var)
-                pred = T.get_node_attr(pred, 'parent')
-            print()
-        # Solve the LP relaxation
-        prob.solve()
-        lp_count = lp_count +1
-        # Check infeasibility
-        infeasible = LpStatus[prob.status] == "Infeasible" or \
-            LpStatus[prob.status] == "Undefined"
-        # Print status
-        if infeasible:
-            print("LP Solved, status: Infeasible")
-        else:
-            print("LP Solved, status: %s, obj: %s" %(LpStatus[prob.status],
-                                                     value(prob.objective)))
-        if(LpStatus[prob.status] == "Optimal"):
-            relax = value(prob.objective)
-            # Update pseudocost
-            if branch_var != None:
-                if sense == '<=':
-                    pseudo_d[branch_var] = (
-                        ((pseudo_d[branch_var][0]*pseudo_d[branch_var][1] +
-                          ((T.get_node_attr(parent, 'obj') - relax)/
-                           (branch_var_value - rhs)))/(pseudo_d[branch_var][1]+1)),
-                           pseudo_d[branch_var][1]+1)
-                else:
-                    pseudo_u[branch_var] = (
-                    ((pseudo_u[branch_var][0]*pseudo_d[branch_var][1] +
-                     ((T.get_node_attr(parent, 'obj') - relax)/
-                     (rhs - branch_var_value)))/(pseudo_u[branch_var][1]+1)),
-                    pseudo_u[branch_var][1]+1)
-            var_values = dict([(i, var[i].varValue) for i in VARIABLES])
-            integer_solution = 1
-            for i in VARIABLES:
-                if (abs(round(var_values[i]) - var_values[i]) > .001):
-                    integer_solution = 0
+    # Whether the search was stopped before it was complete
+    stopped = None
+    # The number of nodes processed since the last progress report
+    nodes_since_yield = 0
+
+    def checkpoint():
+        '''
+        Returns the state of the search and the snapshot files of the node
+        queue.
+        '''
+        entries, dive_entries, files = Q.snapshot()
+        state = {'c' : c, 'b' : b, 'shape' : A.shape, 'A_digest' : A_digest,
+                 'LB' : LB, 'opt' : opt.copy(),
+                 'pseudo_u' : pseudo_u.copy(), 'pseudo_d' : pseudo_d.copy(),
+                 'node_count' : node_count, 'lp_count' : lp_count,
+                 'lp_iter_count' : lp_iter_count,
+                 'lp_iterations_known' : lp_iterations_known,
+                 'strong_branching' : (sb_lp_count, sb_lp_iter_count),
+                 'saved_lp_count' : saved_lp_count,
+                 'reduced_cost_fixing' : (root_lp, list(root_fixings),
+                                          fixed_LB, local_fixed),
+                 'heuristics' : (last_heuristic_lp, heuristic_counts()),
+                 'sub_mips' : (last_sub_mip_lp, sub_mip_turn, sub_mip_count,
+                               sub_mip_nodes, sub_mip_solutions),
+                 'time' : time.time() - timer, 'pruned_LB' : pruned_LB,
+                 'queue_pruned' : queue_pruned, 'queue_freed' : queue_freed,
+                 'plunged' : plunged, 'plunge_lengths' : dict(plunge_lengths),
+                 'current_strategy' : current_strategy,
+                 'gap_forecaster' : copy.deepcopy(gap_forecaster),
+                 'forecast' : (forecast_LB, forecast_count, receding),
+                 'strategy_switches' : list(strategy_switches),
+                 'spilled' : getattr(Q, 'spill_count', 0),
+                 'entries' : entries, 'dive_entries' : dive_entries,
+                 'in_flight' : ([node for (node, result) in current_round] +
+                                list(running.values())),
+                 'tree' : None}
+        if checkpoint_tree and T is not None:
+            state['tree'] = pickle.dumps(T, pickle.HIGHEST_PROTOCOL)
+            state['tree_observer'] = (observers[0].iter_count,
+                                      dict(observers[0].branching))
+        return state, files
+
+    def heuristic_counts():
+        '''
+        Returns the counters of the primal heuristics.
+        '''
+        if primal_heuristics is None:
+            return None
+        return (primal_heuristics.calls, primal_heuristics.found,
+                primal_heuristics.lp_count, primal_heuristics.lp_iter_count,
+                primal_heuristics.time)
+
+    def stop_sub_mips():
+        '''
+        Stops the running sub-MIP and its worker process.
+        '''
+        if sub_mip_executor is not None:
+            sub_mip_stop.set()
+            sub_mip_executor.shutdown(cancel_futures = True)
+
+    def pop_node():
+        '''
+        Takes the next node from the queue, with the bound changes from the
+        reduced costs of the root LP added to its record.
+        '''
+        node = Q.pop()
+        if root_fixings:
+            node = node[:8] + (_tighten_bounds(node[8], root_fixings,
+                                               root_bounds),) + node[9:]
+        return node
+    # The thread writing the last checkpoint
+    checkpoint_writer = None
+    last_checkpoint = time.time()
+    try:
+        while not Q.isEmpty() or current_round or running:
+            if stop_event is not None and stop_event.is_set():
+                stopped = 'stop event'
+                break
+            if time_limit is not None and time.time() - timer > time_limit:
+                stopped = 'time limit'
+                break
+            if node_limit is not None and node_count >= node_limit:
+                stopped = 'node limit'
+                break
+            if gap_limit is not None or abs_gap_limit is not None:
+                UB = _upper_bound(LB, Q)
+                if ((gap_limit is not None and LB > -INFINITY and
+                     _gap(LB, UB) <= gap_limit) or
+                    (abs_gap_limit is not None and UB - LB <= abs_gap_limit)):
+                    stopped = 'gap limit'
                     break
-            # Determine integer_infeasibility_count and
-            # Integer_infeasibility_sum for scatterplot and such
-            integer_infeasibility_count = 0
-            integer_infeasibility_sum = 0.0
-            for i in VARIABLES:
-                if (var_values[i] not in set([0,1])):
-                    integer_infeasibility_count += 1
-                    integer_infeasibility_sum += min([var_values[i],
-                                                      1.0-var_values[i]])
+            if yield_interval is not None and \
+                    nodes_since_yield >= yield_interval:
+                nodes_since_yield = 0
+                yield _progress(LB, opt, Q, node_count, lp_count)
+            if checkpoint_file is not None and \
+                    time.time() - last_checkpoint >= checkpoint_interval and \
+                    (checkpoint_writer is None or
+                     not checkpoint_writer.is_alive()):
+                # Only the snapshot is taken here, the checkpoint is written by
+                # another thread
+                last_checkpoint = time.time()
+                checkpoint_writer = threading.Thread(
+                    target = _write_checkpoint,
+                    args = (checkpoint_file,) + checkpoint())
+                checkpoint_writer.start()
+            if sub_mip_future is not None and sub_mip_future.done():
+                sub_mip_nodes += sub_mip_future.result()
+                sub_mip_future = None
+            if shared_incumbent is not None and shared_incumbent.value() > LB:
+                LB, opt[:] = shared_incumbent.get()
+                if own_incumbent:
+                    # Only sub-MIPs store better solutions
+                    sub_mip_solutions += 1
+                    for observer in observers:
+                        observer.heuristic_found(sub_mip_node,
+                                                 sub_mip_heuristic, LB,
+                                                 opt.copy())
+            if LB > pruned_LB:
+                # Remove the nodes pruned by the new incumbent from the queue
+                pruned_LB = LB
+                pruned, freed = Q.prune(LB)
+                if pruned:
+                    queue_pruned += len(pruned)
+                    queue_freed += freed
+                    for observer in observers:
+                        observer.queue_pruned(LB, [(node[0], node[1])
+                                                   for node in pruned], freed)
+                    if Q.isEmpty() and not current_round and not running:
+                        continue
+            if root_lp is not None and LB > fixed_LB:
+                # The bound changes from the root LP tighten with the incumbent
+                fixed_LB = LB
+                root_fixings = _reduced_cost_fixings(root_lp[0], root_lp[1],
+                                                     lower, upper,
+                                                     root_lp[2] - LB)
+            if not current_round:
+                # Take nodes from the queue and solve the relaxations of
+                # those that are not pruned by bound right away. LP solvers
+                # that support it may stop as soon as a node is known to be
+                # pruned by bound.
+                if executor is None or deterministic:
+                    nodes = []
+                    while not Q.isEmpty() and len(nodes) < workers:
+                        nodes.append(pop_node())
+                    if complete_enumeration or LB == -INFINITY:
+                        cutoff = None
+                    else:
+                        cutoff = LB
+                    tasks = [(node[8], node[9], cutoff, warm_start, fixing)
+                             for node in nodes
+                             if node[2] is None or node[2] > LB]
+                    if executor is None:
+                        results = [_solve_node(lp, *task) for task in tasks]
+                    else:
+                        results = list(executor.map(_solve_node_in_worker,
+                                                    tasks))
+                    results = iter(results)
+                    for node in nodes:
+                        if node[2] is None or node[2] > LB:
+                            current_round.append((node, next(results)))
+                        else:
+                            current_round.append((node, None))
+                else:
+                    while not Q.isEmpty() and len(running) < workers:
+                        node = pop_node()
+                        if node[2] is not None and node[2] <= LB:
+                            current_round.append((node, None))
+                            continue
+                        if complete_enumeration or LB == -INFINITY:
+                            cutoff = None
+                        else:
+                            cutoff = LB
+                        future = executor.submit(_solve_node_in_worker,
+                                                 (node[8], node[9], cutoff,
+                                                  warm_start, fixing))
+                        running[future] = node
+                    if not current_round:
+                        done, not_done = wait(running,
+                                              return_when = FIRST_COMPLETED)
+                        for future in sorted(done,
+                                             key = lambda f: running[f][0]):
+                            current_round.append((running.pop(future),
+                                                  future.result()))
+            infeasible = False
+            integer_solution = False
+            ((cur_index, parent, relax, branch_var, branch_var_value, sense,
+              rhs, cur_depth, bounds, basis), result) = current_round.popleft()
+            nodes_since_yield += 1
+            Q.processed(cur_index)
+            plunge_length = plunge_lengths.pop(cur_index, 0)
+            if result is not None:
+                lp_count = lp_count +1
+                if result[3] is not None:
+                    lp_iterations_known = True
+                    lp_iter_count += result[3]
+            # The bound of the parent is stored with the node
+            parent_relax = relax
+            if relax is not None and relax <= LB:
+                for observer in observers:
+                    observer.pruned(cur_index, parent, cur_depth, LB,
+                                    'parent bound', relax)
+                continue
+            #====================================
+            #    LP Relaxation
+            #====================================
+            # The LP relaxation was solved above with the bound changes
+            # recorded for the node, here we only process the result.
+            (lp_status, lp_value, var_values, lp_iterations, lp_basis,
+             lp_reduced_costs) = result
+            # Check infeasibility
+            infeasible = lp_status == "Infeasible" or lp_status == "Undefined"
+            if(lp_status == "Optimal"):
+                relax = lp_value
+                # Update pseudocost
+                if branch_var != None:
+                    _update_pseudocosts(pseudo_u, pseudo_d, branch_var,
+                                        branch_var_value, sense, rhs,
+                                        parent_relax, relax)
+                frac = np.minimum(var_values - np.floor(var_values),
+                                  np.ceil(var_values) - var_values)
+                integer_solution = not (np.abs(np.round(var_values) -
+                                               var_values) > .001).any()
+                if integer_solution:
+                    # Remove the round-off error of the LP solver
+                    var_values = np.round(var_values)
+                    relax = float(c.dot(var_values))
+            elif lp_status == "Cutoff":
+                # Only a bound on the LP value is known, which prunes the node
+                relax = lp_value
+            else:
+                relax = INFINITY
+            for observer in observers:
+                observer.node_solved(cur_index, cur_depth, LB, bounds,
+                                     lp_status, lp_value, lp_iterations,
+                                     var_values, relax, integer_solution)
             if (integer_solution and relax>LB):
                 LB = relax
-                for i in VARIABLES:
-                    # These two have different data structures first one
-                    #list, second one dictionary
-                    opt[i] = var_values[i]
-                print("New best solution found, objective: %s" %relax)
-                for i in VARIABLES:
-                    if var_values[i] > 0:
-                        print("%s = %s" %(i, var_values[i]))
-            elif (integer_solution and relax<=LB):
-                print("New integer solution found, objective: %s" %relax)
-                for i in VARIABLES:
-                    if var_values[i] > 0:
-                        print("%s = %s" %(i, var_values[i]))
-            else:
-                print("Fractional solution:")
-                for i in VARIABLES:
-                    if var_values[i] > 0:
-                        print("%s = %s" %(i, var_values[i]))
+                opt[:] = var_values
+                if shared_incumbent is not None:
+                    shared_incumbent.update(relax, var_values)
+                for observer in observers:
+                    observer.incumbent_found(cur_index, relax, var_values)
             #For complete enumeration
-            if complete_enumeration:
+            if complete_enumeration and lp_status == "Optimal":
                 relax = LB - 1
-        else:
-            relax = INFINITY
-        if integer_solution:
-            print("Integer solution")
-            BBstatus = 'S'
-            status = 'integer'
-            color = 'lightblue'
-        elif infeasible:
-            print("Infeasible node")
-            BBstatus = 'I'
-            status = 'infeasible'
-            color = 'orange'
-        elif not complete_enumeration and relax <= LB:
-            print("Node pruned by bound (obj: %s, UB: %s)" %(relax,LB))
-            BBstatus = 'P'
-            status = 'fathomed'
-            color = 'red'
-        elif cur_depth >= numVars :
-            print("Reached a leaf")
-            BBstatus = 'fathomed'
-            status = 'L'
-        else:
-            BBstatus = 'C'
-            status = 'candidate'
-            color = 'yellow'
-        if BBstatus == 'I':
-            if T.get_layout() == 'dot2tex':
-                label = r'\text{I}'
-            else:
-                label = 'I'
-        else:
-            label = "%.1f"%relax
-        if iter_count == 0:
-            if status != 'candidate':
-                integer_infeasibility_count = None
-                integer_infeasibility_sum = None
-            if status == 'fathomed':
-                if T._incumbent_value is None:
-                    print('WARNING: Encountered "fathom" line before '+\
-                        'first incumbent.')
-            T.AddOrUpdateNode(0, None, None, 'candidate', relax,
-                             integer_infeasibility_count,
-                             integer_infeasibility_sum,
-                             label = label,
-                             obj = relax, color = color,
-                             style = 'filled', fillcolor = color)
-            if status == 'integer':
-                T._previous_incumbent_value = T._incumbent_value
-                T._incumbent_value = relax
-                T._incumbent_parent = -1
-                T._new_integer_solution = True
-#           #Currently broken
-#           if ETREE_INSTALLED and T.attr['display'] == 'svg':
-#               T.write_as_svg(filename = "node%d" % iter_count,
-#                                 nextfile = "node%d" % (iter_count + 1),
-#                                 highlight = cur_index)
-        else:
-            _direction = {'<=':'L', '>=':'R'}
-            if status == 'infeasible':
-                integer_infeasibility_count = T.get_node_attr(parent,
-                                     'integer_infeasibility_count')
-                integer_infeasibility_sum = T.get_node_attr(parent,
-                                     'integer_infeasibility_sum')
-                relax = T.get_node_attr(parent, 'lp_bound')
-            elif status == 'fathomed':
-                if T._incumbent_value is None:
-                    print('WARNING: Encountered "fathom" line before'+\
-                        ' first incumbent.')
-                    print('  This may indicate an error in the input file.')
-            elif status == 'integer':
-                integer_infeasibility_count = None
-                integer_infeasibility_sum = None
-            T.AddOrUpdateNode(cur_index, parent, _direction[sense],
-                                 status, relax,
-                                 integer_infeasibility_count,
-                                 integer_infeasibility_sum,
-                                 branch_var = branch_var,
-                                 branch_var_value = var_values[branch_var],
-                                 sense = sense, rhs = rhs, obj = relax,
-                                 color = color, style = 'filled',
-                                 label = label, fillcolor = color)
-            if status == 'integer':
-                T._previous_incumbent_value = T._incumbent_value
-                T._incumbent_value = relax
-                T._incumbent_parent = parent
-                T._new_integer_solution = True
-            # Currently Broken
-#           if ETREE_INSTALLED and T.attr['display'] == 'svg':
-#               T.write_as_svg(filename = "node%d" % iter_count,
-#                                 prevfile = "node%d" % (iter_count - 1),
-#                                 nextfile = "node%d" % (iter_count + 1),
-#                                 highlight = cur_index)
-            if T.get_layout() == 'dot2tex':
-                _dot2tex_label = {'>=':' \geq ', '<=':' \leq '}
-                T.set_edge_attr(parent, cur_index, 'label',
-                                   str(branch_var) + _dot2tex_label[sense] +
-                                   str(rhs))
+            if integer_solution:
+                BBstatus = 'integer'
+            elif infeasible:
+                BBstatus = 'infeasible'
+            elif not complete_enumeration and relax <= LB:
+                BBstatus = 'bound'
+            elif cur_depth >= numVars :
+                BBstatus = 'leaf'
             else:
-                T.set_edge_attr(parent, cur_index, 'label',
-                                   str(branch_var) + sense + str(rhs))
-        iter_count += 1
-        if BBstatus == 'C':
-            # Branching:
-            # Choose a variable for branching
-            branching_var = None
-            if branch_strategy == FIXED_BRANCHING:
-                #fixed order
-                for i in VARIABLES:
-                    frac = min(var[i].varValue-math.floor(var[i].varValue),
-                               math.ceil(var[i].varValue) - var[i].varValue)
-                    if (frac > 0):
-                        min_frac = frac
-                        branching_var = i
-                        # TODO(aykut): understand this break
+                BBstatus = 'C'
+            if BBstatus != 'C':
+                for observer in observers:
+                    observer.pruned(cur_index, parent, cur_depth, LB, BBstatus,
+                                    relax)
+            if BBstatus == 'C' and lp_reduced_costs is not None:
+                if cur_index == 0:
+                    root_lp = (lp_reduced_costs, var_values, relax)
+                if LB > -INFINITY:
+                    # Fix variables by their reduced costs in the subtree of
+                    # this node
+                    changes = _reduced_cost_fixings(lp_reduced_costs,
+                                                    var_values,
+                                                    *_node_bounds(bounds,
+                                                                  lower,
+                                                                  upper),
+                                                    relax - LB)
+                    if changes:
+                        local_fixed += len(changes)
+                        bounds = _tighten_bounds(bounds, changes, root_bounds)
+            if BBstatus == 'C':
+                # Branching:
+                # Penalties of the fractional variables, from the final
+                # tableau of the LP of this node
+                node_penalties = None
+                if (penalties or branch_strategy == PENALTY_BRANCHING) and \
+                        executor is None and not complete_enumeration:
+                    candidates = np.flatnonzero(frac > .001)
+                    node_penalties = lp.penalties(candidates, integer = True)
+                # Choose a variable for branching
+                if branch_strategy == PENALTY_BRANCHING:
+                    if node_penalties is not None:
+                        scores = (np.maximum(node_penalties[0], 1e-6)*
+                                  np.maximum(node_penalties[1], 1e-6))
+                        branching_var = int(candidates[np.argmax(scores)])
+                    else:
+                        branching_var = _select_branching_var(
+                            MOST_FRACTIONAL, var_values, frac, pseudo_u,
+                            pseudo_d)
+                elif branch_strategy in (STRONG_BRANCHING,
+                                         RELIABILITY_BRANCHING):
+                    branching_var, results, count, iterations = \
+                        _strong_branching(lp, branch_strategy, var_values,
+                                          frac, relax, bounds, lp_basis,
+                                          root_bounds, pseudo_u, pseudo_d,
+                                          strong_branching_candidates,
+                                          strong_branching_iterations,
+                                          reliability)
+                    sb_lp_count += count
+                    if iterations is not None:
+                        sb_lp_iter_count += iterations
+                    if results:
+                        for observer in observers:
+                            observer.strong_branched(cur_index, results, count,
+                                                     iterations)
+                else:
+                    branching_var = _select_branching_var(branch_strategy,
+                                                          var_values, frac,
+                                                          pseudo_u, pseudo_d)
+                #Create new nodes
+                # Plunge depth-first while the open nodes use too much
+                # memory
+                plunge = memory_limit is not None and Q.memory > memory_limit
+                if plunge:
+                    plunged += 2
+                    priority = _child_priorities(DEPTH_FIRST, cur_depth, relax,
+                                                 var_values, branching_var,
+                                                 pseudo_u, pseudo_d)
+                else:
+                    priority = _child_priorities(current_strategy, cur_depth,
+                                                 relax, var_values,
+                                                 branching_var, pseudo_u,
+                                                 pseudo_d)
+                dive = (plunge, plunge)
+                if search_strategy == HYBRID_PLUNGING and not plunge and \
+                        (max_plunge_depth is None or
+                         plunge_length < max_plunge_depth) and \
+                        _within_plunge_fraction(relax, max(Q.bound(), relax),
+                                                LB, plunge_fraction):
+                    # Dive into one child, the other one waits in the queue
+                    if _dive_child(relax, var_values, branching_var, pseudo_u,
+                                   pseudo_d) == 0:
+                        dive = (True, False)
+                        plunge_lengths[node_count + 1] = plunge_length + 1
+                    else:
+                        dive = (False, True)
+                        plunge_lengths[node_count + 2] = plunge_length + 1
+                j = branching_var
+                # The bounds of the children, lowered by their penalties. A
+                # child whose bound is at most LB is discarded without solving
+                # its LP.
+                child_bounds = [relax, relax]
+                if node_penalties is not None and j in candidates:
+                    position = int(np.flatnonzero(candidates == j)[0])
+                    child_bounds = [relax - node_penalties[0][position],
+                                    relax - node_penalties[1][position]]
+                discarded = []
+                # Both children start from the optimal basis of this node
+                basis = lp_basis
+                children = [('<=', math.floor(var_values[j])),
+                            ('>=', math.ceil(var_values[j]))]
+                for k, (sense, rhs) in enumerate(children):
+                    node_count += 1
+                    if child_bounds[k] <= LB:
+                        discarded.append((node_count, child_bounds[k]))
+                        plunge_lengths.pop(node_count, None)
+                        continue
+                    Q.push(node_count, priority[k], (node_count, cur_index,
+                            relax, j, var_values[j], sense, rhs, cur_depth + 1,
+                            _add_bound_change(bounds, j, sense, rhs,
+                                              root_bounds),
+                            basis), child_bounds[k], dive[k])
+                for observer in observers:
+                    observer.branched(cur_index, relax, j, var_values[j],
+                                      node_count - 1, node_count)
+                for index, child_bound in discarded:
+                    saved_lp_count += 1
+                    for observer in observers:
+                        observer.pruned(index, cur_index, cur_depth + 1, LB,
+                                        'penalty', child_bound)
+                if primal_heuristics is not None and \
+                        lp_status == 'Optimal' and \
+                        (last_heuristic_lp is None or
+                         lp_count - last_heuristic_lp >= heuristic_interval):
+                    # Look for a better solution near the LP solution. This
+                    # is done last, since diving changes the state of the LP
+                    # solver.
+                    last_heuristic_lp = lp_count
+                    found = primal_heuristics.run(var_values, LB, lp, bounds,
+                                                  lp_basis, heuristic_time)
+                    if found is not None:
+                        heuristic, LB, solution = found
+                        opt[:] = solution
+                        if shared_incumbent is not None:
+                            shared_incumbent.update(LB, solution)
+                        for observer in observers:
+                            observer.heuristic_found(cur_index, heuristic, LB,
+                                                     solution)
+                if sub_mip_executor is not None and \
+                        sub_mip_future is None and LB > -INFINITY and \
+                        lp_status == 'Optimal' and \
+                        lp_count - last_sub_mip_lp >= sub_mip_interval:
+                    # Start the next sub-MIP that can be built
+                    for turn in range(len(sub_mips)):
+                        heuristic = sub_mips[(sub_mip_turn + turn)%
+                                             len(sub_mips)]
+                        if heuristic == RINS:
+                            sub_mip = _rins_sub_mip(c, A, b, opt, var_values)
+                        elif heuristic == LOCAL_BRANCHING and binary_vars and \
+                                sub_mip_LB.get(heuristic) != LB:
+                            sub_mip = _local_branching_sub_mip(c, A, b, opt,
+                                                               10)
+                        else:
+                            sub_mip = None
+                        if sub_mip is None:
+                            continue
+                        options = {'branch_strategy' : branch_strategy,
+                                   'search_strategy' : search_strategy,
+                                   'binary_vars' : binary_vars,
+                                   'lp_solver' : lp_solver,
+                                   'warm_start' : warm_start,
+                                   'node_limit' : sub_mip_node_limit,
+                                   'heuristics' : heuristics,
+                                   'heuristic_interval' : heuristic_interval,
+                                   'heuristic_time' : heuristic_time}
+                        if sub_mip_depth > 1:
+                            options.update(sub_mips = sub_mips,
+                                           sub_mip_interval = sub_mip_interval,
+                                           sub_mip_node_limit =
+                                               sub_mip_node_limit,
+                                           sub_mip_depth = sub_mip_depth - 1)
+                        sub_mip_future = sub_mip_executor.submit(
+                            _solve_sub_mip, sub_mip + (opt.copy(), options))
+                        sub_mip_heuristic, sub_mip_node = heuristic, cur_index
+                        sub_mip_LB[heuristic] = LB
+                        sub_mip_turn = (sub_mip_turn + turn + 1)%len(sub_mips)
+                        sub_mip_count += 1
                         break
-            elif branch_strategy == MOST_FRACTIONAL:
-                #most fractional variable
-                min_frac = -1
-                for i in VARIABLES:
-                    frac = min(var[i].varValue-math.floor(var[i].varValue),
-                               math.ceil(var[i].varValue)- var[i].varValue)
-                    if (frac> min_frac):
-                        min_frac = frac
-                        branching_var = i
-            elif branch_strategy == PSEUDOCOST_BRANCHING:
-                scores = {}
-                for i in VARIABLES:
-                    # find the fractional solutions
-                    if (var[i].varValue - math.floor(var[i].varValue)) != 0:
-                        scores[i] = min(pseudo_u[i][0]*(1-var[i].varValue),
-                                        pseudo_d[i][0]*var[i].varValue)
-                    # sort the dictionary by value
-                branching_var = sorted(list(scores.items()),
-                                       key=lambda x : x[1])[-1][0]
-            else:
-                print("Unknown branching strategy %s" %branch_strategy)
-                exit()
-            if branching_var is not None:
-                print("Branching on variable %s" %branching_var)
-            #Create new nodes
-            if search_strategy == DEPTH_FIRST:
-                priority = (-cur_depth - 1, -cur_depth - 1)
-            elif search_strategy == BEST_FIRST:
-                priority = (-relax, -relax)
-            elif search_strategy == BEST_ESTIMATE:
-                priority = (-relax - pseudo_d[branching_var][0]*\
-                                 (math.floor(var[branching_var].varValue) -\
-                                      var[branching_var].varValue),
-                            -relax + pseudo_u[branching_var][0]*\
-                                 (math.ceil(var[branching_var].varValue) -\
-                                      var[branching_var].varValue))
-            node_count += 1
-            Q.push(node_count, priority[0], (node_count, cur_index, relax, branching_var,
-                    var_values[branching_var],
-                    '<=', math.floor(var[branching_var].varValue)))
-            node_count += 1
-            Q.push(node_count, priority[1], (node_count, cur_index, relax, branching_var,
-                    var_values[branching_var],
-                    '>=', math.ceil(var[branching_var].varValue)))
-            T.set_node_attr(cur_index, color, 'green')
-        if T.root is not None and display_interval is not None and\
-                iter_count%display_interval == 0:
-            T.display(count=iter_count)
-
-    timer = int(math.ceil((time.time()-timer)*1000))
-    print("")
-    print("===========================================")
-    print("Branch and bound completed in %sms" %timer)
-    print("Strategy: %s" %branch_strategy)
-    if complete_enumeration:
-        print("Complete enumeration")
-    print("%s nodes visited " %node_count)
-    print("%s LP's solved" %lp_count)
-    print("===========================================")
-    print("Optimal solution")
-    #print optimal solution
-    for i in sorted(VARIABLES):
-        if opt[i] > 0:
-            print("%s = %s" %(i, opt[i]))
-    print("Objective function value")
-    print(LB)
-    print("===========================================")
-    if T.attr['display'] != 'off':
-        T.display(count=iter_count)
-    T._lp_count = lp_count
-    return opt, LB
+                    last_sub_mip_lp = lp_count
+                if search_strategy == ADAPTIVE_SEARCH and \
+                        current_strategy == DEPTH_FIRST and LB > -INFINITY:
+                    if LB != forecast_LB:
+                        forecast_LB = LB
+                        gap_forecaster.StartNewSequence(1.0)
+                    gap_forecaster.AddMeasure(node_count,
+                                              _upper_bound(LB, Q) - LB,
+                                              Q.open_nodes(), node_count)
+                    forecasts = gap_forecaster.GetAllForecasts()
+                    if len(forecasts) > forecast_count:
+                        forecast_count = len(forecasts)
+                        if forecast_count > 1 and \
+                                forecasts[-1].forecast > \
+                                forecasts[-2].forecast:
+                            receding += 1
+                        else:
+                            receding = 0
+                    if receding >= switch_patience:
+                        current_strategy = BEST_FIRST
+                        Q.reprioritize(lambda bound, node: -bound)
+                        strategy_switches.append((node_count, DEPTH_FIRST,
+                                                  BEST_FIRST))
+                        for observer in observers:
+                            observer.strategy_switched(node_count, DEPTH_FIRST,
+                                                       BEST_FIRST,
+                                                       'the gap curve is flat')
+
+        stop_sub_mips()
+        if sub_mip_future is not None and not sub_mip_future.cancelled():
+            sub_mip_nodes += sub_mip_future.result()
+        if own_incumbent and shared_incumbent.value() > LB:
+            # A solution stored by the last sub-MIP
+            LB, opt[:] = shared_incumbent.get()
+            sub_mip_solutions += 1
+            for observer in observers:
+                observer.heuristic_found(sub_mip_node, sub_mip_heuristic, LB,
+                                         opt.copy())
+        if checkpoint_writer is not None:
+            checkpoint_writer.join()
+        if checkpoint_file is not None:
+            _write_checkpoint(checkpoint_file, *checkpoint())
+    finally:
+        # Also when the caller abandoned the search or an observer raised
+        if executor is not None:
+            executor.shutdown(cancel_futures = True)
+        stop_sub_mips()
+        if checkpoint_writer is not None:
+            checkpoint_writer.join()
+        Q.close()
+    timer = time.time()-timer
+    if lp_iterations_known:
+        total_iterations = lp_iter_count
+    else:
+        total_iterations = None
+    for observer in observers:
+        observer.finished(LB, opt, node_count, lp_count, total_iterations,
+                          timer, stopped)
+    if stats is not None:
+        stats['nodes'] = node_count
+        stats['lp_count'] = lp_count
+        stats['lp_iter_count'] = lp_iter_count
+        stats['sb_lp_count'] = sb_lp_count
+        stats['sb_lp_iter_count'] = sb_lp_iter_count
+        stats['saved_lp_count'] = saved_lp_count
+        stats['root_fixed'] = len(root_fixings)
+        stats['local_fixed'] = local_fixed
+        counts = heuristic_counts()
+        if counts is None:
+            counts = (0, 0, 0, 0, 0.0)
+        stats['heuristic_calls'] = counts[0]
+        stats['heuristic_solutions'] = counts[1]
+        stats['heuristic_lp_count'] = counts[2]
+        stats['sub_mips'] = sub_mip_count
+        stats['sub_mip_nodes'] = sub_mip_nodes
+        stats['sub_mip_solutions'] = sub_mip_solutions
+        stats['time'] = timer
+        stats['bound'] = _upper_bound(LB, Q)
+        stats['queue_pruned'] = queue_pruned
+        stats['queue_freed'] = queue_freed
+        stats['spilled'] = getattr(Q, 'spill_count', 0)
+        stats['plunged'] = plunged
+        stats['strategy_switches'] = strategy_switches
+        stats['stopped'] = stopped is not None
+    yield _progress(LB, opt, Q, node_count, lp_count)
 
 if __name__ == '__main__':    
     T = BBTree()
@@ -431,5 +1435,6 @@ if __name__ == '__main__':
     BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS,
                    branch_strategy = MOST_FRACTIONAL,
                    search_strategy = BEST_FIRST,
-                   display_interval = 1)
+                   display_interval = 1,
+                   observers = [ConsoleObserver()])
 
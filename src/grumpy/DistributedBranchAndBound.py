@@ -0,0 +1,489 @@
+__author__ = 'Ted Ralphs'
+__maintainer__ = 'Ted Ralphs (ted@lehigh.edu)'
+
+"""
+Branch and bound distributed over several processes, possibly on several
+machines.
+
+A coordinator owns the queue of open nodes and the incumbent. Workers
+connect to it over TCP using multiprocessing.connection, load the root
+relaxation once and then repeatedly take a node from the coordinator. A
+node is sent as its bound change record, together with the basis to warm
+start from. Starting from the node, a worker dives: after branching, it
+keeps one child and goes on with it, up to max_dive times, and returns the
+other children to the coordinator. Only when a dive ends does the worker
+report back. It then sends the processed nodes, the open children and the
+integer solutions it found, all in one message, which cuts down on
+communication. The coordinator reports the processed nodes to its observers
+(see Observers.py), for example a TreeObserver building a BBTree for
+visualization.
+
+The coordinator is started by DistributedBranchAndBound(), which can also
+start local worker processes. Workers on other machines are started with
+DistributedWorker(), given the address of the coordinator and the key that
+authenticates the connections. Messages are pickles, so anyone who knows
+the key can run code on the coordinator and the workers. Keep it secret.
+"""
+
+import sys, os, math, time, threading, queue, ipaddress
+from multiprocessing import Process
+from multiprocessing.connection import Listener, Client
+try:
+    from src.blimpy import PriorityQueue
+except ImportError:
+    from coinor.blimpy import PriorityQueue
+import numpy as np
+from .BBTree import MOST_FRACTIONAL, DEPTH_FIRST, INFINITY, PROCESSES
+from .LPBackends import CreateLPBackend, PULP
+from .BranchAndBound import _add_bound_change, _solve_node
+from .BranchAndBound import _update_pseudocosts, _select_branching_var
+from .BranchAndBound import _child_priorities
+from .Observers import TreeObserver
+
+def _is_loopback(host):
+    '''
+    Returns True if host is a name or address of this machine that cannot
+    be reached from other machines.
+    '''
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+class _Coordinator(object):
+    '''
+    The open nodes and the incumbent, shared by the threads serving the
+    workers. Processed nodes are put into the queue events, from which the
+    main thread of the coordinator adds them to the tree.
+    '''
+    def __init__(self, problem, numVars, max_dive):
+        self.problem = problem
+        self.lock = threading.Lock()
+        self.Q = PriorityQueue()
+        self.Q.push(0, -INFINITY,
+                    (0, None, None, None, None, None, None, 0, (), None))
+        self.LB = -INFINITY
+        self.opt = np.zeros(numVars)
+        # Node indices are handed out in blocks, one for each dive
+        self.next_index = 1
+        self.block_size = 2*(max_dive + 1)
+        # Number of nodes taken by workers whose results are not back yet
+        self.busy = 0
+        self.events = queue.Queue()
+        self.done = threading.Event()
+        self.lp_count = 0
+        self.lp_iter_count = 0
+        self.lp_iterations_known = False
+        # Number of workers connected and the time a worker last connected,
+        # took a node or reported back
+        self.connections = 0
+        self.last_activity = time.time()
+
+    def connect(self, connected):
+        '''
+        Records that a worker connected, or disconnected if connected is
+        False.
+        '''
+        with self.lock:
+            if connected:
+                self.connections += 1
+            else:
+                self.connections -= 1
+            self.last_activity = time.time()
+
+    def get_work(self):
+        '''
+        Returns the next node for a worker. Nodes that are pruned by bound
+        are reported as processed and skipped. Once the search is done or
+        given up, workers are told so.
+        '''
+        with self.lock:
+            if self.done.is_set():
+                return ('done',)
+            while not self.Q.isEmpty():
+                node = self.Q.pop()
+                relax = node[2]
+                if relax is not None and relax <= self.LB:
+                    self.events.put(('pruned', node))
+                    continue
+                self.busy += 1
+                block = (self.next_index, self.next_index + self.block_size)
+                self.next_index += self.block_size
+                self.last_activity = time.time()
+                return ('node', node, self.LB, block)
+            if self.busy == 0:
+                self.done.set()
+                return ('done',)
+            return ('wait',)
+
+    def put_results(self, results):
+        '''
+        Stores the results of a dive of a worker.
+        '''
+        events, children, solutions, lp_count, lp_iter_count = results
+        with self.lock:
+            self.busy -= 1
+            self.last_activity = time.time()
+            for value, x in solutions:
+                if value > self.LB:
+                    self.LB = value
+                    self.opt = x
+            for priority, node in children:
+                self.Q.push(node[0], priority, node)
+            self.lp_count += lp_count
+            if lp_iter_count is not None:
+                self.lp_iterations_known = True
+                self.lp_iter_count += lp_iter_count
+            for event in events:
+                self.events.put(('processed', event))
+
+    def requeue(self, node):
+        '''
+        Puts back the node of a worker that disconnected during its dive.
+        '''
+        with self.lock:
+            self.busy -= 1
+            self.Q.push(node[0], -INFINITY, node)
+
+def _serve(coordinator, conn):
+    '''
+    Serves the requests of a worker on connection conn.
+    '''
+    coordinator.connect(True)
+    node = None
+    try:
+        while True:
+            request = conn.recv()
+            if request[0] == 'problem':
+                conn.send(coordinator.problem)
+            elif request[0] == 'work':
+                if request[1] is not None:
+                    coordinator.put_results(request[1])
+                    node = None
+                reply = coordinator.get_work()
+                if reply[0] == 'node':
+                    node = reply[1]
+                conn.send(reply)
+                if reply[0] == 'done':
+                    break
+    except (EOFError, OSError):
+        if node is not None:
+            coordinator.requeue(node)
+    conn.close()
+    coordinator.connect(False)
+
+def _accept(coordinator, listener):
+    '''
+    Accepts connections of workers until the search is done.
+    '''
+    while not coordinator.done.is_set():
+        try:
+            conn = listener.accept()
+        except Exception:
+            continue
+        if coordinator.done.is_set():
+            conn.close()
+            break
+        thread = threading.Thread(target = _serve,
+                                  args = (coordinator, conn))
+        thread.daemon = True
+        thread.start()
+
+def _dive(lp, node, LB, block, problem, pseudo_u, pseudo_d):
+    '''
+    Processes node and dives from it. Returns the processed nodes, the open
+    children with their priorities, the integer solutions found, the number
+    of LPs solved and the number of simplex iterations. A processed node is
+    recorded with the arguments of BBObserver.node_solved() and its
+    outcome, the reason it was pruned or the branching variable and the
+    indices of its children.
+    '''
+    c = problem['c']
+    numVars = len(c)
+    root_bounds = problem['root_bounds']
+    max_dive = problem['max_dive']
+    next_index = block[0]
+    events = []
+    children = []
+    solutions = []
+    lp_count = 0
+    lp_iter_count = None
+    dive_count = 0
+    stack = [node]
+    while stack:
+        (cur_index, parent, relax, branch_var, branch_var_value, sense,
+         rhs, cur_depth, bounds, basis) = stack.pop()
+        parent_relax = relax
+        if LB > -INFINITY:
+            cutoff = LB
+        else:
+            cutoff = None
+        lp_status, lp_value, var_values, lp_iterations, lp_basis, _ = \
+            _solve_node(lp, bounds, basis, cutoff, problem['warm_start'])
+        lp_count += 1
+        if lp_iterations is not None:
+            lp_iter_count = (lp_iter_count or 0) + lp_iterations
+        integer_solution = False
+        if lp_status == 'Optimal':
+            relax = lp_value
+            if branch_var is not None:
+                _update_pseudocosts(pseudo_u, pseudo_d, branch_var,
+                                    branch_var_value, sense, rhs,
+                                    parent_relax, relax)
+            frac = np.minimum(var_values - np.floor(var_values),
+                              np.ceil(var_values) - var_values)
+            integer_solution = not (np.abs(np.round(var_values) - var_values)
+                                    > .001).any()
+            if integer_solution:
+                var_values = np.round(var_values)
+                relax = float(c.dot(var_values))
+        elif lp_status == 'Cutoff':
+            relax = lp_value
+        else:
+            relax = INFINITY
+        solved = (cur_index, cur_depth, LB, bounds, lp_status, lp_value,
+                  lp_iterations, var_values, relax, integer_solution)
+        if integer_solution:
+            events.append((solved, parent, 'integer'))
+            if relax > LB:
+                LB = relax
+                solutions.append((relax, var_values))
+            continue
+        elif lp_status not in ['Optimal', 'Cutoff']:
+            events.append((solved, parent, 'infeasible'))
+            continue
+        elif relax <= LB:
+            events.append((solved, parent, 'bound'))
+            continue
+        j = _select_branching_var(problem['branch_strategy'], var_values,
+                                  frac, pseudo_u, pseudo_d)
+        events.append((solved, parent, (j, next_index, next_index + 1)))
+        priority = _child_priorities(problem['search_strategy'], cur_depth,
+                                     relax, var_values, j, pseudo_u, pseudo_d)
+        down = (next_index, cur_index, relax, j, var_values[j], '<=',
+                math.floor(var_values[j]), cur_depth + 1,
+                _add_bound_change(bounds, j, '<=', math.floor(var_values[j]),
+                                  root_bounds),
+                lp_basis)
+        up = (next_index + 1, cur_index, relax, j, var_values[j], '>=',
+              math.ceil(var_values[j]), cur_depth + 1,
+              _add_bound_change(bounds, j, '>=', math.ceil(var_values[j]),
+                                root_bounds),
+              lp_basis)
+        next_index += 2
+        if dive_count < max_dive:
+            # Go on with the child that would be taken first from the queue
+            if priority[1] < priority[0]:
+                stack.append(up)
+                children.append((priority[0], down))
+            else:
+                stack.append(down)
+                children.append((priority[1], up))
+            dive_count += 1
+        else:
+            children.append((priority[0], down))
+            children.append((priority[1], up))
+    return events, children, solutions, lp_count, lp_iter_count
+
+def DistributedWorker(address, authkey, connect_timeout = 10):
+    '''
+    Connects to the coordinator at address, a (host, port) pair, with the
+    key authkey, a bytes object, and processes nodes until the search is
+    done. A worker may be started before
+    the coordinator, it keeps trying to connect for connect_timeout seconds.
+    Returns the number of nodes processed.
+    '''
+    start = time.time()
+    while True:
+        try:
+            conn = Client(address, authkey = authkey)
+            break
+        except ConnectionRefusedError:
+            if time.time() - start > connect_timeout:
+                raise
+            time.sleep(0.1)
+    conn.send(('problem',))
+    problem = conn.recv()
+    lp = CreateLPBackend(problem['lp_solver'])
+    lp.load(problem['c'], problem['A'], problem['b'], problem['lower'],
+            problem['upper'], problem['var_names'])
+    c = problem['c']
+    numVars = len(c)
+    pseudo_u = np.column_stack((c, np.zeros(numVars)))
+    pseudo_d = np.column_stack((c, np.zeros(numVars)))
+    node_count = 0
+    results = None
+    while True:
+        conn.send(('work', results))
+        reply = conn.recv()
+        if reply[0] == 'done':
+            break
+        elif reply[0] == 'wait':
+            results = None
+            time.sleep(0.01)
+            continue
+        node, LB, block = reply[1:]
+        results = _dive(lp, node, LB, block, problem, pseudo_u, pseudo_d)
+        node_count += len(results[0])
+    conn.close()
+    return node_count
+
+def DistributedBranchAndBound(T, c, A, b, var_names = None,
+                              branch_strategy = MOST_FRACTIONAL,
+                              search_strategy = DEPTH_FIRST,
+                              binary_vars = True,
+                              lp_solver = PULP,
+                              warm_start = True,
+                              address = ('localhost', 0),
+                              authkey = None,
+                              local_workers = 2,
+                              max_dive = 10,
+                              display_interval = None,
+                              observers = None,
+                              idle_timeout = 300):
+    '''
+    Solves max cx s.t. Ax <= b (see BranchAndBoundArrays()) with a
+    coordinator listening at address, a (host, port) pair, and workers that
+    connect to it. Port 0 picks a free port. local_workers worker processes
+    are started on this machine; if it is zero, the search waits for workers
+    started elsewhere with DistributedWorker(). The connections are
+    authenticated with authkey, a bytes object, which must be given if
+    there are such workers or address is not a loopback address. Otherwise
+    a random key is generated for the local workers. A worker dives at most
+    max_dive times from each node it takes. If all local workers have died
+    and no other worker is connected, or if no worker has connected, taken
+    a node or reported back for idle_timeout seconds (None for no limit)
+    while the search is not done, the search is given up with an
+    exception. The nodes of workers that disconnect during their dive are
+    given to other workers. The coordinator reports the
+    nodes processed to observers, a list of BBObserver objects, and prints
+    nothing itself. If T is given, a TreeObserver building the tree in T,
+    displayed every display_interval nodes, is added to the observers.
+    Returns the best solution found as an array and its objective value.
+    '''
+    c = np.asarray(c, dtype = float)
+    b = np.asarray(b, dtype = float)
+    if not hasattr(A, 'tocsr'):
+        A = np.asarray(A, dtype = float)
+    numCons, numVars = A.shape
+    if var_names is None:
+        var_names = ["x"+str(j) for j in range(numVars)]
+    if observers is None:
+        observers = []
+    else:
+        observers = list(observers)
+    if T is not None:
+        observers.insert(0, TreeObserver(T, display_interval))
+    if binary_vars:
+        lower = np.zeros(numVars)
+        upper = np.ones(numVars)
+    else:
+        lower = np.full(numVars, -np.inf)
+        upper = np.full(numVars, np.inf)
+    problem = {'c' : c, 'A' : A, 'b' : b, 'lower' : lower, 'upper' : upper,
+               'var_names' : var_names,
+               'root_bounds' : list(zip(lower.tolist(), upper.tolist())),
+               'branch_strategy' : branch_strategy,
+               'search_strategy' : search_strategy,
+               'lp_solver' : lp_solver, 'warm_start' : warm_start,
+               'max_dive' : max_dive}
+    if authkey is None:
+        if local_workers == 0 or not _is_loopback(address[0]):
+            raise Exception('An authkey is required for workers on other '
+                            'machines')
+        authkey = os.urandom(32)
+    coordinator = _Coordinator(problem, numVars, max_dive)
+    listener = Listener(address, authkey = authkey)
+    accepter = threading.Thread(target = _accept,
+                                args = (coordinator, listener))
+    accepter.daemon = True
+    accepter.start()
+    for observer in observers:
+        observer.started(var_names, branch_strategy, search_strategy, False,
+                         local_workers, PROCESSES, False)
+    timer = time.time()
+    workers = []
+    for i in range(local_workers):
+        worker = Process(target = DistributedWorker,
+                         args = (listener.address, authkey))
+        worker.start()
+        workers.append(worker)
+    # Report the processed nodes to the observers as they come in
+    # The incumbent value as seen by the observers
+    LB = -INFINITY
+    node_count = 0
+    # The reason the search was given up, if it was
+    error = None
+    while not coordinator.done.is_set() or not coordinator.events.empty():
+        try:
+            kind, event = coordinator.events.get(timeout = 0.1)
+        except queue.Empty:
+            if coordinator.done.is_set():
+                continue
+            if workers and coordinator.connections == 0 and \
+                    not any(worker.is_alive() for worker in workers):
+                error = 'All workers died before the search was done'
+            elif idle_timeout is not None and \
+                    time.time() - coordinator.last_activity > idle_timeout:
+                error = 'No worker reported back for %s seconds' %idle_timeout
+            if error is not None:
+                # Tell the workers that are left to stop
+                coordinator.done.set()
+                break
+            continue
+        if kind == 'pruned':
+            cur_index, parent, relax = event[:3]
+            for observer in observers:
+                observer.pruned(cur_index, parent, event[7], LB,
+                                'parent bound', relax)
+            continue
+        solved, parent, outcome = event
+        (cur_index, cur_depth, node_LB, bounds, lp_status, lp_value,
+         lp_iterations, var_values, relax, integer_solution) = solved
+        node_count += 1
+        for observer in observers:
+            observer.node_solved(*solved)
+        if integer_solution and relax > LB:
+            LB = relax
+            for observer in observers:
+                observer.incumbent_found(cur_index, relax, var_values)
+        elif outcome == 'integer':
+            # The worker did not know of the better solution found
+            # elsewhere, so the node is only pruned by bound
+            outcome = 'bound'
+            node_LB = LB
+        if isinstance(outcome, tuple):
+            j, down_index, up_index = outcome
+            for observer in observers:
+                observer.branched(cur_index, relax, j, var_values[j],
+                                  down_index, up_index)
+        else:
+            for observer in observers:
+                observer.pruned(cur_index, parent, cur_depth, node_LB,
+                                outcome, relax)
+    for worker in workers:
+        if error is not None:
+            # The worker may be stuck in a dive
+            worker.terminate()
+        worker.join()
+    # Wake up the thread accepting connections so that it finishes
+    try:
+        Client(listener.address, authkey = authkey).close()
+    except Exception:
+        pass
+    accepter.join()
+    listener.close()
+    if error is not None:
+        raise Exception(error)
+    LB = coordinator.LB
+    opt = coordinator.opt
+    if coordinator.lp_iterations_known:
+        lp_iter_count = coordinator.lp_iter_count
+    else:
+        lp_iter_count = None
+    for observer in observers:
+        observer.finished(LB, opt, node_count, coordinator.lp_count,
+                          lp_iter_count, time.time() - timer, None)
+    return opt, LB
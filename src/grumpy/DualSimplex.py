@@ -0,0 +1,326 @@
+__author__ = 'Ted Ralphs'
+__maintainer__ = 'Ted Ralphs (ted@lehigh.edu)'
+
+"""
+A bounded-variable dual simplex method written with NumPy only.
+
+The LP max cx s.t. Ax <= b, l <= x <= u is brought to the form
+Ax + s = b, s >= 0 by adding a slack for each row. Columns 0 to n-1 of the
+resulting tableau are the structural variables and columns n to n+m-1 the
+slacks. Internally the method minimizes -cx. Nonbasic variables sit at one
+of their bounds, chosen such that the reduced costs are dual feasible. For a
+variable without the bound that would be needed, an artificial bound is
+used; an optimal solution with a nonbasic variable at an artificial bound
+means that the LP is unbounded.
+
+The inverse of the basis matrix is stored explicitly. It is computed with
+numpy.linalg.inv (i.e., LAPACK) and, after each pivot, multiplied by the
+elementary matrix of the pivot (the product form update), which changes it
+in O(m^2) operations. It is recomputed from scratch every refactor_frequency
+pivots and whenever a basis is set. The basis can be saved after a solve and passed to a later
+solve with different bounds, which then starts from a dual feasible basis.
+This is how a node of a branch-and-bound tree is reoptimized from the basis
+of its parent.
+
+The method is meant for small and medium dense problems, such as those
+created by GenerateRandomMIP, for which calling out to an external solver
+costs more than the solve itself. It also gives access to the simplex
+tableau for teaching purposes.
+"""
+
+import numpy as np
+
+# Artificial bound used for nonbasic variables without the needed bound
+ARTIFICIAL_BOUND = 1e7
+
+class DualSimplex(object):
+    '''
+    Bounded dual simplex for max cx s.t. Ax <= b, lower <= x <= upper.
+    Infinite bounds are given as -inf and inf. After solve(), the status,
+    objective value, primal and dual solution and the iteration count are
+    available as attributes, and the tableau of the final basis can be
+    queried.
+    '''
+    def __init__(self, c, A, b, lower = None, upper = None,
+                 refactor_frequency = 50, primal_tolerance = 1e-9,
+                 dual_tolerance = 1e-9, pivot_tolerance = 1e-9):
+        if hasattr(A, 'toarray'):
+            A = A.toarray()
+        A = np.asarray(A, dtype = float)
+        self.numCons, self.numVars = A.shape
+        m, n = self.numCons, self.numVars
+        self.c = np.asarray(c, dtype = float)
+        self.b = np.asarray(b, dtype = float)
+        # Constraint matrix with slacks and costs of the minimization form
+        self.A = np.hstack((A, np.eye(m)))
+        self.cost = np.concatenate((-self.c, np.zeros(m)))
+        self.lower = np.concatenate((np.zeros(n), np.zeros(m)))
+        self.upper = np.concatenate((np.full(n, np.inf), np.full(m, np.inf)))
+        self.set_bounds(lower, upper)
+        self.refactor_frequency = refactor_frequency
+        self.primal_tolerance = primal_tolerance
+        self.dual_tolerance = dual_tolerance
+        self.pivot_tolerance = pivot_tolerance
+        # Start with the slack basis, whose inverse is the identity
+        self.basic = np.arange(n, n + m)
+        self.at_upper = np.zeros(n + m, dtype = bool)
+        self.Binv = np.eye(m)
+        self.status = 'Not Solved'
+        self.objective = None
+        self.x = None
+        self.slack = None
+        self.duals = None
+        self.iterations = 0
+
+    def set_bounds(self, lower = None, upper = None):
+        '''
+        Sets the bounds of the structural variables. A value of None leaves
+        the corresponding bounds unchanged.
+        '''
+        n = self.numVars
+        if lower is not None:
+            self.lower[:n] = lower
+        if upper is not None:
+            self.upper[:n] = upper
+
+    def get_basis(self):
+        '''
+        Returns the current basis as a pair of arrays, the indices of the
+        basic variables in the order of the rows and a flag for each variable
+        that is True if it is nonbasic at its upper bound.
+        '''
+        return self.basic.copy(), self.at_upper.copy()
+
+    def set_basis(self, basis):
+        '''
+        Sets the basis to one returned by get_basis() and computes its
+        inverse from scratch.
+        '''
+        basic, at_upper = basis
+        self.basic = np.array(basic)
+        self._refactor()
+        self.at_upper = np.array(at_upper, dtype = bool)
+
+    def _refactor(self):
+        '''
+        Recomputes the basis inverse. Falls back to the slack basis if the
+        basis matrix is singular.
+        '''
+        try:
+            self.Binv = np.linalg.inv(self.A[:, self.basic])
+        except np.linalg.LinAlgError:
+            self.basic = np.arange(self.numVars, self.numVars + self.numCons)
+            self.Binv = np.eye(self.numCons)
+
+    def _nonbasic_values(self, nonbasic, free):
+        '''
+        Returns the values of all variables with the basic ones set to zero,
+        and a flag telling whether a nonbasic variable is at an artificial
+        bound. Variables flagged in free are nonbasic at zero.
+        '''
+        lower = np.where(np.isinf(self.lower), -ARTIFICIAL_BOUND, self.lower)
+        upper = np.where(np.isinf(self.upper), ARTIFICIAL_BOUND, self.upper)
+        z = np.where(self.at_upper, upper, lower)
+        z[~nonbasic | free] = 0.0
+        artificial = np.where(self.at_upper, np.isinf(self.upper),
+                              np.isinf(self.lower)) & nonbasic & ~free
+        return z, artificial
+
+    def solve(self, basis = None, cutoff = None, iteration_limit = None):
+        '''
+        Solves the LP, starting from basis (see get_basis()) if given and
+        from the current basis otherwise. If cutoff is given, the solve stops
+        with status 'Cutoff' as soon as the objective value is known to be at
+        most cutoff. If iteration_limit is given, it stops with status
+        'Iteration Limit' after that many pivots. In both cases objective is
+        an upper bound on the optimal value. Otherwise the status is one of
+        'Optimal', 'Infeasible', 'Unbounded' and 'Undefined'.
+        '''
+        if basis is not None:
+            self.set_basis(basis)
+        m, n = self.numCons, self.numVars
+        A, cost = self.A, self.cost
+        self.iterations = 0
+        max_iterations = 50*(m + n) + 1000
+        fixed = self.upper - self.lower <= self.primal_tolerance
+        infinite_lower = np.isinf(self.lower)
+        infinite_upper = np.isinf(self.upper)
+        self.status = 'Undefined'
+        while self.iterations <= max_iterations:
+            nonbasic = np.ones(n + m, dtype = bool)
+            nonbasic[self.basic] = False
+            # Duals and reduced costs
+            y = self.Binv.T.dot(cost[self.basic])
+            d = cost - A.T.dot(y)
+            d[self.basic] = 0.0
+            # Nonbasic variables are moved to the bound that makes their
+            # reduced cost dual feasible. Variables with zero reduced cost
+            # are put at a finite bound if they have one and left at zero if
+            # they are free.
+            zero = np.abs(d) <= self.dual_tolerance
+            self.at_upper[d < -self.dual_tolerance] = True
+            self.at_upper[d > self.dual_tolerance] = False
+            self.at_upper[zero & infinite_lower & ~infinite_upper] = True
+            self.at_upper[(zero & infinite_upper) | fixed] = False
+            self.at_upper[self.basic] = False
+            free = nonbasic & zero & infinite_lower & infinite_upper
+            z, artificial = self._nonbasic_values(nonbasic, free)
+            # Values of the basic variables
+            xB = self.Binv.dot(self.b - A.dot(z))
+            z[self.basic] = xB
+            objective = self.c.dot(z[:n])
+            if cutoff is not None and objective <= cutoff and \
+                    not artificial.any():
+                self._store(z, y, d, 'Cutoff', objective)
+                return self.status
+            # Leaving variable, the one with maximum primal infeasibility
+            lB = self.lower[self.basic]
+            uB = self.upper[self.basic]
+            infeasibility = np.maximum(lB - xB, xB - uB)
+            r = int(np.argmax(infeasibility))
+            if infeasibility[r] <= self.primal_tolerance:
+                if artificial.any():
+                    self._store(z, y, d, 'Unbounded', None)
+                else:
+                    self._store(z, y, d, 'Optimal', objective)
+                return self.status
+            if iteration_limit is not None and \
+                    self.iterations >= iteration_limit:
+                self._store(z, y, d, 'Iteration Limit', objective)
+                return self.status
+            # Entering variable by a Harris ratio test on the pivot row
+            leaving_to_lower = xB[r] < lB[r]
+            alpha = self.Binv[r].dot(A)
+            if leaving_to_lower:
+                alpha_s = alpha
+            else:
+                alpha_s = -alpha
+            eligible = nonbasic & ~fixed & \
+                (((~self.at_upper) & (alpha_s < -self.pivot_tolerance)) |
+                 (self.at_upper & (alpha_s > self.pivot_tolerance)) |
+                 (free & (np.abs(alpha_s) > self.pivot_tolerance)))
+            candidates = np.flatnonzero(eligible)
+            if len(candidates) == 0:
+                self._store(z, y, d, 'Infeasible', None)
+                return self.status
+            abs_alpha = np.abs(alpha_s[candidates])
+            abs_d = np.maximum(np.where(self.at_upper[candidates],
+                                        -d[candidates], d[candidates]), 0.0)
+            bound = np.min((abs_d + self.dual_tolerance)/abs_alpha)
+            ties = candidates[abs_d/abs_alpha <= bound]
+            q = int(ties[np.argmax(np.abs(alpha_s[ties]))])
+            # Pivot
+            alpha_q = self.Binv.dot(A[:, q])
+            p = self.basic[r]
+            self.basic[r] = q
+            self.at_upper[p] = not leaving_to_lower
+            self.at_upper[q] = False
+            self.iterations += 1
+            if self.iterations % self.refactor_frequency == 0:
+                self._refactor()
+            else:
+                eta = self.Binv[r]/alpha_q[r]
+                self.Binv -= np.outer(alpha_q, eta)
+                self.Binv[r] = eta
+        self._store(z, y, d, 'Undefined', None)
+        return self.status
+
+    def _store(self, z, y, d, status, objective):
+        '''
+        Stores the results of a solve.
+        '''
+        n = self.numVars
+        self.status = status
+        self.objective = objective
+        self.x = z[:n].copy()
+        self.slack = z[n:].copy()
+        # Duals and reduced costs of the maximization problem
+        self.duals = -y
+        self.reduced_costs = -d[:n]
+        self._d = d
+
+    def basic_variables(self):
+        '''
+        Returns the indices of the basic variables in the order of the rows
+        of the tableau. Indices from numVars on are slacks.
+        '''
+        return self.basic.copy()
+
+    def basis_inverse(self):
+        '''
+        Returns the inverse of the current basis matrix.
+        '''
+        return self.Binv.copy()
+
+    def tableau(self):
+        '''
+        Returns the current tableau B^{-1}[A I] (without the right-hand
+        side, which is given by rhs()).
+        '''
+        return self.Binv.dot(self.A)
+
+    def tableau_row(self, r):
+        '''
+        Returns row r of the current tableau.
+        '''
+        return self.Binv[r].dot(self.A)
+
+    def rhs(self):
+        '''
+        Returns the values of the basic variables, the right-hand side of the
+        current tableau.
+        '''
+        z = np.concatenate((self.x, self.slack))
+        return z[self.basic]
+
+    def penalties(self, variables, integer = False):
+        '''
+        Returns two arrays with lower bounds on the decrease of the optimal
+        value when each of the basic structural variables in variables is
+        forced down to the floor and up to the ceiling of its value, the
+        Driebeek penalties given by the first pivot of the dual simplex
+        method. If integer is True, the structural variables are integer,
+        so a structural variable entering the basis changes by at least
+        one, which gives the stronger penalties of Tomlin, bounds on the
+        decrease of the value of integer solutions. A penalty is infinite if
+        the LP becomes infeasible. Nonbasic variables get penalty zero.
+        '''
+        n, m = self.numVars, self.numCons
+        nonbasic = np.ones(n + m, dtype = bool)
+        nonbasic[self.basic] = False
+        eligible = nonbasic & (self.upper - self.lower > self.primal_tolerance)
+        abs_d = np.maximum(np.where(self.at_upper, -self._d, self._d), 0.0)
+        if integer:
+            is_integer = np.arange(n + m) < n
+        else:
+            is_integer = np.zeros(n + m, dtype = bool)
+        rows = {int(j) : r for r, j in enumerate(self.basic)}
+        down = np.zeros(len(variables))
+        up = np.zeros(len(variables))
+        for i, j in enumerate(variables):
+            if j not in rows:
+                continue
+            alpha = self.Binv[rows[j]].dot(self.A)
+            f = self.x[j] - np.floor(self.x[j])
+            for penalty, alpha_s, change in [(down, -alpha, f),
+                                             (up, alpha, 1 - f)]:
+                # The variables that can enter when x[j] leaves the basis
+                candidates = np.flatnonzero(eligible &
+                    (((~self.at_upper) & (alpha_s < -self.pivot_tolerance)) |
+                     (self.at_upper & (alpha_s > self.pivot_tolerance))))
+                if len(candidates) == 0:
+                    penalty[i] = np.inf
+                    continue
+                ratios = change*abs_d[candidates]/np.abs(alpha_s[candidates])
+                ratios = np.where(is_integer[candidates],
+                                  np.maximum(ratios, abs_d[candidates]),
+                                  ratios)
+                penalty[i] = ratios.min()
+        return down, up
+
+    def tableau_reduced_costs(self):
+        '''
+        Returns the reduced costs of all variables (slacks included) with
+        respect to the maximization objective.
+        '''
+        return -self._d.copy()
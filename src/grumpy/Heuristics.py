@@ -0,0 +1,358 @@
+__author__ = 'Ted Ralphs'
+__maintainer__ = 'Ted Ralphs (ted@lehigh.edu)'
+
+"""
+Primal heuristics for the branch-and-bound implementation in
+BranchAndBound.py.
+
+Branch and bound only finds a solution when the LP relaxation of a node
+happens to have an integral optimal solution, and until it does, no node
+can be pruned by bound. A primal heuristic tries to turn the solution of
+the LP relaxation of a node into a feasible solution right away:
+
+SIMPLE_ROUNDING rounds each fractional variable in a direction in which no
+constraint can become violated, if there is one.
+
+FRACTIONAL_DIVING and COEFFICIENT_DIVING repeatedly bound a fractional
+variable and solve the LP relaxation again, until its solution is integral
+or the LP is infeasible. Fractional diving rounds the least fractional
+variable to the nearest integer, coefficient diving the variable with the
+fewest constraints that could become violated (locks) in the direction with
+fewer locks.
+
+FIX_AND_PROPAGATE fixes the variables one at a time to their rounded LP
+values, least fractional first, and after each fixing tightens the bounds
+of the other variables so that the minimum activity of every row stays
+within its right hand side. If a fixing leaves a row without feasible
+values, the variable is fixed to the value rounded the other way.
+
+GREEDY_FILL rounds the LP solution down and then raises the variables in the
+order of their profit per unit of the capacity of the rows, as long as they
+fit. This is the classic greedy algorithm for the knapsack rows of the
+problems generated by GenerateRandomMIP.
+
+Once there is an incumbent, a sub-MIP restricted to a neighborhood of it
+often contains a better solution that is found quickly. RINS fixes the
+variables on whose values the incumbent and the LP solution of a node
+agree, LOCAL_BRANCHING adds the constraint that at most a given number of
+binary variables differ from the incumbent. BranchAndBoundArrays() solves
+these sub-MIPs in a background process while its search goes on.
+"""
+
+import math, time
+import numpy as np
+from .BBTree import INFINITY
+from .BBTree import SIMPLE_ROUNDING, FRACTIONAL_DIVING, COEFFICIENT_DIVING
+from .BBTree import FIX_AND_PROPAGATE, GREEDY_FILL
+from .LPBackends import _row_entries, SCIPY_INSTALLED
+
+if SCIPY_INSTALLED:
+    import scipy.sparse
+
+# The heuristics that solve LPs
+DIVING_HEURISTICS = (FRACTIONAL_DIVING, COEFFICIENT_DIVING)
+
+def _fractional(x):
+    '''
+    Returns the indices of the fractional variables in x.
+    '''
+    return np.flatnonzero(np.abs(x - np.round(x)) > 1e-6)
+
+def _rins_sub_mip(c, A, b, incumbent, x):
+    '''
+    Returns the sub-MIP of RINS for max cx s.t. Ax <= b, the problem in the
+    variables on whose values the incumbent and the LP solution x disagree,
+    with the others fixed to their values. The sub-MIP is returned as
+    arrays c, A and b, the indices of its variables in the problem and the
+    objective value of the fixed variables, or None if no variable or every
+    variable would be fixed.
+    '''
+    agree = np.abs(incumbent - x) <= 1e-6
+    free = np.flatnonzero(~agree)
+    fixed = np.flatnonzero(agree)
+    if len(free) == 0 or len(fixed) == 0:
+        return None
+    b = b - A[:, fixed].dot(incumbent[fixed])
+    return c[free], A[:, free], b, free, float(c[fixed].dot(incumbent[fixed]))
+
+def _local_branching_sub_mip(c, A, b, incumbent, k):
+    '''
+    Returns the sub-MIP of local branching for max cx s.t. Ax <= b with
+    binary variables, the problem with the constraint that at most k
+    variables differ from the incumbent, in the format of _rins_sub_mip().
+    '''
+    row = np.where(incumbent > 0.5, -1.0, 1.0)
+    rhs = k - float(np.round(incumbent).sum())
+    if hasattr(A, 'tocsr'):
+        A = scipy.sparse.vstack([A, scipy.sparse.csr_matrix(row)],
+                                format = 'csr')
+    else:
+        A = np.vstack([A, row])
+    return c, A, np.append(b, rhs), np.arange(len(c)), 0.0
+
+class PrimalHeuristics(object):
+    '''
+    Runs the primal heuristics in heuristics, a list of SIMPLE_ROUNDING,
+    FRACTIONAL_DIVING, COEFFICIENT_DIVING, FIX_AND_PROPAGATE and GREEDY_FILL,
+    for max cx s.t. Ax <= b, lower <= x <= upper, x integer, where A is
+    either a dense array or a scipy.sparse matrix. A dive ends after
+    max_dive_depth LPs if given. The number of calls, the solutions found,
+    the LPs solved and simplex iterations of the diving heuristics and the
+    time spent are counted in the attributes calls, found, lp_count,
+    lp_iter_count and time.
+    '''
+    def __init__(self, c, A, b, lower, upper, heuristics,
+                 max_dive_depth = None):
+        for heuristic in heuristics:
+            if heuristic not in (SIMPLE_ROUNDING, FRACTIONAL_DIVING,
+                                 COEFFICIENT_DIVING, FIX_AND_PROPAGATE,
+                                 GREEDY_FILL):
+                raise Exception('Unknown heuristic %s' %heuristic)
+        self.c = c
+        self.A = A
+        self.b = b
+        self.lower = lower
+        self.upper = upper
+        self.heuristics = list(heuristics)
+        self.max_dive_depth = max_dive_depth
+        self.rows = list(_row_entries(A))
+        self.columns = list(_row_entries(A.T))
+        # The number of rows in which raising (lowering) a variable may
+        # violate the constraint
+        self.up_locks = np.array([np.count_nonzero(values > 0)
+                                  for indices, values in self.columns])
+        self.down_locks = np.array([np.count_nonzero(values < 0)
+                                    for indices, values in self.columns])
+        self.calls = 0
+        self.found = 0
+        self.lp_count = 0
+        self.lp_iter_count = 0
+        self.time = 0.0
+
+    def uses_lp(self):
+        '''
+        Returns True if one of the heuristics solves LPs.
+        '''
+        return any(heuristic in DIVING_HEURISTICS
+                   for heuristic in self.heuristics)
+
+    def run(self, x, LB, lp = None, bounds = (), basis = None,
+            time_limit = None):
+        '''
+        Runs the heuristics on the solution x of the LP relaxation of a node
+        with bound change record bounds and optimal basis basis, where LB is
+        the value of the incumbent. The diving heuristics solve their LPs
+        with the LP solver lp and are skipped if it is None. No heuristic is
+        started after time_limit seconds and dives stop then. Returns the
+        name of the heuristic that found the best solution better than LB,
+        the value of the solution and the solution, or None if no heuristic
+        found one.
+        '''
+        start = time.time()
+        if time_limit is not None:
+            deadline = start + time_limit
+        else:
+            deadline = None
+        self.calls += 1
+        lower = self.lower.copy()
+        upper = self.upper.copy()
+        for (j, l, u) in bounds:
+            lower[j] = l
+            upper[j] = u
+        best = None
+        for heuristic in self.heuristics:
+            if deadline is not None and time.time() >= deadline:
+                break
+            if heuristic == SIMPLE_ROUNDING:
+                y = self._simple_rounding(x)
+            elif heuristic == GREEDY_FILL:
+                y = self._greedy_fill(x, lower, upper)
+            elif heuristic == FIX_AND_PROPAGATE:
+                y = self._fix_and_propagate(x, lower, upper)
+            elif lp is not None:
+                y = self._dive(heuristic, lp, x, LB, bounds, basis, deadline)
+            else:
+                y = None
+            if y is None or not self._feasible(y):
+                continue
+            y = np.round(y)
+            value = float(self.c.dot(y))
+            if value > LB:
+                LB = value
+                best = (heuristic, value, y)
+        if best is not None:
+            self.found += 1
+        self.time += time.time() - start
+        return best
+
+    def _feasible(self, y):
+        '''
+        Returns True if y is an integral solution.
+        '''
+        if len(_fractional(y)) > 0:
+            return False
+        y = np.round(y)
+        if (y < self.lower - 1e-9).any() or (y > self.upper + 1e-9).any():
+            return False
+        return (self.A.dot(y) <= self.b + 1e-6).all()
+
+    def _simple_rounding(self, x):
+        y = x.copy()
+        for j in _fractional(x):
+            if self.down_locks[j] == 0:
+                y[j] = math.floor(x[j])
+            elif self.up_locks[j] == 0:
+                y[j] = math.ceil(x[j])
+            else:
+                return None
+        return y
+
+    def _greedy_fill(self, x, lower, upper):
+        y = np.clip(np.floor(x + 1e-6), lower, upper)
+        slack = self.b - self.A.dot(y)
+        if (slack < -1e-6).any():
+            return None
+        # Profit per unit of the capacity of the rows
+        scale = np.where(self.b > 0, self.b, 1.0)
+        ratio = np.full(len(y), -np.inf)
+        for j, (indices, values) in enumerate(self.columns):
+            if self.c[j] > 0 and y[j] < upper[j]:
+                positive = values > 0
+                weight = (values[positive]/scale[indices[positive]]).sum()
+                ratio[j] = self.c[j]/max(weight, 1e-9)
+        for j in np.argsort(-ratio, kind = 'stable'):
+            if ratio[j] == -np.inf:
+                break
+            indices, values = self.columns[j]
+            positive = values > 0
+            amount = upper[j] - y[j]
+            if positive.any():
+                amount = min(amount,
+                             np.floor((slack[indices[positive]] + 1e-9)/
+                                      values[positive]).min())
+            if amount == np.inf or amount < 1:
+                continue
+            y[j] += amount
+            slack[indices] -= values*amount
+        return y
+
+    def _fix_and_propagate(self, x, lower, upper):
+        if not (np.isfinite(lower).all() and np.isfinite(upper).all()):
+            return None
+        lower = lower.copy()
+        upper = upper.copy()
+        # The minimum activity of each row
+        min_activity = np.array([np.minimum(values*lower[indices],
+                                            values*upper[indices]).sum()
+                                 for indices, values in self.rows])
+        frac = np.abs(x - np.round(x))
+        for j in np.argsort(frac, kind = 'stable'):
+            if lower[j] == upper[j]:
+                continue
+            first = min(max(round(x[j]), lower[j]), upper[j])
+            if first <= x[j]:
+                second = min(math.ceil(x[j] + 1e-6), upper[j])
+            else:
+                second = max(math.floor(x[j] - 1e-6), lower[j])
+            for value in (first, second):
+                state = (lower.copy(), upper.copy(), min_activity.copy())
+                if self._fix(j, value, lower, upper, min_activity):
+                    break
+                lower, upper, min_activity = state
+            else:
+                return None
+        return lower
+
+    def _fix(self, j, value, lower, upper, min_activity):
+        '''
+        Fixes variable j to value and propagates the bounds. Returns False
+        if a row has no feasible values left.
+        '''
+        changed = [(j, value, value)]
+        while changed:
+            k, l, u = changed.pop()
+            l, u = max(l, lower[k]), min(u, upper[k])
+            if l > u:
+                return False
+            if (l, u) == (lower[k], upper[k]):
+                continue
+            indices, values = self.columns[k]
+            min_activity[indices] += (np.minimum(values*l, values*u) -
+                                      np.minimum(values*lower[k],
+                                                 values*upper[k]))
+            lower[k], upper[k] = l, u
+            for i in indices:
+                slack = self.b[i] - min_activity[i]
+                if slack < -1e-6:
+                    return False
+                slack = max(slack, 0.0)
+                # A variable with a positive coefficient can be raised by
+                # at most slack divided by it, and likewise for a negative
+                for h, a in zip(*self.rows[i]):
+                    if lower[h] == upper[h]:
+                        continue
+                    if a > 0:
+                        new_upper = lower[h] + math.floor(slack/a + 1e-9)
+                        if new_upper < upper[h]:
+                            changed.append((h, lower[h], new_upper))
+                    else:
+                        new_lower = upper[h] - math.floor(slack/-a + 1e-9)
+                        if new_lower > lower[h]:
+                            changed.append((h, new_lower, upper[h]))
+        return True
+
+    def _dive(self, heuristic, lp, x, LB, bounds, basis, deadline):
+        record = {j : (l, u) for (j, l, u) in bounds}
+        if LB > -INFINITY:
+            cutoff = LB
+        else:
+            cutoff = None
+        depth = 0
+        while True:
+            candidates = _fractional(x)
+            if len(candidates) == 0:
+                return x
+            if (self.max_dive_depth is not None and
+                depth >= self.max_dive_depth) or \
+                (deadline is not None and time.time() >= deadline):
+                return None
+            depth += 1
+            down = x[candidates] - np.floor(x[candidates])
+            up = 1 - down
+            if heuristic == FRACTIONAL_DIVING:
+                position = np.argmin(np.minimum(down, up))
+                directions = ['<=', '>=']
+                if up[position] < down[position]:
+                    directions.reverse()
+            else:
+                locks = np.minimum(self.down_locks[candidates],
+                                   self.up_locks[candidates])
+                fewest = np.flatnonzero(locks == locks.min())
+                position = fewest[np.argmin(np.minimum(down, up)[fewest])]
+                j = candidates[position]
+                directions = ['<=', '>=']
+                if self.up_locks[j] < self.down_locks[j] or \
+                        (self.up_locks[j] == self.down_locks[j] and
+                         up[position] < down[position]):
+                    directions.reverse()
+            j = candidates[position]
+            l, u = record.get(j, (self.lower[j], self.upper[j]))
+            # If the LP is infeasible after rounding, the other direction is
+            # tried before giving up
+            for sense in directions:
+                if sense == '<=':
+                    record[j] = (l, math.floor(x[j]))
+                else:
+                    record[j] = (math.ceil(x[j]), u)
+                status, value, y = lp.solve(
+                    tuple((k, lk, uk) for k, (lk, uk) in record.items()),
+                    basis, cutoff = cutoff)
+                self.lp_count += 1
+                if lp.iterations is not None:
+                    self.lp_iter_count += lp.iterations
+                if status == 'Optimal':
+                    break
+            else:
+                return None
+            basis = lp.get_basis()
+            x = y
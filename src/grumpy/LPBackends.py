@@ -0,0 +1,393 @@
+__author__ = 'Ted Ralphs'
+__maintainer__ = 'Ted Ralphs (ted@lehigh.edu)'
+
+"""
+LP solvers for the branch-and-bound implementation in BranchAndBound.py.
+
+Each backend holds the LP relaxation max cx s.t. Ax <= b, l <= x <= u of the
+root node, which is loaded once, and solves it for the bounds of a node. The
+bounds of a node are given as a bound change record, a tuple of
+(var index, lower, upper) triples for the variables whose bounds differ from
+those of the root. The PuLP backend writes each LP to a file and calls an
+external solver, the others solve in memory, either with HiGHS through
+highspy or scipy.optimize.linprog, or with the NumPy dual simplex method in
+DualSimplex.py.
+"""
+
+import numpy as np
+from pulp import LpVariable, LpAffineExpression, LpProblem, LpMaximize
+from pulp import LpStatus, value, PULP_CBC_CMD
+from .DualSimplex import DualSimplex
+try:
+    from scipy.optimize import linprog
+    SCIPY_INSTALLED = True
+except ImportError:
+    SCIPY_INSTALLED = False
+try:
+    import highspy
+    HIGHSPY_INSTALLED = True
+except ImportError:
+    HIGHSPY_INSTALLED = False
+
+# LP solvers
+PULP = 'PuLP'
+HIGHS = 'HiGHS'
+SCIPY = 'SciPy'
+DUAL_SIMPLEX = 'Dual Simplex'
+
+def _row_entries(A):
+    '''
+    Yields (indices, values) of the nonzero entries of each row of A, which
+    is either a dense array or a scipy.sparse matrix.
+    '''
+    if hasattr(A, 'tocsr'):
+        A = A.tocsr()
+        for i in range(A.shape[0]):
+            start, end = A.indptr[i], A.indptr[i+1]
+            yield A.indices[start:end], A.data[start:end]
+    else:
+        for row in np.asarray(A, dtype = float):
+            indices = np.flatnonzero(row)
+            yield indices, row[indices]
+
+class LPBackend(object):
+    '''
+    Base class of the LP solvers. Derived classes implement load() and
+    solve() and, if they support warm starts, get_basis().
+    '''
+    # Number of simplex iterations of the last solve, None if unknown
+    iterations = None
+
+    def load(self, c, A, b, lower, upper, var_names = None):
+        '''
+        Loads the root relaxation max cx s.t. Ax <= b, lower <= x <= upper.
+        Infinite bounds are given as -inf and inf. var_names are used by
+        solvers that name their variables.
+        '''
+        raise NotImplementedError()
+
+    def solve(self, bounds = (), basis = None, cutoff = None,
+              iteration_limit = None):
+        '''
+        Solves the relaxation with the root bounds modified by the bound
+        change record bounds, starting from basis (as returned by
+        get_basis()) if it is given and the solver supports it. Returns a
+        tuple (status, objective value, solution). The status is one of the
+        values of pulp.LpStatus ('Optimal', 'Infeasible', 'Unbounded',
+        'Undefined', 'Not Solved'), the objective value and solution are None
+        unless the status is 'Optimal'. Solvers that support an objective
+        cutoff may stop early if the optimal value is known to be at most
+        cutoff. They then return the status 'Cutoff' and an upper bound on
+        the optimal value that is at most cutoff as objective value.
+        Solvers that support an iteration limit stop after iteration_limit
+        simplex iterations with the status 'Iteration Limit' and the
+        objective value reached so far, the others ignore it.
+        '''
+        raise NotImplementedError()
+
+    def get_basis(self):
+        '''
+        Returns the final basis of the last solve, to be used for warm
+        starting later solves, or None if the solver does not support warm
+        starts.
+        '''
+        return None
+
+    def reduced_costs(self):
+        '''
+        Returns the reduced costs of the variables with respect to the
+        maximization objective in the optimal solution of the last solve,
+        or None if the solver does not provide them.
+        '''
+        return None
+
+    def penalties(self, variables, integer = False):
+        '''
+        Returns two arrays with lower bounds on the decrease of the optimal
+        value of the last solve when each of variables is forced down to the
+        floor or up to the ceiling of its value (see DualSimplex.penalties()),
+        or None if the solver does not provide them.
+        '''
+        return None
+
+class PuLPBackend(LPBackend):
+    '''
+    Solves the relaxation with PuLP. The model is built once and only
+    variable bounds change from node to node, but every solve still goes
+    through the solver command of PuLP (CBC by default, without output).
+    '''
+    def __init__(self, solver = None):
+        # A pulp solver object, CBC without messages if None
+        if solver is None:
+            solver = PULP_CBC_CMD(msg = False)
+        self.solver = solver
+
+    def load(self, c, A, b, lower, upper, var_names = None):
+        numVars = len(c)
+        if var_names is None:
+            var_names = ["x"+str(j) for j in range(numVars)]
+        var = LpVariable.dicts("", var_names)
+        self.var_list = [var[i] for i in var_names]
+        self.root_bounds = [(None if np.isinf(l) else l,
+                             None if np.isinf(u) else u)
+                            for l, u in zip(lower.tolist(), upper.tolist())]
+        for v, (l, u) in zip(self.var_list, self.root_bounds):
+            v.lowBound, v.upBound = l, u
+        # Only the nonzero coefficients are added to the model
+        self.prob = LpProblem("relax", LpMaximize)
+        self.prob.addVariables(self.var_list)
+        c = np.asarray(c, dtype = float)
+        self.prob += LpAffineExpression([(self.var_list[j], c[j])
+                                         for j in np.flatnonzero(c).tolist()]), \
+            "Objective"
+        for i, (indices, values) in enumerate(_row_entries(A)):
+            self.prob += (LpAffineExpression(list(zip(
+                [self.var_list[j] for j in indices], values.tolist())))
+                          <= b[i], "C"+str(i))
+
+    def solve(self, bounds = (), basis = None, cutoff = None,
+              iteration_limit = None):
+        var_list = self.var_list
+        for (j, lower, upper) in bounds:
+            var_list[j].lowBound = None if np.isinf(lower) else lower
+            var_list[j].upBound = None if np.isinf(upper) else upper
+        self.prob.solve(self.solver)
+        for (j, lower, upper) in bounds:
+            var_list[j].lowBound, var_list[j].upBound = self.root_bounds[j]
+        status = LpStatus[self.prob.status]
+        if status != 'Optimal':
+            return status, None, None
+        x = np.array([v.varValue for v in var_list], dtype = float)
+        return status, value(self.prob.objective), x
+
+class HighsBackend(LPBackend):
+    '''
+    Solves the relaxation in memory with a persistent highspy model. Only the
+    bounds of the columns in the bound change record are modified for a
+    solve. Given a basis, typically the optimal basis of the parent node, the
+    dual simplex method reoptimizes from it, otherwise from the state that
+    HiGHS keeps from the last solve. Bases are stored as a pair of int8
+    arrays with the HiGHS basis status of the columns and the rows. If
+    clear_solver is True, this state is discarded before each solve, so that
+    the result only depends on the bounds and the basis and not on the
+    solves before. This is slower and only needed when nodes are solved by
+    several solvers and every run has to give the same tree.
+    '''
+    _status = {}
+    if HIGHSPY_INSTALLED:
+        _status = {highspy.HighsModelStatus.kOptimal : 'Optimal',
+                   highspy.HighsModelStatus.kInfeasible : 'Infeasible',
+                   highspy.HighsModelStatus.kUnboundedOrInfeasible :
+                       'Infeasible',
+                   highspy.HighsModelStatus.kUnbounded : 'Unbounded',
+                   highspy.HighsModelStatus.kIterationLimit :
+                       'Iteration Limit'}
+
+    def __init__(self, clear_solver = False):
+        if not HIGHSPY_INSTALLED:
+            raise Exception('The HiGHS backend requires highspy')
+        self.clear_solver = clear_solver
+
+    def load(self, c, A, b, lower, upper, var_names = None):
+        numVars = len(c)
+        numCons = len(b)
+        self.lower = np.asarray(lower, dtype = float)
+        self.upper = np.asarray(upper, dtype = float)
+        lp = highspy.HighsLp()
+        lp.num_col_ = numVars
+        lp.num_row_ = numCons
+        lp.sense_ = highspy.ObjSense.kMaximize
+        lp.col_cost_ = np.asarray(c, dtype = float)
+        lp.col_lower_ = self.lower
+        lp.col_upper_ = self.upper
+        lp.row_lower_ = np.full(numCons, -highspy.kHighsInf)
+        lp.row_upper_ = np.asarray(b, dtype = float)
+        starts = [0]
+        indices = []
+        values = []
+        for row_indices, row_values in _row_entries(A):
+            indices.extend(row_indices.tolist())
+            values.extend(row_values.tolist())
+            starts.append(len(indices))
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        lp.a_matrix_.num_col_ = numVars
+        lp.a_matrix_.num_row_ = numCons
+        lp.a_matrix_.start_ = np.array(starts, dtype = np.int32)
+        lp.a_matrix_.index_ = np.array(indices, dtype = np.int32)
+        lp.a_matrix_.value_ = np.array(values, dtype = float)
+        self.highs = highspy.Highs()
+        self.highs.setOptionValue('output_flag', False)
+        self.highs.setOptionValue('solver', 'simplex')
+        # Dual simplex
+        self.highs.setOptionValue('simplex_strategy', 1)
+        self.highs.passModel(lp)
+        self.basis = None
+        self.reduced = None
+
+    def _set_bounds(self, indices, lower, upper):
+        if len(indices) > 0:
+            self.highs.changeColsBounds(len(indices),
+                                        np.array(indices, dtype = np.int32),
+                                        np.array(lower, dtype = float),
+                                        np.array(upper, dtype = float))
+
+    def solve(self, bounds = (), basis = None, cutoff = None,
+              iteration_limit = None):
+        indices = [j for (j, lower, upper) in bounds]
+        self._set_bounds(indices, [lower for (j, lower, upper) in bounds],
+                         [upper for (j, lower, upper) in bounds])
+        if self.clear_solver:
+            self.highs.clearSolver()
+        if basis is not None:
+            highs_basis = highspy.HighsBasis()
+            highs_basis.col_status = [highspy.HighsBasisStatus(int(s))
+                                      for s in basis[0]]
+            highs_basis.row_status = [highspy.HighsBasisStatus(int(s))
+                                      for s in basis[1]]
+            highs_basis.valid = True
+            self.highs.setBasis(highs_basis)
+        if iteration_limit is None:
+            self.highs.setOptionValue('simplex_iteration_limit',
+                                      highspy.kHighsIInf)
+        else:
+            self.highs.setOptionValue('simplex_iteration_limit',
+                                      iteration_limit)
+        self.highs.run()
+        info = self.highs.getInfo()
+        self.iterations = max(info.simplex_iteration_count, 0)
+        status = self._status.get(self.highs.getModelStatus(), 'Undefined')
+        if status == 'Optimal':
+            obj = info.objective_function_value
+            solution = self.highs.getSolution()
+            x = np.array(solution.col_value)
+            self.reduced = np.array(solution.col_dual)
+            highs_basis = self.highs.getBasis()
+            self.basis = (np.array([int(s) for s in highs_basis.col_status],
+                                   dtype = np.int8),
+                          np.array([int(s) for s in highs_basis.row_status],
+                                   dtype = np.int8))
+        elif status == 'Iteration Limit':
+            obj, x = info.objective_function_value, None
+            self.basis = None
+            self.reduced = None
+        else:
+            obj, x = None, None
+            self.basis = None
+            self.reduced = None
+        # Changing the bounds back invalidates the solution, so this is done
+        # only after it has been retrieved
+        self._set_bounds(indices, self.lower[indices], self.upper[indices])
+        return status, obj, x
+
+    def get_basis(self):
+        return self.basis
+
+    def reduced_costs(self):
+        return self.reduced
+
+class ScipyBackend(LPBackend):
+    '''
+    Solves the relaxation in memory with scipy.optimize.linprog using the
+    HiGHS methods. Each solve starts from scratch.
+    '''
+    _status = {0 : 'Optimal', 2 : 'Infeasible', 3 : 'Unbounded'}
+
+    def __init__(self, method = 'highs'):
+        if not SCIPY_INSTALLED:
+            raise Exception('The SciPy backend requires scipy')
+        self.method = method
+
+    def load(self, c, A, b, lower, upper, var_names = None):
+        self.c = np.asarray(c, dtype = float)
+        self.A = A
+        self.b = np.asarray(b, dtype = float)
+        self.lower = np.asarray(lower, dtype = float)
+        self.upper = np.asarray(upper, dtype = float)
+        self.reduced = None
+
+    def solve(self, bounds = (), basis = None, cutoff = None,
+              iteration_limit = None):
+        lower = self.lower.copy()
+        upper = self.upper.copy()
+        for (j, l, u) in bounds:
+            lower[j] = l
+            upper[j] = u
+        res = linprog(-self.c, A_ub = self.A, b_ub = self.b,
+                      bounds = np.column_stack((lower, upper)),
+                      method = self.method)
+        self.iterations = res.nit
+        status = self._status.get(res.status, 'Undefined')
+        self.reduced = None
+        if status != 'Optimal':
+            return status, None, None
+        if hasattr(res, 'lower') and hasattr(res, 'upper'):
+            # The marginals of the bounds are the reduced costs of -c
+            self.reduced = -(res.lower.marginals + res.upper.marginals)
+        return status, -res.fun, res.x
+
+    def reduced_costs(self):
+        return self.reduced
+
+class DualSimplexBackend(LPBackend):
+    '''
+    Solves the relaxation in memory with the NumPy dual simplex method of
+    DualSimplex.py. Given a basis, the dual simplex method reoptimizes from
+    it, otherwise it starts from the slack basis. Supports an objective
+    cutoff and an iteration limit and computes branching penalties.
+    '''
+    def load(self, c, A, b, lower, upper, var_names = None):
+        self.lower = np.asarray(lower, dtype = float)
+        self.upper = np.asarray(upper, dtype = float)
+        self.lp = DualSimplex(c, A, b, self.lower, self.upper)
+        self.slack_basis = self.lp.get_basis()
+
+    def solve(self, bounds = (), basis = None, cutoff = None,
+              iteration_limit = None):
+        lower = self.lower.copy()
+        upper = self.upper.copy()
+        for (j, l, u) in bounds:
+            lower[j] = l
+            upper[j] = u
+        self.lp.set_bounds(lower, upper)
+        if basis is None:
+            basis = self.slack_basis
+        status = self.lp.solve(basis, cutoff, iteration_limit)
+        self.iterations = self.lp.iterations
+        if status == 'Optimal':
+            return status, self.lp.objective, self.lp.x.copy()
+        elif status in ('Cutoff', 'Iteration Limit'):
+            return status, self.lp.objective, None
+        return status, None, None
+
+    def get_basis(self):
+        if self.lp.status != 'Optimal':
+            return None
+        return self.lp.get_basis()
+
+    def reduced_costs(self):
+        if self.lp.status != 'Optimal':
+            return None
+        return self.lp.reduced_costs.copy()
+
+    def penalties(self, variables, integer = False):
+        if self.lp.status != 'Optimal':
+            return None
+        return self.lp.penalties(variables, integer)
+
+def CreateLPBackend(lp_solver):
+    '''
+    Returns a new backend for lp_solver, which is one of PULP, HIGHS, SCIPY
+    and DUAL_SIMPLEX. An LPBackend object is returned as is.
+    '''
+    if isinstance(lp_solver, LPBackend):
+        return lp_solver
+    if lp_solver == PULP:
+        return PuLPBackend()
+    elif lp_solver == HIGHS:
+        return HighsBackend()
+    elif lp_solver == SCIPY:
+        return ScipyBackend()
+    elif lp_solver == DUAL_SIMPLEX:
+        return DualSimplexBackend()
+    else:
+        raise Exception('Unknown LP solver %s' %lp_solver)
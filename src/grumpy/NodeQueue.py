@@ -0,0 +1,334 @@
+__author__ = 'Ted Ralphs'
+__maintainer__ = 'Ted Ralphs (ted@lehigh.edu)'
+
+"""
+The queue of open nodes of the branch-and-bound algorithm.
+
+Nodes are taken from the queue in the order of their priorities, as in a
+blimpy PriorityQueue. In addition, the queue keeps track of the bounds of
+the open nodes, so that the global upper bound is always known, and removes
+all nodes that are pruned by bound in one pass when the incumbent improves.
+Nodes can also be pushed onto a separate dive queue, which is emptied first,
+to plunge depth-first without disturbing the order of the other nodes.
+
+SpillingNodeQueue keeps only a limited number of nodes in memory and writes
+the others to files, from which they are read back when they are needed.
+"""
+
+import sys, os, heapq, itertools, pickle, shutil, tempfile
+import numpy as np
+from .BBTree import INFINITY
+
+def _size(obj, seen):
+    '''
+    Returns an estimate of the memory used by obj and the tuples, lists and
+    arrays it holds, counting the objects in seen only once.
+    '''
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list)):
+        size += sum(_size(item, seen) for item in obj)
+    elif isinstance(obj, np.ndarray) and obj.base is not None:
+        size += _size(obj.base, seen)
+    return size
+
+class NodeQueue(object):
+    '''
+    A priority queue of nodes, each with a bound on the objective value of
+    the solutions in its subtree. A node counts as open from the time it is
+    pushed until processed() is called for it, so that nodes taken from the
+    queue whose processing is not finished still count for the global upper
+    bound. If measure_memory is True, the memory used by the open nodes held
+    in memory is estimated in the attribute memory.
+    '''
+    def __init__(self, measure_memory = False):
+        # Heap of (priority, count, key, bound, node) entries, the count
+        # breaks ties in the order in which the nodes were pushed
+        self.heap = []
+        # Heap of the entries pushed onto the dive queue
+        self.dive = []
+        # Heap of (-bound, count, key) entries of the open nodes. Entries of
+        # nodes that are no longer open are removed lazily.
+        self.bounds = []
+        # The bounds of the open nodes
+        self.open = {}
+        self.counter = itertools.count()
+        self.measure_memory = measure_memory
+        # The estimated memory used by the open nodes and by each of them
+        self.memory = 0
+        self.sizes = {}
+
+    def __len__(self):
+        return len(self.heap) + len(self.dive)
+
+    def isEmpty(self):
+        return len(self) == 0
+
+    def push(self, key, priority, node, bound = None, dive = False):
+        '''
+        Adds node with the given key, priority and bound. A bound of None
+        means that no bound is known. If dive is True, the node is pushed
+        onto the dive queue.
+        '''
+        if bound is None:
+            bound = INFINITY
+        count = next(self.counter)
+        entry = (priority, count, key, bound, node)
+        if dive:
+            heapq.heappush(self.dive, entry)
+        else:
+            heapq.heappush(self.heap, entry)
+        heapq.heappush(self.bounds, (-bound, count, key))
+        self.open[key] = bound
+        if self.measure_memory:
+            self.sizes[key] = _size(entry, set())
+            self.memory += self.sizes[key]
+
+    def pop(self):
+        '''
+        Removes the node with the lowest priority from the queue and returns
+        it, taking the nodes on the dive queue first. The node remains open
+        until processed() is called for it.
+        '''
+        if self.dive:
+            return heapq.heappop(self.dive)[4]
+        return heapq.heappop(self.heap)[4]
+
+    def processed(self, key):
+        '''
+        Marks the node with the given key as processed.
+        '''
+        self._close(key)
+        if len(self.bounds) > 2*len(self.open) + 64:
+            self._compact_bounds()
+
+    def _close(self, key):
+        del self.open[key]
+        if self.measure_memory:
+            self.memory -= self.sizes.pop(key)
+
+    def open_nodes(self):
+        '''
+        Returns the number of open nodes.
+        '''
+        return len(self.open)
+
+    def bound(self):
+        '''
+        Returns the largest bound of an open node, or -INFINITY if there
+        are no open nodes.
+        '''
+        while self.bounds and self.bounds[0][2] not in self.open:
+            heapq.heappop(self.bounds)
+        if not self.bounds:
+            return -INFINITY
+        return -self.bounds[0][0]
+
+    def _compact_bounds(self):
+        self.bounds = [entry for entry in self.bounds
+                       if entry[2] in self.open]
+        heapq.heapify(self.bounds)
+
+    def prune(self, LB):
+        '''
+        Removes all nodes in the queue whose bound is at most LB. Returns
+        the removed nodes and an estimate of the memory freed in bytes, the
+        memory used by the removed nodes. Objects that the removed nodes
+        share with the remaining nodes, such as the basis of a sibling, are
+        counted as freed.
+        '''
+        self.heap, removed = self._split(self.heap, LB)
+        self.dive, removed_dive = self._split(self.dive, LB)
+        removed += removed_dive
+        if not removed:
+            return [], 0
+        self._compact_bounds()
+        freed = _size(removed, set())
+        return [entry[4] for entry in removed], freed
+
+    def _split(self, entries, LB):
+        '''
+        Closes the nodes among entries whose bound is at most LB. Returns
+        the heap of the other entries and the list of these.
+        '''
+        keep = []
+        removed = []
+        for entry in entries:
+            if entry[3] <= LB:
+                removed.append(entry)
+                self._close(entry[2])
+            else:
+                keep.append(entry)
+        if removed:
+            heapq.heapify(keep)
+        return keep, removed
+
+    def reprioritize(self, priority):
+        '''
+        Replaces the priority of every node in the queue, except those on
+        the dive queue, by priority(bound, node), keeping the order of nodes
+        with the same priority.
+        '''
+        self.heap = [(priority(entry[3], entry[4]),) + entry[1:]
+                     for entry in self.heap]
+        heapq.heapify(self.heap)
+
+    def snapshot(self):
+        '''
+        Returns the entries in the queue, the entries on the dive queue and
+        a list of files holding further entries (see read_snapshot_files()).
+        The entries are (priority, count, key, bound, node) tuples. This is
+        cheap, since the entries themselves are not copied.
+        '''
+        return list(self.heap), list(self.dive), []
+
+    def restore(self, entries, dive_entries):
+        '''
+        Pushes entries and dive_entries, as returned by snapshot(), keeping
+        the order of entries with the same priority.
+        '''
+        for entry in sorted(entries, key = lambda entry: entry[1]):
+            self.push(entry[2], entry[0], entry[4], entry[3])
+        for entry in sorted(dive_entries, key = lambda entry: entry[1]):
+            self.push(entry[2], entry[0], entry[4], entry[3], dive = True)
+
+    def close(self):
+        '''
+        Releases the resources held by the queue.
+        '''
+        pass
+
+def read_snapshot_files(files):
+    '''
+    Returns the entries in the files returned by snapshot() and deletes the
+    files.
+    '''
+    entries = []
+    for file_name in files:
+        with open(file_name, 'rb') as f:
+            entries += pickle.load(f)
+        os.remove(file_name)
+    return entries
+
+class SpillingNodeQueue(NodeQueue):
+    '''
+    A NodeQueue that keeps at most max_nodes nodes in memory, not counting
+    the nodes on the dive queue. When there are more, the half of the nodes
+    in memory that come last are written to a file in a temporary directory
+    created in directory (by default the system's temporary directory).
+    The nodes in a file are read back as soon as one of them is the next
+    node to be taken from the queue.
+    '''
+    def __init__(self, max_nodes, directory = None, measure_memory = False):
+        NodeQueue.__init__(self, measure_memory)
+        self.max_nodes = max(max_nodes, 2)
+        self.directory = tempfile.mkdtemp(prefix = 'grumpy', dir = directory)
+        # The files holding nodes, each a list of the (priority, count) of
+        # its first entry, the file name, the keys of its entries and the
+        # largest bound
+        self.chunks = []
+        self.chunk_count = itertools.count()
+        # The number of nodes in files and the total number of nodes
+        # written to files
+        self.spilled = 0
+        self.spill_count = 0
+
+    def __len__(self):
+        return NodeQueue.__len__(self) + self.spilled
+
+    def push(self, key, priority, node, bound = None, dive = False):
+        NodeQueue.push(self, key, priority, node, bound, dive)
+        if len(self.heap) > self.max_nodes:
+            self._spill()
+
+    def pop(self):
+        if not self.dive:
+            self._read_back()
+        return NodeQueue.pop(self)
+
+    def _write(self, entries):
+        '''
+        Writes entries, which are sorted, to a new file and records it.
+        Files are never changed once written, so that snapshots can link to
+        them.
+        '''
+        file_name = os.path.join(self.directory,
+                                 'nodes%d' %next(self.chunk_count))
+        with open(file_name, 'wb') as f:
+            pickle.dump(entries, f, pickle.HIGHEST_PROTOCOL)
+        self.chunks.append([entries[0][:2], file_name,
+                            [entry[2] for entry in entries],
+                            max(entry[3] for entry in entries)])
+        self.spilled += len(entries)
+        if self.measure_memory:
+            self.memory -= sum(self.sizes[entry[2]] for entry in entries)
+
+    def _read(self, chunk):
+        '''
+        Returns the entries in the file of chunk and deletes the file.
+        '''
+        self.chunks.remove(chunk)
+        self.spilled -= len(chunk[2])
+        with open(chunk[1], 'rb') as f:
+            entries = pickle.load(f)
+        os.remove(chunk[1])
+        if self.measure_memory:
+            self.memory += sum(self.sizes[entry[2]] for entry in entries)
+        return entries
+
+    def _spill(self):
+        entries = sorted(self.heap)
+        half = self.max_nodes//2
+        # A sorted list is a heap
+        self.heap = entries[:half]
+        self._write(entries[half:])
+        self.spill_count += len(entries) - half
+
+    def _read_back(self):
+        '''
+        Reads back the files holding nodes that come before the first node
+        in memory.
+        '''
+        while self.chunks:
+            chunk = min(self.chunks)
+            if self.heap and self.heap[0][:2] < chunk[0]:
+                break
+            self.heap.extend(self._read(chunk))
+            heapq.heapify(self.heap)
+
+    def prune(self, LB):
+        removed, freed = NodeQueue.prune(self, LB)
+        for chunk in list(self.chunks):
+            if chunk[3] <= LB or \
+                    any(self.open[key] <= LB for key in chunk[2]):
+                entries, removed_entries = self._split(self._read(chunk), LB)
+                if entries:
+                    self._write(sorted(entries))
+                removed += [entry[4] for entry in removed_entries]
+        return removed, freed
+
+    def reprioritize(self, priority):
+        # The order of the files changes, so all nodes are read back and
+        # spilled again
+        for chunk in list(self.chunks):
+            self.heap.extend(self._read(chunk))
+        NodeQueue.reprioritize(self, priority)
+        while len(self.heap) > self.max_nodes:
+            self._spill()
+
+    def snapshot(self):
+        entries, dive_entries, files = NodeQueue.snapshot(self)
+        for chunk in self.chunks:
+            file_name = os.path.join(self.directory,
+                                     'snapshot%d' %next(self.chunk_count))
+            try:
+                os.link(chunk[1], file_name)
+            except OSError:
+                shutil.copyfile(chunk[1], file_name)
+            files.append(file_name)
+        return entries, dive_entries, files
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors = True)
@@ -0,0 +1,534 @@
+__author__ = 'Ted Ralphs'
+__maintainer__ = 'Ted Ralphs (ted@lehigh.edu)'
+
+"""
+Observers of the branch-and-bound algorithm.
+
+BranchAndBoundArrays() reports its progress as a sequence of events, which
+are passed to the observers given to it. An observer is an object derived
+from BBObserver that overrides the methods of the events it is interested
+in. Without observers, the algorithm runs silently. ConsoleObserver prints
+the progress of the algorithm and TreeObserver builds the branch-and-bound
+tree in a BBTree object.
+"""
+
+import sys, math
+import numpy as np
+from .BBTree import MOST_FRACTIONAL, FIXED_BRANCHING, PSEUDOCOST_BRANCHING
+from .BBTree import STRONG_BRANCHING, RELIABILITY_BRANCHING, PENALTY_BRANCHING
+from .BBTree import DEPTH_FIRST, BEST_FIRST, BEST_ESTIMATE, HYBRID_PLUNGING
+from .BBTree import ADAPTIVE_SEARCH, INFINITY, THREADS
+
+def _print_solution(x, var_names):
+    '''
+    Prints the variables with positive values in solution x.
+    '''
+    for j in np.flatnonzero(x > 0):
+        print("%s = %s" %(var_names[j], x[j]))
+
+def _add_key(T):
+    '''
+    Adds the key explaining the node colors to the tree T.
+    '''
+    if T.get_layout() == 'dot2tex':
+        cluster_attrs = {'name':'Key', 'label':r'\text{Key}', 'fontsize':'12'}
+        T.add_node('C', label = r'\text{Candidate}', style = 'filled',
+                      color = 'yellow', fillcolor = 'yellow')
+        T.add_node('I', label = r'\text{Infeasible}', style = 'filled',
+                      color = 'orange', fillcolor = 'orange')
+        T.add_node('S', label = r'\text{Solution}', style = 'filled',
+                      color = 'lightblue', fillcolor = 'lightblue')
+        T.add_node('P', label = r'\text{Pruned}', style = 'filled',
+                      color = 'red', fillcolor = 'red')
+        T.add_node('PC', label = r'\text{Pruned}$\\ $\text{Candidate}', style = 'filled',
+                      color = 'red', fillcolor = 'yellow')
+    else:
+        cluster_attrs = {'name':'Key', 'label':'Key', 'fontsize':'12'}
+        T.add_node('C', label = 'Candidate', style = 'filled',
+                      color = 'yellow', fillcolor = 'yellow')
+        T.add_node('I', label = 'Infeasible', style = 'filled',
+                      color = 'orange', fillcolor = 'orange')
+        T.add_node('S', label = 'Solution', style = 'filled',
+                      color = 'lightblue', fillcolor = 'lightblue')
+        T.add_node('P', label = 'Pruned', style = 'filled',
+                      color = 'red', fillcolor = 'red')
+        T.add_node('PC', label = 'Pruned \n Candidate', style = 'filled',
+                      color = 'red', fillcolor = 'yellow')
+    T.add_edge('C', 'I', style = 'invisible', arrowhead = 'none')
+    T.add_edge('I', 'S', style = 'invisible', arrowhead = 'none')
+    T.add_edge('S', 'P', style = 'invisible', arrowhead = 'none')
+    T.add_edge('P', 'PC', style = 'invisible', arrowhead = 'none')
+    T.create_cluster(['C', 'I', 'S', 'P', 'PC'], cluster_attrs)
+
+def _update_tree(T, cur_index, parent, status, relax, parent_relax,
+                 integer_infeasibility_count, integer_infeasibility_sum,
+                 branch_var_name, branch_var_value, sense, rhs, color,
+                 lp_iterations):
+    '''
+    Adds a processed node to the tree T, or updates it. Unlike in a file, a
+    node may be fathomed before the first incumbent of the tree, by a
+    solution that the search takes from other searches (see
+    SharedIncumbent).
+    '''
+    if status == 'infeasible':
+        if T.get_layout() == 'dot2tex':
+            label = r'\text{I}'
+        else:
+            label = 'I'
+    else:
+        label = "%.1f"%relax
+    if parent is None:
+        if status != 'candidate':
+            integer_infeasibility_count = None
+            integer_infeasibility_sum = None
+        T.AddOrUpdateNode(0, None, None, 'candidate', relax,
+                         integer_infeasibility_count,
+                         integer_infeasibility_sum,
+                         label = label,
+                         obj = relax, color = color,
+                         style = 'filled', fillcolor = color,
+                         lp_iterations = lp_iterations)
+        if status == 'integer':
+            T._previous_incumbent_value = T._incumbent_value
+            T._incumbent_value = relax
+            T._incumbent_parent = -1
+            T._new_integer_solution = True
+#           #Currently broken
+#           if ETREE_INSTALLED and T.attr['display'] == 'svg':
+#               T.write_as_svg(filename = "node%d" % iter_count,
+#                                 nextfile = "node%d" % (iter_count + 1),
+#                                 highlight = cur_index)
+    else:
+        _direction = {'<=':'L', '>=':'R'}
+        if status == 'infeasible':
+            integer_infeasibility_count = T.get_node_attr(parent,
+                                 'integer_infeasibility_count')
+            integer_infeasibility_sum = T.get_node_attr(parent,
+                                 'integer_infeasibility_sum')
+            relax = parent_relax
+        elif status == 'integer':
+            integer_infeasibility_count = None
+            integer_infeasibility_sum = None
+        T.AddOrUpdateNode(cur_index, parent, _direction[sense],
+                             status, relax,
+                             integer_infeasibility_count,
+                             integer_infeasibility_sum,
+                             branch_var = branch_var_name,
+                             branch_var_value = branch_var_value,
+                             sense = sense, rhs = rhs, obj = relax,
+                             color = color, style = 'filled',
+                             label = label, fillcolor = color,
+                             lp_iterations = lp_iterations)
+        if status == 'integer':
+            T._previous_incumbent_value = T._incumbent_value
+            T._incumbent_value = relax
+            T._incumbent_parent = parent
+            T._new_integer_solution = True
+        # Currently Broken
+#           if ETREE_INSTALLED and T.attr['display'] == 'svg':
+#               T.write_as_svg(filename = "node%d" % iter_count,
+#                                 prevfile = "node%d" % (iter_count - 1),
+#                                 nextfile = "node%d" % (iter_count + 1),
+#                                 highlight = cur_index)
+        if T.get_layout() == 'dot2tex':
+            _dot2tex_label = {'>=':' \geq ', '<=':' \leq '}
+            T.set_edge_attr(parent, cur_index, 'label',
+                               str(branch_var_name) +
+                               _dot2tex_label[sense] +
+                               str(rhs))
+        else:
+            T.set_edge_attr(parent, cur_index, 'label',
+                               str(branch_var_name) + sense +
+                               str(rhs))
+
+class BBObserver(object):
+    '''
+    Base class of the observers of BranchAndBoundArrays(). The methods are
+    called when the corresponding events occur and do nothing by default.
+    Nodes are identified by their index, the root has index 0.
+    '''
+    def started(self, var_names, branch_strategy, search_strategy,
+                complete_enumeration, workers, parallel_mode, deterministic):
+        '''
+        Called before the root node is solved.
+        '''
+        pass
+
+    def node_solved(self, index, depth, LB, bounds, lp_status, lp_value,
+                    lp_iterations, x, relax, integer):
+        '''
+        Called after the LP relaxation of a node has been solved. LB is the
+        value of the incumbent before the node was solved and bounds the
+        bound changes of the node, a tuple of (var index, lower, upper)
+        triples. lp_status, lp_value, lp_iterations and x are the results
+        of the LP solver, relax is the bound given by the node and integer
+        is True if x is integral.
+        '''
+        pass
+
+    def incumbent_found(self, index, value, x):
+        '''
+        Called when the solution x of the LP relaxation of a node is a new
+        best solution with objective value value.
+        '''
+        pass
+
+    def heuristic_found(self, index, heuristic, value, x):
+        '''
+        Called when the primal heuristic heuristic, run on the solution of
+        the LP relaxation of node index, has found a new best solution x
+        with objective value value.
+        '''
+        pass
+
+    def pruned(self, index, parent, depth, LB, reason, value):
+        '''
+        Called when a node is pruned. reason is 'parent bound' if the node
+        is pruned by the bound of its parent before its LP relaxation is
+        solved, 'penalty' if it is discarded right after its parent was
+        branched because its bound lowered by its penalty is at most LB, and
+        otherwise 'integer', 'infeasible', 'bound' or 'leaf'. value is the
+        bound given by the node.
+        '''
+        pass
+
+    def queue_pruned(self, LB, nodes, freed):
+        '''
+        Called when the incumbent has improved to LB and the open nodes it
+        prunes have been removed from the queue. nodes is a list of (index,
+        parent) pairs of the removed nodes and freed an estimate of the
+        memory freed in bytes.
+        '''
+        pass
+
+    def branched(self, index, value, branch_var, branch_var_value,
+                 down_index, up_index):
+        '''
+        Called when a node with bound value is branched on variable
+        branch_var, which has value branch_var_value in the solution of its
+        LP relaxation. down_index and up_index are the indices of the
+        children.
+        '''
+        pass
+
+    def strong_branched(self, index, results, lp_count, lp_iterations):
+        '''
+        Called when strong branching has evaluated candidates for branching
+        at a node. results is a list of (var index, down value, up value)
+        triples with the values of the LP relaxations of the children,
+        which are None if a child is infeasible and only estimates if its
+        solve was stopped by the iteration limit. lp_count LPs were solved
+        with lp_iterations simplex iterations (None if the LP solver does
+        not report them). These LPs are not counted as node LPs.
+        '''
+        pass
+
+    def strategy_switched(self, node_count, old, new, reason):
+        '''
+        Called when the search strategy is switched from old to new after
+        node_count nodes were created. reason says why.
+        '''
+        pass
+
+    def finished(self, LB, x, node_count, lp_count, lp_iter_count, time,
+                 stopped):
+        '''
+        Called when the algorithm is done. lp_iter_count is None if the LP
+        solver does not report simplex iterations and time is the running
+        time in seconds. stopped is the reason for stopping the search
+        ('stop event', 'time limit', 'node limit' or 'gap limit') or None
+        if it is complete.
+        '''
+        pass
+
+class ConsoleObserver(BBObserver):
+    '''
+    Prints the progress of the algorithm.
+    '''
+    _stop_message = {'stop event' : "Search stopped",
+                     'time limit' : "Time limit reached",
+                     'node limit' : "Node limit reached",
+                     'gap limit' : "Gap limit reached"}
+
+    def started(self, var_names, branch_strategy, search_strategy,
+                complete_enumeration, workers, parallel_mode, deterministic):
+        self.var_names = var_names
+        self.branch_strategy = branch_strategy
+        self.complete_enumeration = complete_enumeration
+        self.sb_lp_count = 0
+        self.sb_lp_iter_count = None
+        print("===========================================")
+        print("Starting Branch and Bound")
+        if branch_strategy == MOST_FRACTIONAL:
+            print("Most fractional variable")
+        elif branch_strategy == FIXED_BRANCHING:
+            print("Fixed order")
+        elif branch_strategy == PSEUDOCOST_BRANCHING:
+            print("Pseudocost brancing")
+        elif branch_strategy == STRONG_BRANCHING:
+            print("Strong branching")
+        elif branch_strategy == RELIABILITY_BRANCHING:
+            print("Reliability branching")
+        elif branch_strategy == PENALTY_BRANCHING:
+            print("Penalty branching")
+        else:
+            print("Unknown branching strategy %s" %branch_strategy)
+        if search_strategy == DEPTH_FIRST:
+            print("Depth first search strategy")
+        elif search_strategy == BEST_FIRST:
+            print("Best first search strategy")
+        elif search_strategy == BEST_ESTIMATE:
+            print("Best estimate search strategy")
+        elif search_strategy == HYBRID_PLUNGING:
+            print("Hybrid plunging search strategy")
+        elif search_strategy == ADAPTIVE_SEARCH:
+            print("Adaptive search strategy")
+        else:
+            print("Unknown search strategy %s" %search_strategy)
+        if workers > 1:
+            if parallel_mode == THREADS:
+                print("%s worker threads" %workers, end=' ')
+            else:
+                print("%s worker processes" %workers, end=' ')
+            if deterministic:
+                print("(deterministic)")
+            else:
+                print("(asynchronous)")
+        print("===========================================")
+
+    def _print_node(self, index, depth, LB):
+        print("")
+        print("----------------------------------------------------")
+        print("")
+        if LB > -INFINITY:
+            print("Node: %s, Depth: %s, LB: %s" %(index, depth, LB))
+        else:
+            print("Node: %s, Depth: %s, LB: %s" %(index, depth, "None"))
+
+    def node_solved(self, index, depth, LB, bounds, lp_status, lp_value,
+                    lp_iterations, x, relax, integer):
+        self._print_node(index, depth, LB)
+        if bounds:
+            sys.stdout.write("Branching variables: ")
+            for (j, lower, upper) in bounds:
+                print(self.var_names[j], end=' ')
+            print()
+        if lp_status == "Infeasible" or lp_status == "Undefined":
+            print("LP Solved, status: Infeasible")
+        else:
+            print("LP Solved, status: %s, obj: %s" %(lp_status, lp_value))
+        if lp_iterations is not None:
+            print("Simplex iterations: %s" %lp_iterations)
+        if lp_status == "Optimal":
+            # A new best solution is printed by incumbent_found()
+            if integer and relax <= LB:
+                print("New integer solution found, objective: %s" %relax)
+                _print_solution(x, self.var_names)
+            elif not integer:
+                print("Fractional solution:")
+                _print_solution(x, self.var_names)
+
+    def incumbent_found(self, index, value, x):
+        print("New best solution found, objective: %s" %value)
+        _print_solution(x, self.var_names)
+
+    def heuristic_found(self, index, heuristic, value, x):
+        print("New best solution found by %s heuristic, objective: %s"
+              %(heuristic, value))
+        _print_solution(x, self.var_names)
+
+    def pruned(self, index, parent, depth, LB, reason, value):
+        if reason == 'parent bound':
+            self._print_node(index, depth, LB)
+            print("Node pruned immediately by bound")
+        elif reason == 'penalty':
+            print("Child %s pruned by penalty (bound: %s, UB: %s)"
+                  %(index, value, LB))
+        elif reason == 'integer':
+            print("Integer solution")
+        elif reason == 'infeasible':
+            print("Infeasible node")
+        elif reason == 'bound':
+            print("Node pruned by bound (obj: %s, UB: %s)" %(value, LB))
+        else:
+            print("Reached a leaf")
+
+    def queue_pruned(self, LB, nodes, freed):
+        print("")
+        print("%s open nodes pruned by bound, %s bytes freed"
+              %(len(nodes), freed))
+
+    def branched(self, index, value, branch_var, branch_var_value,
+                 down_index, up_index):
+        print("Branching on variable %s" %self.var_names[branch_var])
+
+    def strong_branched(self, index, results, lp_count, lp_iterations):
+        print("Strong branching on %s candidates, %s LP's solved"
+              %(len(results), lp_count))
+        self.sb_lp_count += lp_count
+        if lp_iterations is not None:
+            self.sb_lp_iter_count = (self.sb_lp_iter_count or 0) + \
+                lp_iterations
+
+    def strategy_switched(self, node_count, old, new, reason):
+        print("")
+        print("Switching from %s to %s search after %s nodes: %s"
+              %(old, new, node_count, reason))
+
+    def finished(self, LB, x, node_count, lp_count, lp_iter_count, time,
+                 stopped):
+        if stopped is not None:
+            print(self._stop_message.get(stopped, "Search stopped"))
+        print("")
+        print("===========================================")
+        print("Branch and bound completed in %sms"
+              %int(math.ceil(time*1000)))
+        print("Strategy: %s" %self.branch_strategy)
+        if self.complete_enumeration:
+            print("Complete enumeration")
+        print("%s nodes visited " %node_count)
+        print("%s LP's solved" %lp_count)
+        if lp_iter_count is not None:
+            print("%s simplex iterations" %lp_iter_count)
+        if self.sb_lp_count > 0:
+            print("%s strong branching LP's solved" %self.sb_lp_count)
+            if self.sb_lp_iter_count is not None:
+                print("%s strong branching simplex iterations"
+                      %self.sb_lp_iter_count)
+        print("===========================================")
+        print("Optimal solution")
+        #print optimal solution
+        for j in sorted(range(len(x)), key = lambda j: self.var_names[j]):
+            if x[j] > 0:
+                print("%s = %s" %(self.var_names[j], x[j]))
+        print("Objective function value")
+        print(LB)
+        print("===========================================")
+
+class TreeObserver(BBObserver):
+    '''
+    Builds the branch-and-bound tree in the BBTree object T. The tree is
+    displayed every display_interval nodes, if given, and at the end unless
+    the display mode of T is 'off'. The statistics of the algorithm are
+    stored in T._node_count, T._lp_count, T._lp_iter_count and T._stopped,
+    the LPs and simplex iterations of strong branching in T._sb_lp_count and
+    T._sb_lp_iter_count, the LPs saved by discarding children by their
+    penalties in T._saved_lp_count and the number of new best solutions
+    found by primal heuristics in T._heuristic_count. These solutions are
+    recorded as heuristic lines (see BBTree.ProcessHeuristicLine()).
+    '''
+    _status = {'integer' : ('integer', 'lightblue'),
+               'infeasible' : ('infeasible', 'orange'),
+               'bound' : ('fathomed', 'red'),
+               'leaf' : ('fathomed', 'red')}
+
+    def __init__(self, T, display_interval = None):
+        self.T = T
+        self.display_interval = display_interval
+        # The number of nodes solved
+        self.iter_count = 0
+        # The parent, branching variable, its value, the sense and right
+        # hand side of the branching constraint and the bound of the parent
+        # of the open nodes
+        self.branching = {}
+
+    def started(self, var_names, branch_strategy, search_strategy,
+                complete_enumeration, workers, parallel_mode, deterministic):
+        self.var_names = var_names
+        self.T._sb_lp_count = 0
+        self.T._sb_lp_iter_count = 0
+        self.T._saved_lp_count = 0
+        self.T._heuristic_count = 0
+        _add_key(self.T)
+
+    def node_solved(self, index, depth, LB, bounds, lp_status, lp_value,
+                    lp_iterations, x, relax, integer):
+        self.iter_count += 1
+        self.lp_iterations = lp_iterations
+        # Determine integer_infeasibility_count and
+        # Integer_infeasibility_sum for scatterplot and such
+        if lp_status == "Optimal":
+            non_binary = (x != 0) & (x != 1)
+            self.integer_infeasibility_count = int(non_binary.sum())
+            self.integer_infeasibility_sum = float(
+                np.minimum(x, 1.0-x)[non_binary].sum())
+        else:
+            self.integer_infeasibility_count = None
+            self.integer_infeasibility_sum = None
+
+    def _update(self, index, status, relax, color):
+        parent, branch_var, branch_var_value, sense, rhs, parent_relax = \
+            self.branching.pop(index, (None, None, None, None, None, None))
+        if parent is None:
+            branch_var_name = None
+        else:
+            branch_var_name = self.var_names[branch_var]
+        _update_tree(self.T, index, parent, status, relax, parent_relax,
+                     self.integer_infeasibility_count,
+                     self.integer_infeasibility_sum, branch_var_name,
+                     branch_var_value, sense, rhs, color,
+                     self.lp_iterations)
+
+    def _display(self):
+        if self.T.root is not None and self.display_interval is not None \
+                and self.iter_count%self.display_interval == 0:
+            self.T.display(count=self.iter_count)
+
+    def pruned(self, index, parent, depth, LB, reason, value):
+        if reason in ('parent bound', 'penalty'):
+            if reason == 'penalty':
+                self.T._saved_lp_count += 1
+            self.branching.pop(index, None)
+            self.T.set_node_attr(parent, 'color', 'red')
+            return
+        status, color = self._status[reason]
+        self._update(index, status, value, color)
+        self._display()
+
+    def queue_pruned(self, LB, nodes, freed):
+        for index, parent in nodes:
+            self.branching.pop(index, None)
+            self.T.set_node_attr(parent, 'color', 'red')
+
+    def branched(self, index, value, branch_var, branch_var_value,
+                 down_index, up_index):
+        color = 'yellow'
+        self._update(index, 'candidate', value, color)
+        self.branching[down_index] = (index, branch_var, branch_var_value,
+                                      '<=', math.floor(branch_var_value),
+                                      value)
+        self.branching[up_index] = (index, branch_var, branch_var_value,
+                                    '>=', math.ceil(branch_var_value),
+                                    value)
+        self.T.set_node_attr(index, color, 'green')
+        self._display()
+
+    def heuristic_found(self, index, heuristic, value, x):
+        self.T._heuristic_count += 1
+        # The problem is a maximization problem, which the tree may not
+        # have guessed yet
+        if self.T._optimization_sense is None:
+            self.T._optimization_sense = 'max'
+        tokens = [repr(value)]
+        if index is not None:
+            tokens.append(str(index))
+        self.T.ProcessHeuristicLine(tokens)
+        # Node ids in a tree built as we go are integers, not strings
+        if index is not None and self.T._incumbent_parent == str(index):
+            self.T._incumbent_parent = index
+
+    def strong_branched(self, index, results, lp_count, lp_iterations):
+        self.T._sb_lp_count += lp_count
+        if lp_iterations is not None:
+            self.T._sb_lp_iter_count += lp_iterations
+
+    def finished(self, LB, x, node_count, lp_count, lp_iter_count, time,
+                 stopped):
+        if self.T.attr['display'] != 'off':
+            self.T.display(count=self.iter_count)
+        self.T._node_count = node_count
+        self.T._lp_count = lp_count
+        if lp_iter_count is None:
+            lp_iter_count = 0
+        self.T._lp_iter_count = lp_iter_count
+        self.T._stopped = stopped is not None
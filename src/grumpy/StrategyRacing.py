@@ -0,0 +1,178 @@
+__author__ = 'Ted Ralphs'
+__maintainer__ = 'Ted Ralphs (ted@lehigh.edu)'
+
+"""
+Racing of branching and search strategies.
+
+Which combination of branching and search strategy solves a problem with
+the fewest nodes is hard to know in advance. RaceStrategies() therefore
+solves the problem with several combinations at the same time, each in its
+own process. The racers share their incumbents through a SharedIncumbent,
+so a solution found by one racer is used for pruning by all of them. As
+soon as one racer has proved optimality, the others are stopped.
+"""
+
+import time, queue, itertools, multiprocessing
+import numpy as np
+from .BBTree import BBTree, INFINITY
+from .BBTree import MOST_FRACTIONAL, FIXED_BRANCHING, PSEUDOCOST_BRANCHING
+from .BBTree import DEPTH_FIRST, BEST_FIRST, BEST_ESTIMATE
+from .BranchAndBound import BranchAndBoundArrays
+from .LPBackends import PULP
+
+class SharedIncumbent(object):
+    '''
+    The best known solution of a problem with numVars variables and its
+    objective value, shared between processes.
+    '''
+    def __init__(self, numVars):
+        self.array = multiprocessing.Array('d', numVars + 1)
+        self.array[0] = -INFINITY
+
+    def value(self):
+        '''
+        Returns the objective value of the best known solution.
+        '''
+        return self.array[0]
+
+    def get(self):
+        '''
+        Returns the objective value of the best known solution and the
+        solution.
+        '''
+        with self.array.get_lock():
+            return self.array[0], np.array(self.array[1:])
+
+    def update(self, value, x):
+        '''
+        Stores solution x with objective value value if it is better than
+        the best known solution.
+        '''
+        with self.array.get_lock():
+            if value > self.array[0]:
+                self.array[0] = value
+                self.array[1:] = np.asarray(x, dtype = float).tolist()
+
+def _race(index, c, A, b, var_names, branch_strategy, search_strategy,
+          binary_vars, lp_solver, warm_start, shared_incumbent, stop_event,
+          winner, results):
+    '''
+    Runs one racer and puts its results into the queue results. The first
+    racer to complete its search becomes the winner and stops the others.
+    '''
+    T = BBTree()
+    T.set_display_mode('off')
+    start = time.time()
+    try:
+        x, LB = BranchAndBoundArrays(T, c, A, b, var_names = var_names,
+                                     branch_strategy = branch_strategy,
+                                     search_strategy = search_strategy,
+                                     binary_vars = binary_vars,
+                                     lp_solver = lp_solver,
+                                     warm_start = warm_start,
+                                     shared_incumbent = shared_incumbent,
+                                     stop_event = stop_event)
+    except Exception as e:
+        results.put((index, None, None, None,
+                     {'status' : 'error: %s' %e}))
+        return
+    if T._stopped:
+        status = 'stopped'
+    else:
+        with winner.get_lock():
+            if winner.value < 0:
+                winner.value = index
+        stop_event.set()
+        if winner.value == index:
+            status = 'won'
+        else:
+            status = 'finished'
+    stats = {'status' : status,
+             'nodes' : T._node_count,
+             'lp_count' : T._lp_count,
+             'lp_iter_count' : T._lp_iter_count,
+             'time' : time.time() - start}
+    if status != 'won':
+        T = None
+    results.put((index, x, LB, T, stats))
+
+def RaceStrategies(c, A, b, strategies = None, var_names = None,
+                   binary_vars = True, lp_solver = PULP, warm_start = True):
+    '''
+    Solves max cx s.t. Ax <= b (see BranchAndBoundArrays()) with every
+    combination in strategies, a list of (branching strategy, search
+    strategy) pairs, in a separate process. By default all combinations of
+    MOST_FRACTIONAL, FIXED_BRANCHING and PSEUDOCOST_BRANCHING with
+    DEPTH_FIRST, BEST_FIRST and BEST_ESTIMATE race. Returns the best solution
+    found, its objective value, the tree of the winner (the first racer to
+    prove optimality) and a list with statistics for each racer. The
+    statistics are a dictionary with the strategies, the status ('won',
+    'finished' if the racer completed after the winner, or 'stopped'), the
+    number of nodes, LPs solved and simplex iterations and the time in
+    seconds. Nothing is printed, see PrintRaceResults().
+    '''
+    c = np.asarray(c, dtype = float)
+    if strategies is None:
+        strategies = list(itertools.product(
+            [MOST_FRACTIONAL, FIXED_BRANCHING, PSEUDOCOST_BRANCHING],
+            [DEPTH_FIRST, BEST_FIRST, BEST_ESTIMATE]))
+    shared_incumbent = SharedIncumbent(len(c))
+    stop_event = multiprocessing.Event()
+    winner = multiprocessing.Value('i', -1)
+    results = multiprocessing.Queue()
+    racers = []
+    for index, (branch_strategy, search_strategy) in enumerate(strategies):
+        racer = multiprocessing.Process(target = _race,
+                                        args = (index, c, A, b, var_names,
+                                                branch_strategy,
+                                                search_strategy, binary_vars,
+                                                lp_solver, warm_start,
+                                                shared_incumbent, stop_event,
+                                                winner, results))
+        racer.start()
+        racers.append(racer)
+    stats = [None]*len(strategies)
+    T = None
+    count = 0
+    while count < len(strategies):
+        try:
+            index, x, LB, racer_T, racer_stats = results.get(timeout = 0.1)
+        except queue.Empty:
+            if not any(racer.is_alive() for racer in racers) and \
+                    results.empty():
+                break
+            continue
+        count += 1
+        stats[index] = racer_stats
+        if racer_T is not None:
+            T = racer_T
+    for racer in racers:
+        racer.join()
+    LB, x = shared_incumbent.get()
+    for index, (branch_strategy, search_strategy) in enumerate(strategies):
+        if stats[index] is None:
+            stats[index] = {'status' : 'error'}
+        stats[index]['branch_strategy'] = branch_strategy
+        stats[index]['search_strategy'] = search_strategy
+    return x, LB, T, stats
+
+def PrintRaceResults(LB, stats):
+    '''
+    Prints a table of the statistics of the racers and the objective value
+    LB, as returned by RaceStrategies().
+    '''
+    print("===========================================")
+    print("Strategy race")
+    print("%-22s | %-17s | %-8s | %6s | %6s" %('branching strategy',
+                                             'search strategy', 'status',
+                                             'nodes', 'LPs'))
+    print("-"*71)
+    for racer_stats in stats:
+        print("%-22s | %-17s | %-8s | %6s | %6s"
+              %(racer_stats['branch_strategy'],
+                racer_stats['search_strategy'], racer_stats['status'],
+                racer_stats.get('nodes', ''),
+                racer_stats.get('lp_count', '')))
+    print("Objective function value")
+    print(LB)
+    print("===========================================")
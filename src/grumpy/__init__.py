@@ -1,5 +1,13 @@
 from .BBTree import *
 from .BranchAndBound import *
+from .LPBackends import *
+from .DualSimplex import *
+from .Heuristics import *
+from .Observers import *
+from .NodeQueue import *
+from .DistributedBranchAndBound import *
+from .StrategyRacing import *
+from .BatchSolve import *
 try:
     from .polyhedron2D import *
 except ImportError:
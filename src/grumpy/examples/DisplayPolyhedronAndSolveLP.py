@@ -3,13 +3,17 @@ try:
 except ImportError:
     from coinor.grumpy.polyhedron2D import Polyhedron2D, Figure
 
+import numpy as np
 CYLP_INSTALLED = True
 try:
-    import numpy as np
     from cylp.cy import CyClpSimplex
     from cylp.py.modeling import CyLPArray, CyLPModel
 except ImportError:
     CYLP_INSTALLED = False
+try:
+    from src.grumpy.DualSimplex import DualSimplex
+except ImportError:
+    from coinor.grumpy.DualSimplex import DualSimplex
     
 from coinor.grumpy.examples import LP2 as LP
 
@@ -96,7 +100,52 @@ if p is not None:
             disp_polyhedron(A = A, b = b, c = c, obj_val = obj_val,
                             opt = psol.tolist(), loc = (psol[0]+0.1, psol[1]-0.1))
     else:
-        print(LP.A)
-        print(LP.b)
+        # Without CyLP, the LP is solved with the NumPy dual simplex method,
+        # which works with max cx s.t. Ax <= b
+        A = np.array(p.hrep.A, dtype = float)
+        b = np.array(p.hrep.b, dtype = float)
+        
+        print(A)
+        print(b)
+    
+        if LP.numVars == 2:
+            disp_polyhedron(A = A, b = b)
+    
+        c = np.array(LP.c, dtype = float)
+        if LP.sense[0] == '>=':
+            A_le, b_le = -A, -b
+        else:
+            A_le, b_le = A, b
+        if LP.sense[1] == 'Min':
+            c_max = -c
+        else:
+            c_max = c
+        lp = DualSimplex(c_max, A_le, b_le, np.full(LP.numVars, -np.inf),
+                         np.full(LP.numVars, np.inf))
+        status = lp.solve()
+        if status != 'Optimal':
+            print('LP status:', status)
+        else:
+            np.set_printoptions(precision = 2, linewidth = 200)
+            print('Basic variables: ', lp.basic_variables())
+            print("Current tableaux and reduced costs:")
+            print(np.around(lp.tableau_reduced_costs(), decimals = 3))
+            print(np.around(lp.tableau(), decimals = 3))
+            print('Right-hand side of optimal tableaux:')
+            print(lp.rhs())
+            print('Inverse of optimal basis:')
+            print(np.around(lp.basis_inverse(), 3))
+            if LP.sense[1] == 'Min':
+                obj_val = -lp.objective
+            else:
+                obj_val = lp.objective
+            
+            psol = np.around(lp.x, 2)
+            print('Optimal Value:', obj_val)
+            print('Primal solution:', psol)
+            print('Dual solution:', lp.duals)
     
-        disp_polyhedron(A = p.hrep.A, b = p.hrep.b)
+            if LP.numVars == 2:
+                disp_polyhedron(A = A, b = b, c = c, obj_val = obj_val,
+                                opt = psol.tolist(),
+                                loc = (psol[0]+0.1, psol[1]-0.1))
@@ -142,8 +142,6 @@ class DoubleExponentialSmoothingForecaster(object):
                          (1 - self._alpha) * self._S_t)
             updated = True
 
-        print('delta: %f' %delta)
-        print('self._lambda*self._b_t: %f' %(self._lambda*self._b_t))
         if delta < self._lambda * self._b_t:
             if not updated:
                 self._b_t = self._gamma * delta + (1 - self._gamma) * self._b_t
@@ -152,9 +150,6 @@ class DoubleExponentialSmoothingForecaster(object):
                 updated = True
 
             forecast = (time + (float(-self._S_t)/min(delta,self._b_t)))
-            print('A', time, previous_value, measure_value, end=' ')
-            print(self._S_t, self._b_t, forecast)
-            #cent = float(input("STOP"))
         elif len(self._forecasts) >= 1:
             # The measure didn't change but we have a previous forecast
             if self._forecasts[-1].forecast >= time:
@@ -165,26 +160,15 @@ class DoubleExponentialSmoothingForecaster(object):
                              self._measures[-2].active_node_count)) *
                             (self._forecasts[-1].forecast -
                              self._forecasts[-1].time))
-
-            print('B', time, previous_value, measure_value, forecast)
-            #cent = float(input("STOP"))
         else:
             # The measure didn't change and we have no previous forecast
             forecast = (time +
                         (float(self._measures[-1].active_node_count * time)/
                         (self._measures[-1].node_count -
                          self._measures[-1].active_node_count)))
-            print('C', time, previous_value, measure_value, forecast)
 
         self._forecasts.append(TimeForecast(time, forecast))
 
-        #if (time >= 200):
-        #    cent = float(input("STOP"))
-
-        #if (forecast >= 60000):
-        #    cent = float(input("STOP"))
-
-
     def GetForecasts(self):
         return self._forecasts
 
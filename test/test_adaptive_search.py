@@ -0,0 +1,55 @@
+'''
+Tests the adaptive search strategy. It must give the same optimal value as
+depth first search, switch to best first search once, after an incumbent was
+found, and report the switch to the observers.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, BBObserver
+from coinor.grumpy import DUAL_SIMPLEX, DEPTH_FIRST, BEST_FIRST
+from coinor.grumpy import ADAPTIVE_SEARCH
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (30,20,4),
+           (40,20,5),
+           ]
+
+class SwitchObserver(BBObserver):
+    def __init__(self):
+        self.first_incumbent = None
+        self.switches = []
+
+    def incumbent_found(self, index, value, x):
+        if self.first_incumbent is None:
+            self.first_incumbent = index
+
+    def strategy_switched(self, node_count, old, new, reason):
+        self.switches.append((node_count, old, new))
+
+def test_adaptive_search():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX,
+                                       search_strategy = DEPTH_FIRST)
+        nodes = {}
+        for max_nodes in [None, 3]:
+            stats = {}
+            observer = SwitchObserver()
+            solution, LB = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ,
+                                          MAT, RHS, lp_solver = DUAL_SIMPLEX,
+                                          search_strategy = ADAPTIVE_SEARCH,
+                                          max_nodes_in_memory = max_nodes,
+                                          stats = stats,
+                                          observers = [observer])
+            assert(LB == opt)
+            assert(stats['strategy_switches'] == observer.switches)
+            assert(len(observer.switches) == 1)
+            node_count, old, new = observer.switches[0]
+            assert(old == DEPTH_FIRST and new == BEST_FIRST)
+            assert(node_count > observer.first_incumbent)
+            nodes[max_nodes] = stats['nodes']
+        assert(nodes[3] == nodes[None])
@@ -0,0 +1,61 @@
+'''
+Tests the array interface of the branch and bound algorithm and the random
+problem generators. Problems given as dense arrays and as sparse matrices must
+give the same optimal values as the dictionary interface.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, BranchAndBoundArrays
+from coinor.grumpy import MIPDictsToArrays, GenerateRandomMIPArrays
+from coinor.grumpy import PSEUDOCOST_BRANCHING, BEST_FIRST
+import numpy as np
+import random
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(10,10,0),
+           (20,10,3),
+           ]
+
+def test_arrays():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, branch_strategy = PSEUDOCOST_BRANCHING,
+                                       search_strategy = BEST_FIRST)
+        c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+        matrices = [A]
+        try:
+            import scipy.sparse
+            matrices.append(scipy.sparse.csr_matrix(A))
+        except ImportError:
+            pass
+        for M in matrices:
+            x, opt_arrays = BranchAndBoundArrays(None, c, M, b,
+                                                 branch_strategy = PSEUDOCOST_BRANCHING,
+                                                 search_strategy = BEST_FIRST)
+            assert(opt_arrays == opt)
+            assert(np.all(A.dot(x) <= b + 1e-6))
+            assert(np.allclose(x, [solution[v] for v in VARIABLES]))
+
+def test_generator():
+    # the generators must not touch the global random state
+    state = random.getstate()
+    c, A, b = GenerateRandomMIPArrays(numVars=200, numCons=50, density=0.05,
+                                      rand_seed=1)
+    GenerateRandomMIP(numVars=10, numCons=10, rand_seed=0)
+    assert(state == random.getstate())
+    # the same seed gives the same instance
+    c2, A2, b2 = GenerateRandomMIPArrays(numVars=200, numCons=50, density=0.05,
+                                         rand_seed=1, sparse=False)
+    assert(A.shape == (50, 200))
+    assert(np.array_equal(c, c2) and np.array_equal(b, b2))
+    assert(np.array_equal(A.toarray() if hasattr(A, 'toarray') else A, A2))
+    # legacy mode reproduces the values hard-coded in test_bb.py
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=10,
+                                                              numCons=10,
+                                                              rand_seed=0,
+                                                              legacy=True)
+    solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+    assert(opt == 50)
@@ -0,0 +1,88 @@
+'''
+Tests the LP solvers that can be used by the branch and bound algorithm. Every
+installed LP solver must lead to the same optimal values.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, BBTree
+from coinor.grumpy import PULP, HIGHS, SCIPY, HIGHSPY_INSTALLED, SCIPY_INSTALLED
+from coinor.grumpy import DUAL_SIMPLEX, DualSimplex
+from coinor.grumpy import PSEUDOCOST_BRANCHING, BEST_FIRST
+import math
+import numpy as np
+import pytest
+
+EPSILON = 1e-10
+# test problem, (num_vars,num_cons,seed)
+problem = [(10,10,0),
+           (20,10,3),
+           (30,20,4),
+           ]
+lp_solvers = [PULP, DUAL_SIMPLEX]
+if HIGHSPY_INSTALLED:
+    lp_solvers.append(HIGHS)
+if SCIPY_INSTALLED:
+    lp_solvers.append(SCIPY)
+
+def test_backends():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        opt = None
+        for lp_solver in lp_solvers:
+            T = BBTree()
+            solution, bb_optimal = BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ,
+                                                  MAT, RHS,
+                                                  branch_strategy = PSEUDOCOST_BRANCHING,
+                                                  search_strategy = BEST_FIRST,
+                                                  lp_solver = lp_solver)
+            for v in solution:
+                diff = solution[v]-math.floor(solution[v])
+                assert(diff <= EPSILON or diff >= 1-EPSILON)
+            for c in range(con):
+                assert(sum(MAT[v][c]*solution[v] for v in VARIABLES) <= RHS[c])
+            if opt is None:
+                opt = bb_optimal
+            assert(opt == bb_optimal)
+
+def test_warm_start():
+    if not HIGHSPY_INSTALLED:
+        pytest.skip('highspy is not installed')
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=40,
+                                                              numCons=20,
+                                                              rand_seed=6)
+    lp_iter_count = {}
+    bb_optimal = {}
+    for warm_start in [True, False]:
+        T = BBTree()
+        solution, bb_optimal[warm_start] = BranchAndBound(T, CONSTRAINTS,
+                                                          VARIABLES, OBJ, MAT, RHS,
+                                                          search_strategy = BEST_FIRST,
+                                                          lp_solver = HIGHS,
+                                                          warm_start = warm_start)
+        lp_iter_count[warm_start] = T._lp_iter_count
+    assert(bb_optimal[True] == bb_optimal[False])
+    assert(lp_iter_count[True] < lp_iter_count[False])
+
+def test_dual_simplex():
+    # The example LP of DisplayPolyhedronAndSolveLP.py
+    A = [[-9, 5], [1, -13], [5, -1], [-1, 5]]
+    b = [0, 0, 16, 10]
+    lp = DualSimplex([1, 1], A, b, [-np.inf, -np.inf], [np.inf, np.inf])
+    assert(lp.solve() == 'Optimal')
+    assert(abs(lp.objective - 6.5) <= EPSILON)
+    assert(np.allclose(lp.x, [3.75, 2.75]))
+    assert(np.allclose(lp.duals, [0, 0, 0.25, 0.25]))
+    tableau = lp.tableau()
+    assert(np.allclose(tableau[:, lp.basic_variables()], np.eye(4)))
+    # Reoptimize from the optimal basis after a bound change
+    basis = lp.get_basis()
+    lp.set_bounds(upper = [3, np.inf])
+    assert(lp.solve(basis) == 'Optimal')
+    assert(abs(lp.objective - 5.6) <= EPSILON)
+    # The solve stops as soon as the optimal value is at most the cutoff
+    lp.set_bounds(upper = [np.inf, np.inf])
+    assert(lp.solve(basis, cutoff = 6.6) == 'Cutoff')
+    lp.set_bounds(lower = [4, -np.inf])
+    assert(lp.solve(basis) == 'Infeasible')
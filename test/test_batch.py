@@ -0,0 +1,54 @@
+'''
+Tests solving a batch of instances in a process pool. Every solve must give
+the same optimal value as the sequential algorithm.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, MIPDictsToArrays
+from coinor.grumpy import SolveMany, DUAL_SIMPLEX
+from coinor.grumpy import MOST_FRACTIONAL, PSEUDOCOST_BRANCHING
+from coinor.grumpy import DEPTH_FIRST, BEST_FIRST
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(10,10,0),
+           (20,10,3),
+           (30,20,4),
+           ]
+
+def test_solve_many(capfd):
+    strategies = [(MOST_FRACTIONAL, DEPTH_FIRST),
+                  (PSEUDOCOST_BRANCHING, BEST_FIRST)]
+    instances = []
+    optima = []
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX)
+        optima.append(opt)
+        if len(instances) % 2:
+            instances.append((CONSTRAINTS, VARIABLES, OBJ, MAT, RHS))
+        else:
+            instances.append(MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ,
+                                              MAT, RHS))
+    results = list(SolveMany(instances, strategies, workers = 2,
+                             chunksize = 2, lp_solver = DUAL_SIMPLEX))
+    assert(len(results) == len(instances)*len(strategies))
+    for r in results:
+        assert(r['status'] == 'optimal')
+        assert(r['LB'] == optima[r['instance']])
+        assert(r['nodes'] >= r['lp_count'] > 0)
+    # The workers print nothing
+    out, err = capfd.readouterr()
+    assert(out == '' and err == '')
+
+def test_time_limit():
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=40,
+                                                              numCons=20,
+                                                              rand_seed=5)
+    results = list(SolveMany([(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)],
+                             workers = 1, time_limit = 0,
+                             lp_solver = DUAL_SIMPLEX))
+    assert(len(results) == 1)
+    assert(results[0]['status'] == 'time limit')
@@ -1,8 +1,9 @@
 '''
 Tests correctness of branch and bound algorithm. Optimal values of problems are
-hard-coded. This will be valid until python decides to change its random number
-generator. See test_bb_pulp.py for comparing branch and bound results with
-optimal values given by PuLP.
+hard-coded. They were computed with the random number generator of Python 2,
+which GenerateRandomMIP reproduces when called with legacy = True. See
+test_bb_pulp.py for comparing branch and bound results with optimal values
+given by PuLP.
 
 Script raises exceptions if the bb solution is not integer feasible or optimal
 value is not right.
@@ -45,7 +46,8 @@ if __name__=='__main__':
         #T.set_display_mode('matplotlib')
         CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
                                                                      numCons=con,
-                                                                     rand_seed=seed)
+                                                                     rand_seed=seed,
+                                                                     legacy=True)
 
         solution, opt_value = BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS,
                                              display_interval = 1,
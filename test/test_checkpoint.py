@@ -0,0 +1,100 @@
+'''
+Tests checkpointing and resuming the branch-and-bound algorithm. A search
+that is stopped and resumed from its checkpoint must process the same nodes
+and find the same optimal value as a search that is not interrupted.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, BBTree
+from coinor.grumpy import DUAL_SIMPLEX, BEST_FIRST, SCIPY_INSTALLED
+from coinor.grumpy import BranchAndBoundArrays, MIPDictsToArrays
+import os
+import pytest
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (40,20,5),
+           ]
+
+def test_checkpoint(tmp_path):
+    checkpoint_file = str(tmp_path / 'checkpoint')
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        for kwargs in [{}, {'search_strategy' : BEST_FIRST,
+                            'max_nodes_in_memory' : 3,
+                            'spill_directory' : str(tmp_path)}]:
+            stats = {}
+            solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ,
+                                           MAT, RHS, lp_solver = DUAL_SIMPLEX,
+                                           stats = stats, **kwargs)
+            stopped_stats = {}
+            BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS,
+                           lp_solver = DUAL_SIMPLEX,
+                           node_limit = stats['nodes']//2,
+                           checkpoint_file = checkpoint_file,
+                           checkpoint_interval = 0, stats = stopped_stats,
+                           **kwargs)
+            assert(stopped_stats['stopped'])
+            resumed_stats = {}
+            solution, LB = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ,
+                                          MAT, RHS, lp_solver = DUAL_SIMPLEX,
+                                          resume_from = checkpoint_file,
+                                          stats = resumed_stats, **kwargs)
+            assert(LB == opt)
+            assert(not resumed_stats['stopped'])
+            assert(resumed_stats['nodes'] == stats['nodes'])
+            assert(resumed_stats['lp_count'] == stats['lp_count'])
+            assert(sorted(os.listdir(str(tmp_path))) == ['checkpoint'])
+
+def test_checkpoint_tree(tmp_path):
+    checkpoint_file = str(tmp_path / 'checkpoint')
+    var, con, seed = problem[0]
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                              numCons=con,
+                                                              rand_seed=seed)
+    T = BBTree()
+    T.set_display_mode('off')
+    solution, opt = BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS,
+                                   lp_solver = DUAL_SIMPLEX)
+    T_stopped = BBTree()
+    T_stopped.set_display_mode('off')
+    BranchAndBound(T_stopped, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS,
+                   lp_solver = DUAL_SIMPLEX, node_limit = T._node_count//2,
+                   checkpoint_file = checkpoint_file, checkpoint_tree = True)
+    T_resumed = BBTree()
+    T_resumed.set_display_mode('off')
+    solution, LB = BranchAndBound(T_resumed, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                  RHS, lp_solver = DUAL_SIMPLEX,
+                                  resume_from = checkpoint_file)
+    assert(LB == opt)
+    assert(T_resumed._node_count == T._node_count)
+    assert(set(T_resumed.get_node_list()) == set(T.get_node_list()))
+
+def test_checkpoint_problem(tmp_path):
+    # A checkpoint only resumes the search for the same constraint matrix
+    checkpoint_file = str(tmp_path / 'checkpoint')
+    var, con, seed = problem[0]
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                              numCons=con,
+                                                              rand_seed=seed)
+    c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+    other_A = A.copy()
+    other_A[0, 0] += 1
+    matrices = [(A, other_A)]
+    if SCIPY_INSTALLED:
+        import scipy.sparse
+        matrices.append((scipy.sparse.csr_matrix(A),
+                         scipy.sparse.csr_matrix(other_A)))
+    for A, other_A in matrices:
+        x, opt = BranchAndBoundArrays(None, c, A, b, lp_solver = DUAL_SIMPLEX)
+        BranchAndBoundArrays(None, c, A, b, lp_solver = DUAL_SIMPLEX,
+                             node_limit = 5, checkpoint_file = checkpoint_file)
+        with pytest.raises(Exception, match = 'another problem'):
+            BranchAndBoundArrays(None, c, other_A, b,
+                                 lp_solver = DUAL_SIMPLEX,
+                                 resume_from = checkpoint_file)
+        x, LB = BranchAndBoundArrays(None, c, A, b, lp_solver = DUAL_SIMPLEX,
+                                     resume_from = checkpoint_file)
+        assert(LB == opt)
@@ -0,0 +1,99 @@
+'''
+Tests the distributed branch and bound algorithm with workers on the local
+machine. It must give the same optimal values as the sequential algorithm.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, BBTree
+from coinor.grumpy import MIPDictsToArrays, DistributedBranchAndBound
+from coinor.grumpy import DistributedWorker, DUAL_SIMPLEX
+from coinor.grumpy import PSEUDOCOST_BRANCHING, BEST_FIRST
+from multiprocessing import Process
+import os, sys, socket, pytest
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (30,20,4),
+           ]
+
+def test_distributed(capsys):
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX)
+        c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+        T = BBTree()
+        x, LB = DistributedBranchAndBound(T, c, A, b, var_names = VARIABLES,
+                                          branch_strategy = PSEUDOCOST_BRANCHING,
+                                          search_strategy = BEST_FIRST,
+                                          lp_solver = DUAL_SIMPLEX,
+                                          local_workers = 3, max_dive = 2)
+        assert(LB == opt)
+        assert(c.dot(x) == LB)
+        # Every LP solved is a node of the tree
+        assert(T.get_node_num() >= T._lp_count)
+        assert(T._incumbent_value == LB)
+        # Nothing is printed by default
+        assert(capsys.readouterr().out == '')
+
+def test_remote_worker():
+    # A worker started on its own, as it would be on another machine
+    s = socket.socket()
+    s.bind(('localhost', 0))
+    address = s.getsockname()
+    s.close()
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=20,
+                                                              numCons=10,
+                                                              rand_seed=3)
+    c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+    authkey = os.urandom(32)
+    worker = Process(target = DistributedWorker, args = (address, authkey))
+    worker.start()
+    x, LB = DistributedBranchAndBound(None, c, A, b, lp_solver = DUAL_SIMPLEX,
+                                      address = address, authkey = authkey,
+                                      local_workers = 0)
+    worker.join()
+    assert(LB == 93)
+
+def _crash(*args):
+    os._exit(1)
+
+def test_dead_workers(monkeypatch):
+    # Workers that die during their first dive must not hang the search
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=20,
+                                                              numCons=10,
+                                                              rand_seed=3)
+    c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+    # The module, which the function of the same name hides in the package
+    module = sys.modules['coinor.grumpy.DistributedBranchAndBound']
+    monkeypatch.setattr(module, '_dive', _crash)
+    with pytest.raises(Exception, match = 'workers died'):
+        DistributedBranchAndBound(None, c, A, b, lp_solver = DUAL_SIMPLEX,
+                                  local_workers = 2)
+
+def test_idle_timeout():
+    # No worker ever connects
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=20,
+                                                              numCons=10,
+                                                              rand_seed=3)
+    c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+    with pytest.raises(Exception, match = 'No worker'):
+        DistributedBranchAndBound(None, c, A, b, lp_solver = DUAL_SIMPLEX,
+                                  authkey = os.urandom(32),
+                                  local_workers = 0, idle_timeout = 1)
+
+def test_authkey():
+    # Without a key, only local workers may connect
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=20,
+                                                              numCons=10,
+                                                              rand_seed=3)
+    c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+    for address, local_workers in [(('localhost', 0), 0),
+                                   (('0.0.0.0', 0), 2)]:
+        with pytest.raises(Exception, match = 'authkey'):
+            DistributedBranchAndBound(None, c, A, b,
+                                      lp_solver = DUAL_SIMPLEX,
+                                      address = address,
+                                      local_workers = local_workers)
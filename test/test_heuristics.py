@@ -0,0 +1,76 @@
+'''
+Tests the primal heuristics. The solutions they find must be feasible, and
+running them during the search must not change the optimal value.
+'''
+
+import numpy as np
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, MIPDictsToArrays
+from coinor.grumpy import BBTree, PrimalHeuristics, DUAL_SIMPLEX
+from coinor.grumpy import SIMPLE_ROUNDING, FRACTIONAL_DIVING
+from coinor.grumpy import COEFFICIENT_DIVING, FIX_AND_PROPAGATE, GREEDY_FILL
+from coinor.grumpy import DEPTH_FIRST, BEST_FIRST, CreateLPBackend
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (30,20,4),
+           (40,20,5),
+           ]
+
+heuristics = [SIMPLE_ROUNDING, FRACTIONAL_DIVING, COEFFICIENT_DIVING,
+              FIX_AND_PROPAGATE, GREEDY_FILL]
+
+def test_heuristic_solutions():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX)
+        c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+        lower = np.zeros(var)
+        upper = np.ones(var)
+        lp = CreateLPBackend(DUAL_SIMPLEX)
+        lp.load(c, A, b, lower, upper)
+        status, relax, x = lp.solve()
+        basis = lp.get_basis()
+        for heuristic in heuristics:
+            H = PrimalHeuristics(c, A, b, lower, upper, [heuristic])
+            found = H.run(x, -np.inf, lp, basis = basis)
+            if found is None:
+                continue
+            name, value, y = found
+            assert(name == heuristic)
+            assert(((y == 0) | (y == 1)).all())
+            assert((A.dot(y) <= b).all())
+            assert(value == c.dot(y) and value <= opt)
+
+def test_heuristics():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        for search_strategy in [DEPTH_FIRST, BEST_FIRST]:
+            stats = {}
+            solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ,
+                                           MAT, RHS, lp_solver = DUAL_SIMPLEX,
+                                           search_strategy = search_strategy,
+                                           stats = stats)
+            nodes = stats['nodes']
+            assert(stats['heuristic_calls'] == 0)
+            T = BBTree()
+            T.set_display_mode('off')
+            stats = {}
+            solution, LB = BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ,
+                                          MAT, RHS, lp_solver = DUAL_SIMPLEX,
+                                          search_strategy = search_strategy,
+                                          heuristics = heuristics,
+                                          heuristic_interval = 5,
+                                          stats = stats)
+            assert(LB == opt)
+            assert(stats['nodes'] <= nodes)
+            assert(stats['heuristic_calls'] > 0)
+            assert(stats['heuristic_solutions'] > 0)
+            assert(T._heuristic_count == stats['heuristic_solutions'])
+            assert(T._incumbent_value == LB)
@@ -0,0 +1,45 @@
+'''
+Tests the hybrid plunging search strategy. It must give the same optimal
+value as the other strategies and find an incumbent before best first
+search does.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, MIPDictsToArrays
+from coinor.grumpy import BranchAndBoundIterator, DUAL_SIMPLEX
+from coinor.grumpy import BEST_FIRST, HYBRID_PLUNGING, INFINITY
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (30,20,4),
+           (40,20,5),
+           ]
+
+def _first_incumbent(c, A, b, search_strategy, **kwargs):
+    '''
+    Returns the optimal value and the number of nodes created when the first
+    incumbent was found.
+    '''
+    first = None
+    for progress in BranchAndBoundIterator(None, c, A, b,
+                                           lp_solver = DUAL_SIMPLEX,
+                                           search_strategy = search_strategy,
+                                           **kwargs):
+        if first is None and progress['incumbent'] > -INFINITY:
+            first = progress['nodes']
+    return progress['incumbent'], first
+
+def test_hybrid_plunging():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+        opt, best_first = _first_incumbent(c, A, b, BEST_FIRST)
+        LB, hybrid = _first_incumbent(c, A, b, HYBRID_PLUNGING)
+        assert(LB == opt)
+        assert(hybrid < best_first)
+        for kwargs in [{'plunge_fraction' : 0}, {'plunge_fraction' : 1},
+                       {'max_plunge_depth' : 2}]:
+            LB, first = _first_incumbent(c, A, b, HYBRID_PLUNGING, **kwargs)
+            assert(LB == opt)
@@ -0,0 +1,56 @@
+'''
+Tests the generator version of the branch-and-bound algorithm. The bounds it
+reports must be valid and converge to the optimal value, and the search must
+be abandoned cleanly when the caller stops iterating.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, MIPDictsToArrays
+from coinor.grumpy import BranchAndBoundIterator, DUAL_SIMPLEX, THREADS
+from coinor.grumpy import BEST_FIRST
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(10,10,0),
+           (20,10,3),
+           (30,20,4),
+           ]
+
+def test_iterator():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX)
+        c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+        for search_strategy in [None, BEST_FIRST]:
+            kwargs = {'lp_solver' : DUAL_SIMPLEX}
+            if search_strategy is not None:
+                kwargs['search_strategy'] = search_strategy
+            incumbent = None
+            bound = None
+            for progress in BranchAndBoundIterator(None, c, A, b, **kwargs):
+                assert(progress['incumbent'] <= opt <= progress['bound'])
+                if incumbent is not None:
+                    assert(progress['incumbent'] >= incumbent)
+                    assert(progress['bound'] <= bound)
+                incumbent = progress['incumbent']
+                bound = progress['bound']
+            assert(progress['incumbent'] == opt)
+            assert(c.dot(progress['solution']) == opt)
+            assert(progress['open_nodes'] == 0 and progress['gap'] == 0)
+
+def test_stop_early():
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=40,
+                                                              numCons=20,
+                                                              rand_seed=5)
+    c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+    steps = BranchAndBoundIterator(None, c, A, b, lp_solver = DUAL_SIMPLEX,
+                                   workers = 2, parallel_mode = THREADS,
+                                   yield_interval = 5)
+    for count, progress in enumerate(steps):
+        if count == 3:
+            break
+    steps.close()
+    assert(progress['open_nodes'] > 0)
+    assert(progress['nodes'] > 15)
@@ -0,0 +1,47 @@
+'''
+Tests the node and gap limits of the branch-and-bound algorithm. When the
+search stops at a limit, the global upper bound must still be valid.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, DUAL_SIMPLEX
+from coinor.grumpy import BEST_FIRST
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (30,20,4),
+           (40,20,5),
+           ]
+
+def test_limits():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        stats = {}
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX,
+                                       stats = stats)
+        assert(stats['bound'] == opt and not stats['stopped'])
+        nodes = stats['nodes']
+        for search_strategy in [None, BEST_FIRST]:
+            kwargs = {'lp_solver' : DUAL_SIMPLEX, 'stats' : stats}
+            if search_strategy is not None:
+                kwargs['search_strategy'] = search_strategy
+            for gap_limit in [0.01, 0.05]:
+                solution, LB = BranchAndBound(None, CONSTRAINTS, VARIABLES,
+                                              OBJ, MAT, RHS,
+                                              gap_limit = gap_limit,
+                                              **kwargs)
+                assert(LB <= opt <= stats['bound'])
+                assert(stats['bound'] - LB <= gap_limit*abs(LB))
+            solution, LB = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ,
+                                          MAT, RHS, abs_gap_limit = 2,
+                                          **kwargs)
+            assert(LB <= opt <= stats['bound'] <= LB + 2)
+        node_limit = nodes//2
+        solution, LB = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                      RHS, lp_solver = DUAL_SIMPLEX,
+                                      node_limit = node_limit, stats = stats)
+        assert(stats['stopped'] and stats['nodes'] <= node_limit + 1)
+        assert(LB <= opt <= stats['bound'])
@@ -0,0 +1,68 @@
+'''
+Tests the queue of open nodes. Nodes must come out in the order of their
+priorities, the bound must be the largest bound of an open node, and nodes
+pruned by a new incumbent must be removed from the queue at once.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, DUAL_SIMPLEX
+from coinor.grumpy import NodeQueue, INFINITY, BEST_ESTIMATE
+import random
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (30,20,4),
+           ]
+
+def test_node_queue():
+    random.seed(1)
+    Q = NodeQueue()
+    nodes = {}
+    for key in range(200):
+        nodes[key] = (random.randint(0, 10), random.random()*100)
+        Q.push(key, nodes[key][0], ('node', key), nodes[key][1])
+    # A node without a bound
+    Q.push(200, 11, ('node', 200))
+    assert(Q.bound() == INFINITY)
+    # A node that is taken from the queue remains open until it is processed
+    first = Q.pop()[1]
+    second = Q.pop()[1]
+    Q.processed(first)
+    assert(Q.open_nodes() == len(Q) + 1)
+    queued = [key for key in range(201) if key not in (first, second)]
+    LB = 50
+    pruned, freed = Q.prune(LB)
+    assert(sorted(node[1] for node in pruned) ==
+           [key for key in queued if key < 200 and nodes[key][1] <= LB])
+    assert(freed > 0)
+    assert(Q.bound() == INFINITY)
+    popped = []
+    while not Q.isEmpty():
+        popped.append(Q.pop()[1])
+    assert(popped[-1] == 200)
+    popped = popped[:-1]
+    Q.processed(200)
+    assert(Q.bound() == max(nodes[key][1] for key in popped + [second]))
+    priorities = [nodes[key][0] for key in popped]
+    assert(priorities == sorted(priorities))
+    # Nodes with the same priority come out in the order they were pushed
+    for i in range(len(popped) - 1):
+        if priorities[i] == priorities[i + 1]:
+            assert(popped[i] < popped[i + 1])
+    for key in popped + [second]:
+        Q.processed(key)
+    assert(Q.open_nodes() == 0 and Q.bound() == -INFINITY)
+
+def test_bulk_pruning():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        stats = {}
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX,
+                                       search_strategy = BEST_ESTIMATE,
+                                       stats = stats)
+        assert(stats['queue_pruned'] > 0 and stats['queue_freed'] > 0)
+        # No node pruned by bound is taken from the queue
+        assert(stats['nodes'] == stats['lp_count'] + stats['queue_pruned'])
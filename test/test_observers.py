@@ -0,0 +1,97 @@
+'''
+Tests the events reported to the observers of the branch-and-bound algorithm.
+Without observers nothing is printed, and the events must be consistent with
+the statistics of the algorithm.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, BBTree
+from coinor.grumpy import BBObserver, ConsoleObserver, DUAL_SIMPLEX
+from coinor.grumpy import BranchAndBoundArrays, MIPDictsToArrays
+from coinor.grumpy import BEST_ESTIMATE, HYBRID_PLUNGING
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(10,10,0),
+           (20,10,3),
+           (30,20,4),
+           ]
+
+class RecordingObserver(BBObserver):
+    def __init__(self):
+        self.events = []
+
+    def node_solved(self, index, depth, LB, bounds, lp_status, lp_value,
+                    lp_iterations, x, relax, integer):
+        self.events.append(('node_solved', index))
+
+    def incumbent_found(self, index, value, x):
+        self.events.append(('incumbent_found', value))
+
+    def pruned(self, index, parent, depth, LB, reason, value):
+        self.events.append(('pruned', index))
+
+    def branched(self, index, value, branch_var, branch_var_value,
+                 down_index, up_index):
+        self.events.append(('branched', index))
+
+    def finished(self, LB, x, node_count, lp_count, lp_iter_count, time,
+                 stopped):
+        self.events.append(('finished', LB, node_count, lp_count))
+
+def test_observers(capsys):
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        observer = RecordingObserver()
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX,
+                                       observers = [observer])
+        assert(capsys.readouterr().out == '')
+        events = observer.events
+        assert(events[-1] == ('finished', opt, events[-1][2], events[-1][3]))
+        solved = [e[1] for e in events if e[0] == 'node_solved']
+        assert(len(solved) == events[-1][3])
+        # Every node is either pruned or branched, and every child of a
+        # branched node is processed. The children are numbered from 2.
+        processed = [e[1] for e in events if e[0] in ('pruned', 'branched')]
+        assert(sorted(processed) == [0] + list(range(2, events[-1][2] + 1)))
+        incumbents = [e[1] for e in events if e[0] == 'incumbent_found']
+        assert(incumbents == sorted(incumbents) and incumbents[-1] == opt)
+        # The console observer and the tree do not change the search
+        T = BBTree()
+        T.set_display_mode('off')
+        solution, console_opt = BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ,
+                                               MAT, RHS,
+                                               lp_solver = DUAL_SIMPLEX,
+                                               observers = [ConsoleObserver()])
+        assert(console_opt == opt)
+        assert(T._lp_count == events[-1][3])
+        assert("Objective function value" in capsys.readouterr().out)
+
+def test_silent_default(capfd):
+    # The default LP solver runs CBC, which writes to the file descriptor
+    var, con, seed = problem[0]
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                              numCons=con,
+                                                              rand_seed=seed)
+    c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+    x, LB = BranchAndBoundArrays(None, c, A, b)
+    assert(c.dot(x) == LB)
+    out, err = capfd.readouterr()
+    assert(out == '' and err == '')
+
+def test_console_strategies(capsys):
+    var, con, seed = problem[0]
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                              numCons=con,
+                                                              rand_seed=seed)
+    for search_strategy, name in [(BEST_ESTIMATE, "Best estimate"),
+                                  (HYBRID_PLUNGING, "Hybrid plunging")]:
+        BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS,
+                       search_strategy = search_strategy,
+                       lp_solver = DUAL_SIMPLEX,
+                       observers = [ConsoleObserver()])
+        out = capsys.readouterr().out
+        assert(name + " search strategy" in out)
+        assert("Unknown" not in out)
@@ -0,0 +1,87 @@
+'''
+Tests the parallel modes of the branch and bound algorithm. They must give the
+same optimal values as the sequential algorithm, and the deterministic modes
+must give the same search tree in every run.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, BBTree
+from coinor.grumpy import DUAL_SIMPLEX, HIGHS, HIGHSPY_INSTALLED
+from coinor.grumpy import PROCESSES, THREADS
+from coinor.grumpy import MOST_FRACTIONAL, PSEUDOCOST_BRANCHING
+from coinor.grumpy import DEPTH_FIRST, BEST_FIRST
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (30,20,4),
+           ]
+# strategies, (branching strategy, search strategy)
+strategy = [(MOST_FRACTIONAL, DEPTH_FIRST),
+            (PSEUDOCOST_BRANCHING, BEST_FIRST),
+            ]
+
+def test_processes():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        for branch_strategy, search_strategy in strategy:
+            solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ,
+                                           MAT, RHS,
+                                           branch_strategy = branch_strategy,
+                                           search_strategy = search_strategy,
+                                           lp_solver = DUAL_SIMPLEX)
+            lp_count = None
+            for run in range(2):
+                T = BBTree()
+                solution, bb_optimal = BranchAndBound(T, CONSTRAINTS, VARIABLES,
+                                                      OBJ, MAT, RHS,
+                                                      branch_strategy = branch_strategy,
+                                                      search_strategy = search_strategy,
+                                                      lp_solver = DUAL_SIMPLEX,
+                                                      workers = 3)
+                assert(bb_optimal == opt)
+                if lp_count is None:
+                    lp_count = T._lp_count
+                assert(T._lp_count == lp_count)
+
+def test_threads():
+    if HIGHSPY_INSTALLED:
+        lp_solver = HIGHS
+    else:
+        lp_solver = DUAL_SIMPLEX
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        for branch_strategy, search_strategy in strategy:
+            solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ,
+                                           MAT, RHS,
+                                           branch_strategy = branch_strategy,
+                                           search_strategy = search_strategy,
+                                           lp_solver = lp_solver)
+            # Deterministic rounds give the same tree with threads and
+            # processes
+            lp_count = {}
+            for parallel_mode in [THREADS, PROCESSES]:
+                T = BBTree()
+                solution, bb_optimal = BranchAndBound(T, CONSTRAINTS, VARIABLES,
+                                                      OBJ, MAT, RHS,
+                                                      branch_strategy = branch_strategy,
+                                                      search_strategy = search_strategy,
+                                                      lp_solver = lp_solver,
+                                                      workers = 3,
+                                                      parallel_mode = parallel_mode)
+                assert(bb_optimal == opt)
+                lp_count[parallel_mode] = T._lp_count
+            assert(lp_count[THREADS] == lp_count[PROCESSES])
+            solution, bb_optimal = BranchAndBound(None, CONSTRAINTS, VARIABLES,
+                                                  OBJ, MAT, RHS,
+                                                  branch_strategy = branch_strategy,
+                                                  search_strategy = search_strategy,
+                                                  lp_solver = lp_solver,
+                                                  workers = 3,
+                                                  parallel_mode = THREADS,
+                                                  deterministic = False)
+            assert(bb_optimal == opt)
@@ -0,0 +1,76 @@
+'''
+Tests branching penalties. The penalties must be lower bounds on the
+decrease of the LP value in the children, and discarding children by their
+penalties must not change the optimal value.
+'''
+
+import numpy as np
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, MIPDictsToArrays
+from coinor.grumpy import BBTree, DualSimplex, DUAL_SIMPLEX, PULP
+from coinor.grumpy import MOST_FRACTIONAL, PENALTY_BRANCHING
+from coinor.grumpy import DEPTH_FIRST, BEST_FIRST
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (30,20,4),
+           (40,20,6),
+           ]
+
+def test_penalty_bounds():
+    for p in problem:
+        var, con, seed = p
+        c, A, b = MIPDictsToArrays(*GenerateRandomMIP(numVars=var,
+                                                      numCons=con,
+                                                      rand_seed=seed))
+        lp = DualSimplex(c, A, b, np.zeros(var), np.ones(var))
+        lp.solve()
+        relax = lp.objective
+        candidates = np.flatnonzero(np.abs(lp.x - np.round(lp.x)) > .001)
+        down, up = lp.penalties(candidates)
+        for i, j in enumerate(candidates):
+            for penalty, fixed in [(down[i], 0), (up[i], 1)]:
+                lower = np.zeros(var)
+                upper = np.ones(var)
+                lower[j] = upper[j] = fixed
+                child = DualSimplex(c, A, b, lower, upper)
+                if child.solve() == 'Optimal':
+                    assert(penalty <= relax - child.objective + 1e-7)
+
+def test_penalties():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX)
+        for search_strategy in [DEPTH_FIRST, BEST_FIRST]:
+            for branch_strategy in [MOST_FRACTIONAL, PENALTY_BRANCHING]:
+                T = BBTree()
+                T.set_display_mode('off')
+                stats = {}
+                solution, LB = BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ,
+                                              MAT, RHS,
+                                              lp_solver = DUAL_SIMPLEX,
+                                              branch_strategy = branch_strategy,
+                                              search_strategy = search_strategy,
+                                              penalties = True, stats = stats)
+                assert(LB == opt)
+                assert(T._saved_lp_count == stats['saved_lp_count'])
+                if search_strategy == DEPTH_FIRST:
+                    assert(stats['saved_lp_count'] > 0)
+
+def test_penalties_unsupported():
+    var, con, seed = problem[0]
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                              numCons=con,
+                                                              rand_seed=seed)
+    nodes = []
+    for branch_strategy in [MOST_FRACTIONAL, PENALTY_BRANCHING]:
+        stats = {}
+        BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS,
+                       lp_solver = PULP, branch_strategy = branch_strategy,
+                       penalties = True, stats = stats)
+        assert(stats['saved_lp_count'] == 0)
+        nodes.append(stats['nodes'])
+    assert(nodes[0] == nodes[1])
@@ -0,0 +1,37 @@
+'''
+Tests racing of branching and search strategies. The race must give the same
+optimal value as the sequential algorithm, with exactly one winner.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, MIPDictsToArrays
+from coinor.grumpy import RaceStrategies, DUAL_SIMPLEX
+from coinor.grumpy import MOST_FRACTIONAL, PSEUDOCOST_BRANCHING
+from coinor.grumpy import DEPTH_FIRST, BEST_FIRST
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (30,20,4),
+           ]
+
+def test_racing(capfd):
+    strategies = [(MOST_FRACTIONAL, DEPTH_FIRST),
+                  (PSEUDOCOST_BRANCHING, BEST_FIRST),
+                  (PSEUDOCOST_BRANCHING, DEPTH_FIRST)]
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX)
+        c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+        x, LB, T, stats = RaceStrategies(c, A, b, strategies,
+                                         lp_solver = DUAL_SIMPLEX)
+        assert(LB == opt)
+        assert(c.dot(x) == LB)
+        assert(len(stats) == len(strategies))
+        assert([s['status'] for s in stats].count('won') == 1)
+        assert(T is not None and not T._stopped)
+        # Nothing is printed by default, also not by the racers
+        out, err = capfd.readouterr()
+        assert(out == '' and err == '')
@@ -0,0 +1,58 @@
+'''
+Tests reduced cost fixing. Fixing variables by their reduced costs must not
+change the optimal value and, searching depth first, must not need more
+nodes.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound
+from coinor.grumpy import DUAL_SIMPLEX, PULP
+from coinor.grumpy import DEPTH_FIRST, BEST_FIRST
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (30,20,4),
+           (40,20,5),
+           ]
+
+def test_reduced_cost_fixing():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        for search_strategy in [DEPTH_FIRST, BEST_FIRST]:
+            nodes = []
+            for reduced_cost_fixing in [False, True]:
+                stats = {}
+                solution, LB = BranchAndBound(None, CONSTRAINTS, VARIABLES,
+                                              OBJ, MAT, RHS,
+                                              lp_solver = DUAL_SIMPLEX,
+                                              search_strategy = search_strategy,
+                                              reduced_cost_fixing =
+                                                  reduced_cost_fixing,
+                                              stats = stats)
+                if reduced_cost_fixing:
+                    assert(LB == opt)
+                    assert(stats['root_fixed'] > 0)
+                else:
+                    opt = LB
+                    assert(stats['root_fixed'] == 0)
+                    assert(stats['local_fixed'] == 0)
+                nodes.append(stats['nodes'])
+            if search_strategy == DEPTH_FIRST:
+                assert(nodes[1] <= nodes[0])
+
+def test_reduced_cost_fixing_unsupported():
+    var, con, seed = problem[0]
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                              numCons=con,
+                                                              rand_seed=seed)
+    nodes = []
+    for reduced_cost_fixing in [False, True]:
+        stats = {}
+        BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS,
+                       lp_solver = PULP, reduced_cost_fixing =
+                       reduced_cost_fixing, stats = stats)
+        assert(stats['root_fixed'] == 0 and stats['local_fixed'] == 0)
+        nodes.append(stats['nodes'])
+    assert(nodes[0] == nodes[1])
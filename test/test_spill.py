@@ -0,0 +1,97 @@
+'''
+Tests keeping only part of the open nodes in memory. Writing nodes to files
+must not change the search, and plunging because of a memory limit must keep
+the number of open nodes small and still give the optimal value.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, MIPDictsToArrays
+from coinor.grumpy import BranchAndBoundIterator, DUAL_SIMPLEX
+from coinor.grumpy import BEST_FIRST, BEST_ESTIMATE, BBObserver
+import os
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (40,20,5),
+           ]
+
+def test_spill(tmp_path):
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        for search_strategy in [BEST_FIRST, BEST_ESTIMATE]:
+            stats = {}
+            solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ,
+                                           MAT, RHS, lp_solver = DUAL_SIMPLEX,
+                                           search_strategy = search_strategy,
+                                           stats = stats)
+            for max_nodes in [3, 10]:
+                spill_stats = {}
+                solution, LB = BranchAndBound(None, CONSTRAINTS, VARIABLES,
+                                              OBJ, MAT, RHS,
+                                              lp_solver = DUAL_SIMPLEX,
+                                              search_strategy = search_strategy,
+                                              max_nodes_in_memory = max_nodes,
+                                              spill_directory = str(tmp_path),
+                                              stats = spill_stats)
+                assert(LB == opt)
+                assert(spill_stats['spilled'] > 0)
+                assert(spill_stats['nodes'] == stats['nodes'])
+                assert(spill_stats['lp_count'] == stats['lp_count'])
+                assert(os.listdir(str(tmp_path)) == [])
+
+class FailingObserver(BBObserver):
+    '''
+    Raises an exception when the second node is solved.
+    '''
+    def __init__(self):
+        self.nodes = 0
+
+    def node_solved(self, *args):
+        self.nodes += 1
+        if self.nodes == 2:
+            raise RuntimeError('observer failed')
+
+def test_spill_cleanup(tmp_path):
+    var, con, seed = problem[0]
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                              numCons=con,
+                                                              rand_seed=seed)
+    try:
+        BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT, RHS,
+                       lp_solver = DUAL_SIMPLEX, max_nodes_in_memory = 4,
+                       spill_directory = str(tmp_path),
+                       observers = [FailingObserver()])
+    except RuntimeError:
+        pass
+    else:
+        assert(False)
+    assert(os.listdir(str(tmp_path)) == [])
+
+def test_memory_limit():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+        open_nodes = {}
+        for memory_limit in [None, 5000]:
+            stats = {}
+            steps = BranchAndBoundIterator(None, c, A, b,
+                                           lp_solver = DUAL_SIMPLEX,
+                                           search_strategy = BEST_FIRST,
+                                           memory_limit = memory_limit,
+                                           stats = stats)
+            open_nodes[memory_limit] = 0
+            for progress in steps:
+                open_nodes[memory_limit] = max(open_nodes[memory_limit],
+                                               progress['open_nodes'])
+            assert(progress['incumbent'] == c.dot(progress['solution']))
+            if memory_limit is None:
+                opt = progress['incumbent']
+            else:
+                assert(progress['incumbent'] == opt)
+                assert(stats['plunged'] > 0)
+        assert(open_nodes[5000] < open_nodes[None])
@@ -0,0 +1,59 @@
+'''
+Tests strong branching and reliability branching. Both must give the same
+optimal value as most fractional branching, and their LPs must be counted
+separately from the node LPs.
+'''
+
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, BBTree
+from coinor.grumpy import DUAL_SIMPLEX, THREADS, BEST_FIRST
+from coinor.grumpy import STRONG_BRANCHING, RELIABILITY_BRANCHING
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(20,10,3),
+           (40,20,5),
+           (40,20,6),
+           ]
+
+def test_strong_branching():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX)
+        sb_lp_count = {}
+        for branch_strategy in [STRONG_BRANCHING, RELIABILITY_BRANCHING]:
+            T = BBTree()
+            T.set_display_mode('off')
+            stats = {}
+            solution, LB = BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                          RHS, lp_solver = DUAL_SIMPLEX,
+                                          branch_strategy = branch_strategy,
+                                          search_strategy = BEST_FIRST,
+                                          stats = stats)
+            assert(LB == opt)
+            assert(stats['sb_lp_count'] > 0)
+            assert(T._sb_lp_count == stats['sb_lp_count'])
+            assert(T._sb_lp_iter_count == stats['sb_lp_iter_count'])
+            assert(T._lp_count == stats['lp_count'])
+            sb_lp_count[branch_strategy] = stats['sb_lp_count']
+        assert(sb_lp_count[RELIABILITY_BRANCHING] <
+               sb_lp_count[STRONG_BRANCHING])
+
+def test_strong_branching_parallel():
+    var, con, seed = problem[0]
+    CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                              numCons=con,
+                                                              rand_seed=seed)
+    results = []
+    for workers in [1, 2]:
+        stats = {}
+        solution, LB = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                      RHS, lp_solver = DUAL_SIMPLEX,
+                                      branch_strategy = STRONG_BRANCHING,
+                                      workers = workers,
+                                      parallel_mode = THREADS, stats = stats)
+        assert(stats['sb_lp_count'] > 0)
+        results.append(LB)
+    assert(results[0] == results[1])
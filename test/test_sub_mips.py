@@ -0,0 +1,66 @@
+'''
+Tests the sub-MIP heuristics. The incumbent must be feasible for the
+sub-MIPs built from it, and solving sub-MIPs in the background must improve
+a poor incumbent without changing the optimal value.
+'''
+
+import numpy as np
+from coinor.grumpy import GenerateRandomMIP, BranchAndBound, MIPDictsToArrays
+from coinor.grumpy import BBTree, DUAL_SIMPLEX, RINS, LOCAL_BRANCHING
+from coinor.grumpy import BEST_FIRST, SIMPLE_ROUNDING, CreateLPBackend
+from coinor.grumpy.Heuristics import _rins_sub_mip, _local_branching_sub_mip
+
+# test problem, (num_vars,num_cons,seed)
+problem = [(40,20,5),
+           (60,30,6),
+           ]
+
+def test_sub_mip_problems():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX)
+        c, A, b = MIPDictsToArrays(CONSTRAINTS, VARIABLES, OBJ, MAT, RHS)
+        x = np.array([solution[v] for v in VARIABLES])
+        lp = CreateLPBackend(DUAL_SIMPLEX)
+        lp.load(c, A, b, np.zeros(var), np.ones(var))
+        status, relax, lp_x = lp.solve()
+        c_sub, A_sub, b_sub, free, constant = _rins_sub_mip(c, A, b, x, lp_x)
+        assert((A_sub.dot(x[free]) <= b_sub).all())
+        assert(constant + c_sub.dot(x[free]) == opt)
+        c_sub, A_sub, b_sub, free, constant = \
+            _local_branching_sub_mip(c, A, b, x, 3)
+        assert((A_sub.dot(x) <= b_sub).all())
+        y = x.copy()
+        y[:4] = 1 - y[:4]
+        assert(A_sub[-1].dot(y) > b_sub[-1])
+
+def test_sub_mips():
+    for p in problem:
+        var, con, seed = p
+        CONSTRAINTS, VARIABLES, OBJ, MAT, RHS = GenerateRandomMIP(numVars=var,
+                                                                  numCons=con,
+                                                                  rand_seed=seed)
+        solution, opt = BranchAndBound(None, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                       RHS, lp_solver = DUAL_SIMPLEX)
+        # Best first with simple rounding finds a poor first incumbent,
+        # which the sub-MIPs improve
+        T = BBTree()
+        T.set_display_mode('off')
+        stats = {}
+        solution, LB = BranchAndBound(T, CONSTRAINTS, VARIABLES, OBJ, MAT,
+                                      RHS, lp_solver = DUAL_SIMPLEX,
+                                      search_strategy = BEST_FIRST,
+                                      heuristics = [SIMPLE_ROUNDING],
+                                      sub_mips = [RINS, LOCAL_BRANCHING],
+                                      sub_mip_interval = 5,
+                                      stats = stats)
+        assert(LB == opt)
+        assert(stats['sub_mips'] > 0)
+        assert(stats['sub_mip_solutions'] > 0)
+        assert(T._heuristic_count == stats['heuristic_solutions'] +
+               stats['sub_mip_solutions'])
+        assert(T._incumbent_value == LB)